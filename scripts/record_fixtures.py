@@ -0,0 +1,36 @@
+"""Record the documentation pages used by the scraper benchmarks.
+
+Usage: uv run python scripts/record_fixtures.py [RUNTIME_SLUG ...]
+
+Downloads the release notes index and the base and ML page of each runtime (default: 17.3lts) into
+``tests/fixtures/docs``, replacing the synthetic sample pages. The benchmarks serve every release listed in the
+index with the ``17.3lts`` pages.
+"""
+
+from pathlib import Path
+import sys
+
+import requests
+
+from dbx_container.data.scraper import RuntimeScraper
+
+FIXTURES_DIR = Path(__file__).parent.parent / "tests" / "fixtures" / "docs"
+
+
+def main(slugs: list[str]) -> None:
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    pages = {"index.html": RuntimeScraper.BASE_URL}
+    for slug in slugs:
+        pages[f"{slug}.html"] = f"{RuntimeScraper.BASE_URL}{slug}"
+        pages[f"{slug}ml.html"] = f"{RuntimeScraper.BASE_URL}{slug}ml"
+
+    with requests.Session() as session:
+        for name, url in pages.items():
+            response = session.get(url, timeout=30)
+            response.raise_for_status()
+            (FIXTURES_DIR / name).write_text(response.text, encoding="utf-8")
+            print(f"Recorded {url} -> {FIXTURES_DIR / name} ({len(response.content) // 1024} KB)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ["17.3lts"])
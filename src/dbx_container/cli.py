@@ -1,4 +1,5 @@
 import argparse
+from dataclasses import asdict
 from pathlib import Path
 import sys
 from typing import Literal
@@ -7,22 +8,68 @@ from rich.panel import Panel
 from rich.text import Text
 
 from dbx_container.__about__ import __version__
+from dbx_container.data.cache import default_cache_dir
+from dbx_container.data.catalog import CATALOG_FILENAME, get_runtimes
 from dbx_container.data.scraper import RuntimeScraper
+from dbx_container.data.selection import RuntimeSelector
 from dbx_container.engine import RuntimeContainerEngine
 from dbx_container.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-def display_runtimes(runtimes: list | None = None, verify_ssl: bool = True) -> Literal[1] | Literal[0]:
+def add_cache_arguments(parser) -> None:
+    """Add the HTTP cache options shared by commands that scrape the documentation."""
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=str(default_cache_dir()),
+        help="Directory for the HTTP cache of documentation pages (default: %(default)s)",
+    )
+    cache_mode = parser.add_mutually_exclusive_group()
+    cache_mode.add_argument("--no-cache", action="store_true", help="Disable the HTTP cache and always download pages")
+    cache_mode.add_argument(
+        "--offline", action="store_true", help="Only use cached documentation pages, never touch the network"
+    )
+
+
+def get_cache_dir(args) -> Path | None:
+    """Resolve the cache directory from the parsed cache options."""
+    return None if args.no_cache else Path(args.cache_dir)
+
+
+def add_catalog_argument(parser, default: str | None = f"data/{CATALOG_FILENAME}") -> None:
+    """Add the runtime catalog snapshot option."""
+    parser.add_argument(
+        "--catalog",
+        type=str,
+        default=default,
+        help=f"Runtime catalog snapshot to load instead of scraping (default: {default or f'<output-dir>/{CATALOG_FILENAME}'})",
+    )
+
+
+def display_runtimes(
+    runtimes: list | None = None, verify_ssl: bool = True, cache_dir: Path | None = None, offline: bool = False
+) -> Literal[1] | Literal[0]:
     """Display runtime information in a rich table."""
     # Create a fetcher to load or fetch runtimes
-    fetcher = RuntimeScraper(verify_ssl=verify_ssl)
+    fetcher = RuntimeScraper(verify_ssl=verify_ssl, cache_dir=cache_dir, offline=offline)
 
-    result = fetcher.display_runtimes()
+    result = fetcher.display_runtimes(runtimes)
     return 0 if result else 1
 
 
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse a shard argument like 2/8."""
+    try:
+        shard, shards = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', expected I/N") from None
+    if not 1 <= shard <= shards:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', I must be between 1 and N")
+    return shard, shards
+
+
 def setup_build_command(subparsers) -> None:
     """Setup the build dockerfiles command."""
     parser = subparsers.add_parser("build", help="Build Dockerfiles for Databricks runtimes")
@@ -48,7 +95,61 @@ def setup_build_command(subparsers) -> None:
     parser.add_argument(
         "--threads", type=int, default=5, help="Number of threads to use for runtime processing (default: 5)"
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of runtimes to generate Dockerfiles for in parallel (default: 1)",
+    )
+    parser.add_argument(
+        "--atomic",
+        action="store_true",
+        help="Generate into a staging directory and swap it into place once complete, so failed runs change nothing",
+    )
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Merge adjacent RUN instructions of the generated Dockerfiles into fewer layers and clean up after apt",
+    )
+    parser.add_argument(
+        "--no-install-recommends",
+        action="store_true",
+        help="Install apt packages without recommended packages, requires --optimize",
+    )
+    parser.add_argument(
+        "--cache-mounts",
+        action="store_true",
+        help="Mount BuildKit caches for apt and pip downloads, so rebuilds on the same builder reuse them",
+    )
+    parser.add_argument(
+        "--multi-stage",
+        action="store_true",
+        help="Build the python environments in a builder stage and ship them without compilers and headers",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="I/N",
+        help="Generate only the I-th of N deterministic slices of a complete build, combine them with merge-manifests",
+    )
+    plan_mode = parser.add_mutually_exclusive_group()
+    plan_mode.add_argument(
+        "--plan",
+        action="store_true",
+        help="Print the files a build would create, change or delete, without writing anything",
+    )
+    plan_mode.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with a non-zero status if the output directory is not up to date, without writing anything",
+    )
     parser.add_argument("--no-verify-ssl", action="store_true", help="Disable SSL certificate verification")
+    add_cache_arguments(parser)
+    add_catalog_argument(parser, default=None)
+    parser.add_argument(
+        "--fetch", action="store_true", help="Scrape runtime information and refresh the catalog snapshot"
+    )
     parser.add_argument(
         "--latest-lts-only",
         action="store_true",
@@ -107,19 +208,43 @@ def run_build_dockerfiles(args) -> Literal[1] | Literal[0]:
             latest_lts_count=lts_count,
             force_ubuntu_version=args.force_ubuntu_version,
             skip_ml_variants=not args.include_ml_variants,
+            cache_dir=get_cache_dir(args),
+            offline=args.offline,
+            catalog_path=Path(args.catalog) if args.catalog else output_dir / CATALOG_FILENAME,
+            refresh_catalog=args.fetch,
+            jobs=args.jobs,
+            atomic=args.atomic,
+            optimize=args.optimize,
+            no_install_recommends=args.no_install_recommends,
+            cache_mounts=args.cache_mounts,
+            multi_stage=args.multi_stage,
         )
 
+        if args.no_install_recommends and not args.optimize:
+            logger.error("--no-install-recommends is applied by the optimizer, it requires --optimize")
+            return 1
+
+        if args.shard and (args.runtime_version or args.image_type or args.plan or args.check):
+            logger.error("--shard only splits complete builds, it cannot be combined with other build modes")
+            return 1
+
+        if args.plan or args.check:
+            return run_build_plan(engine, args)
+
+        if args.shard:
+            engine.build_shard(*args.shard, registry=args.registry)
+            logger.info("Build completed successfully!")
+            return 0
+
         if args.runtime_version:
             logger.info(f"Building for specific runtime: {args.runtime_version}")
             # Get the specific runtime
+            # Only the index and the base page of the requested release are fetched
+            selector = RuntimeSelector(versions=frozenset([args.runtime_version]), include_ml=False)
             with logger.status("[bold green]Fetching runtime information..."):
-                runtimes = engine.scraper.get_supported_runtimes()
+                runtimes = engine.get_runtimes(selector)
 
-            target_runtime = None
-            for runtime in runtimes:
-                if runtime.version == args.runtime_version:
-                    target_runtime = runtime
-                    break
+            target_runtime = runtimes[0] if runtimes else None
 
             if not target_runtime:
                 logger.error(f"Runtime version '{args.runtime_version}' not found")
@@ -134,26 +259,26 @@ def run_build_dockerfiles(args) -> Literal[1] | Literal[0]:
                     return 1
 
                 with logger.status(f"[bold green]Generating {args.image_type} image..."):
-                    dockerfile_content = engine.generate_dockerfile_for_image_type(
-                        target_runtime, args.image_type, config, registry=args.registry
+                    written = engine.artifacts.write_all(
+                        engine.render_image(target_runtime, args.image_type, registry=args.registry)
                     )
-                    dockerfile_path = engine.save_dockerfile(dockerfile_content, target_runtime, args.image_type)
-                    metadata_path = engine.save_runtime_metadata(target_runtime, args.image_type)
 
-                logger.info(f"Generated {args.image_type} Dockerfile: {dockerfile_path}")
-                logger.info(f"Generated metadata: {metadata_path}")
+                for path in written:
+                    logger.info(f"Generated {args.image_type} {path.name}: {path}")
             else:
                 # Build all image types for specific runtime
                 generated_files = engine.build_all_images_for_runtime(target_runtime, args.registry)
                 success_count = sum(1 for files in generated_files.values() if files)
                 logger.info(f"Generated {success_count}/{len(generated_files)} image types successfully")
+            # Partial builds keep the artifacts of other runtimes
+            engine.artifacts.commit()
         else:
             # Build for all runtimes
             if args.image_type:
                 logger.info(f"Building {args.image_type} images for all runtimes")
 
                 with logger.status("[bold green]Fetching runtime information..."):
-                    runtimes = engine.scraper.get_supported_runtimes()
+                    runtimes = engine.get_runtimes()
 
                 config = engine.image_types.get(args.image_type)
                 if not config:
@@ -163,16 +288,15 @@ def run_build_dockerfiles(args) -> Literal[1] | Literal[0]:
                 success_count = 0
                 for runtime in logger.progress(runtimes, description=f"Building {args.image_type} images"):
                     try:
-                        dockerfile_content = engine.generate_dockerfile_for_image_type(
-                            runtime, args.image_type, config, registry=args.registry
+                        engine.artifacts.write_all(
+                            engine.render_image(runtime, args.image_type, registry=args.registry)
                         )
-                        engine.save_dockerfile(dockerfile_content, runtime, args.image_type)
-                        engine.save_runtime_metadata(runtime, args.image_type)
                         success_count += 1
                     except Exception:
                         logger.exception(f"Failed {args.image_type} for {runtime.version}")
 
                 logger.info(f"Completed: {success_count}/{len(runtimes)} runtimes")
+                engine.artifacts.commit()
             else:
                 # Build all image types for all runtimes
                 result = engine.run(args.registry)
@@ -193,6 +317,64 @@ def run_build_dockerfiles(args) -> Literal[1] | Literal[0]:
         return 0
 
 
+def render_build(engine: RuntimeContainerEngine, args) -> tuple[dict[Path, bytes], bool] | None:
+    """Render the files a build with the given arguments would write.
+
+    Returns:
+        The rendered files and whether the build covers the complete catalog (and prunes stale files), or None if the
+        requested runtime does not exist
+    """
+    if args.runtime_version:
+        selector = RuntimeSelector(versions=frozenset([args.runtime_version]), include_ml=False)
+        runtimes = engine.get_runtimes(selector)
+        if not runtimes:
+            logger.error(f"Runtime version '{args.runtime_version}' not found")
+            return None
+        if args.image_type:
+            return engine.render_image(runtimes[0], args.image_type, registry=args.registry), False
+        return engine.render_runtime(runtimes[0], args.registry), False
+
+    if args.image_type:
+        artifacts = {}
+        for runtime in engine.get_runtimes():
+            artifacts.update(engine.render_image(runtime, args.image_type, registry=args.registry))
+        return artifacts, False
+
+    runtimes = engine.get_runtimes(engine.selector)
+    return engine.render_all(runtimes, args.registry), engine.covers_catalog
+
+
+def run_build_plan(engine: RuntimeContainerEngine, args) -> Literal[1] | Literal[0]:
+    """Compare the output directory with what a build would write, for build --plan and --check."""
+    if not args.fetch and engine.catalog_path is not None and not engine.catalog_path.exists():
+        logger.error(f"No runtime catalog at {engine.catalog_path}, run `dbx-container refresh` or pass --fetch")
+        return 1
+
+    rendered = render_build(engine, args)
+    if rendered is None:
+        return 1
+    artifacts, complete = rendered
+    plan = engine.artifacts.plan(artifacts, prune=complete)
+
+    symbols = {"create": "[green]+[/green]", "change": "[yellow]~[/yellow]", "delete": "[red]-[/red]"}
+    for change in plan.changes:
+        if change.action == "change":
+            hashes = f"{change.previous_sha256[:12]} → {change.sha256[:12]}"  # pyright: ignore[reportOptionalSubscript]
+        else:
+            hashes = (change.sha256 or change.previous_sha256 or "")[:12]
+        logger.print(f"{symbols[change.action]} {change.path} [dim]{hashes}[/dim]")
+
+    counts = f"{plan.stats.created} to create, {plan.stats.changed} to change, {plan.stats.deleted} to delete"
+    if plan.up_to_date:
+        logger.info(f"{engine.data_dir} is up to date ({plan.stats.unchanged} files)")
+        return 0
+    if args.check:
+        logger.error(f"{engine.data_dir} is out of date: {counts}")
+        return 1
+    logger.info(f"Plan: {counts}, {plan.stats.unchanged} unchanged")
+    return 0
+
+
 def setup_list_command(subparsers) -> None:
     """Setup the list runtimes command."""
     parser = subparsers.add_parser("list", help="List all available Databricks runtimes")
@@ -203,12 +385,16 @@ def setup_list_command(subparsers) -> None:
     parser.add_argument(
         "--fetch", action="store_true", help="Force fetching runtime information even if already available"
     )
+    add_cache_arguments(parser)
+    add_catalog_argument(parser)
     parser.set_defaults(func=run_list_runtimes)
 
 
 def run_list_runtimes(args) -> Literal[1] | Literal[0]:
     """Run the list runtimes command."""
     verify_ssl = not args.no_verify_ssl
+    cache_dir = get_cache_dir(args)
+    fetcher = RuntimeScraper(max_workers=args.threads, verify_ssl=verify_ssl, cache_dir=cache_dir, offline=args.offline)
 
     # Force fetch if requested
     if args.fetch:
@@ -218,11 +404,46 @@ def run_list_runtimes(args) -> Literal[1] | Literal[0]:
             )
         )
 
-        with logger.status("[bold blue]Fetching runtime information..."):
-            fetcher = RuntimeScraper(max_workers=args.threads, verify_ssl=verify_ssl)
-            fetcher.get_supported_runtimes()
+    with logger.status("[bold blue]Loading runtime information..."):
+        runtimes = get_runtimes(fetcher, Path(args.catalog), refresh=args.fetch)
+
+    return display_runtimes(runtimes, verify_ssl=verify_ssl, cache_dir=cache_dir, offline=args.offline)
+
+
+def setup_refresh_command(subparsers) -> None:
+    """Setup the refresh catalog command."""
+    parser = subparsers.add_parser("refresh", help="Scrape all runtimes and refresh the catalog snapshot")
+    parser.add_argument("--no-verify-ssl", action="store_true", help="Disable SSL certificate verification")
+    parser.add_argument(
+        "--threads", type=int, default=5, help="Number of threads to use for fetching runtime data (default: 5)"
+    )
+    add_cache_arguments(parser)
+    add_catalog_argument(parser)
+    parser.add_argument(
+        "--full", action="store_true", help="Re-parse every release instead of only those changed since the catalog"
+    )
+    parser.set_defaults(func=run_refresh_catalog)
+
+
+def run_refresh_catalog(args) -> Literal[1] | Literal[0]:
+    """Run the refresh catalog command."""
+    fetcher = RuntimeScraper(
+        max_workers=args.threads,
+        verify_ssl=not args.no_verify_ssl,
+        cache_dir=get_cache_dir(args),
+        offline=args.offline,
+    )
+
+    catalog_path = Path(args.catalog)
+    with logger.status("[bold blue]Fetching runtime information..."):
+        runtimes = get_runtimes(fetcher, catalog_path, refresh=True, incremental=not args.full)
 
-    return display_runtimes(verify_ssl=verify_ssl)
+    if not runtimes:
+        logger.error("No runtimes fetched, catalog not updated")
+        return 1
+
+    logger.info(f"Saved {len(runtimes)} runtimes to {catalog_path}")
+    return 0
 
 
 def setup_generate_matrix_command(subparsers) -> None:
@@ -247,6 +468,17 @@ def setup_generate_matrix_command(subparsers) -> None:
         type=int,
         help="Only include the N latest LTS versions in the matrix",
     )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        help="Pack the images into N jobs of similar estimated build cost, each building its images in order",
+    )
+    parser.add_argument(
+        "--durations",
+        type=str,
+        help="JSON file with recorded build durations in seconds by image name (default: build_durations.json in "
+        "the output directory)",
+    )
     parser.set_defaults(func=run_generate_matrix)
 
 
@@ -265,6 +497,8 @@ def run_generate_matrix(args) -> Literal[1] | Literal[0]:
             only_lts=args.only_lts,
             image_type=args.image_type,
             latest_lts_count=args.latest_lts_count,
+            shards=args.shards,
+            durations=engine.load_build_durations(Path(args.durations)) if args.durations else None,
         )
 
         # Output as JSON for GitHub Actions
@@ -276,6 +510,98 @@ def run_generate_matrix(args) -> Literal[1] | Literal[0]:
         return 0
 
 
+def setup_merge_manifests_command(subparsers) -> None:
+    """Setup the merge manifests command."""
+    parser = subparsers.add_parser(
+        "merge-manifests",
+        help="Combine the partial summaries of a sharded build into the build summary and remove them",
+    )
+    parser.add_argument(
+        "manifests",
+        nargs="*",
+        type=Path,
+        help="Partial build summaries of all shards (default: build_shard-*-of-*.json in the output directory)",
+    )
+    parser.add_argument(
+        "--output-dir", type=str, default="data", help="Output directory the shards were generated into (default: data)"
+    )
+    parser.set_defaults(func=run_merge_manifests)
+
+
+def run_merge_manifests(args) -> Literal[1] | Literal[0]:
+    """Run the merge manifests command."""
+    try:
+        engine = RuntimeContainerEngine(data_dir=Path(args.output_dir))
+        engine.merge_build_shards(args.manifests or None)
+    except Exception:
+        logger.exception("Error merging shard manifests")
+        return 1
+    else:
+        return 0
+
+
+def setup_diff_layers_command(subparsers) -> None:
+    """Setup the diff layers command."""
+    parser = subparsers.add_parser(
+        "diff-layers", help="Predict which image layers a build rebuilds, comparing two generated trees"
+    )
+    parser.add_argument("previous", type=Path, help="Output directory of the previous build, e.g. from main")
+    parser.add_argument(
+        "output_dir", type=Path, nargs="?", default=Path("data"), help="Output directory (default: data)"
+    )
+    parser.add_argument("--json", action="store_true", help="Print the prediction as JSON")
+    parser.set_defaults(func=run_diff_layers)
+
+
+def run_diff_layers(args) -> Literal[1] | Literal[0]:
+    """Run the diff layers command."""
+    import json
+
+    try:
+        # Nothing is fetched, verify_ssl only keeps the warning about disabled verification out of the output
+        engine = RuntimeContainerEngine(data_dir=args.output_dir, verify_ssl=True)
+        invalidations = engine.predict_rebuild(args.previous)
+    except Exception:
+        logger.exception("Error predicting invalidated layers")
+        return 1
+
+    if args.json:
+        print(
+            json.dumps(
+                [
+                    {
+                        "name": image.name,
+                        "status": image.status,
+                        "layers": len(image.layers),
+                        "rebuilt": [
+                            {"index": position, **asdict(image.layers[position])} for position in image.rebuilt
+                        ],
+                    }
+                    for image in invalidations
+                ]
+            )
+        )
+        return 0
+
+    symbols = {"added": "[green]+[/green]", "changed": "[yellow]~[/yellow]", "removed": "[red]-[/red]"}
+    for image in invalidations:
+        if image.status == "unchanged":
+            continue
+        logger.print(f"{symbols[image.status]} {image.name} [dim]{len(image.rebuilt)}/{len(image.layers)} layers[/dim]")
+        if image.status == "changed":
+            first = image.layers[image.rebuilt[0]]
+            stage = f" ({first.stage} stage)" if first.stage else ""
+            logger.print(f"    from layer {image.rebuilt[0] + 1}{stage}: [dim]{first.instruction[:100]}[/dim]")
+
+    built = [image for image in invalidations if image.status != "removed"]
+    rebuilt = [image for image in built if image.rebuilt]
+    logger.info(
+        f"{len(rebuilt)} of {len(built)} images and {sum(len(image.rebuilt) for image in built)} of "
+        f"{sum(len(image.layers) for image in built)} layers to rebuild"
+    )
+    return 0
+
+
 def main() -> Literal[1] | Literal[0]:
     """Main entry point for the CLI."""
     parser = argparse.ArgumentParser(description=f"dbx-container v{__version__}")
@@ -285,8 +611,11 @@ def main() -> Literal[1] | Literal[0]:
 
     # Add commands
     setup_list_command(subparsers)
+    setup_refresh_command(subparsers)
     setup_build_command(subparsers)
     setup_generate_matrix_command(subparsers)
+    setup_merge_manifests_command(subparsers)
+    setup_diff_layers_command(subparsers)
 
     # Parse arguments
     args = parser.parse_args()
@@ -297,8 +626,11 @@ def main() -> Literal[1] | Literal[0]:
         logger.print(text)
         logger.print("\nAvailable commands:")
         logger.print("  list            - List all available Databricks runtimes")
+        logger.print("  refresh         - Scrape all runtimes and refresh the catalog snapshot")
         logger.print("  build           - Build Dockerfiles for Databricks runtimes")
         logger.print("  generate-matrix - Generate GitHub Actions build matrix")
+        logger.print("  merge-manifests - Combine the partial summaries of a sharded build")
+        logger.print("  diff-layers     - Predict which image layers a build rebuilds")
         logger.print("Use 'dbx-container <command> --help' for more information about a command.")
         return 0
     else:
@@ -0,0 +1,347 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import Executor, ThreadPoolExecutor
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from dbx_container.data.cache import HttpCache
+from dbx_container.data.scraper import FetchTiming, RuntimeScraper
+from dbx_container.data.selection import RuntimeSelector
+from dbx_container.models.catalog import CatalogRelease, PageValidators, RuntimeCatalog
+from dbx_container.models.runtime import Runtime, RuntimeRelease
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class AsyncRuntimeScraper(RuntimeScraper):
+    """Runtime scraper built on asyncio and an async HTTP client.
+
+    Exposes the same public surface as :class:`RuntimeScraper`, but keeps all page fetches on a single event
+    loop thread, bounded by a semaphore of ``max_concurrency``. HTML parsing runs on a pool of ``max_workers``
+    threads and HTTP cache reads and writes run in worker threads, so neither blocks the event loop. The
+    synchronous methods run the event loop in a background thread and stream results like the threaded scraper,
+    use :meth:`aiter_supported_runtimes` and :meth:`aget_supported_runtimes` inside a running event loop.
+
+    Requires the optional ``httpx`` dependency (``pip install dbx-container[async]``).
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 5,
+        verify_ssl: bool = False,
+        max_concurrency: int = 50,
+        cache_dir: "Path | str | None" = None,
+        offline: bool = False,
+        cache_ttl: float = 6 * 60 * 60,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        base_url: str | None = None,
+    ) -> None:
+        """Initialize the AsyncRuntimeScraper.
+
+        Args:
+            max_workers: Number of worker threads used for HTML parsing.
+            verify_ssl: Whether to verify SSL certificates when making HTTP requests.
+            max_concurrency: Maximum number of page fetches in flight at the same time.
+            cache_dir: Directory for the persistent HTTP cache. If None, pages are always downloaded.
+            offline: Serve pages from the cache only and never touch the network.
+            cache_ttl: Number of seconds a cached page is served without revalidation.
+            max_retries: Number of retries for connection errors and 429/5xx responses.
+            backoff_factor: Base delay in seconds for the exponential backoff between retries.
+            base_url: Release notes index to scrape. Defaults to ``BASE_URL``.
+        """
+        if httpx is None:
+            raise ImportError("AsyncRuntimeScraper requires httpx, install it with `pip install dbx-container[async]`")
+        super().__init__(
+            max_workers=max_workers,
+            verify_ssl=verify_ssl,
+            cache_dir=cache_dir,
+            offline=offline,
+            cache_ttl=cache_ttl,
+            max_retries=max_retries,
+            backoff_factor=backoff_factor,
+            base_url=base_url,
+        )
+        self.max_concurrency = max_concurrency
+
+    async def _aget(
+        self, client: "httpx.AsyncClient", semaphore: asyncio.Semaphore, url: str, headers: dict[str, str]
+    ) -> tuple["httpx.Response", int]:
+        """Send a GET request, retrying connection errors and 429/5xx responses with backoff.
+
+        Returns:
+            The last response and the number of retries
+        """
+        attempt = 0
+        while True:
+            response = None
+            try:
+                async with semaphore:
+                    response = await client.get(url, headers=headers)
+            except httpx.TransportError:  # pyright: ignore[reportOptionalMemberAccess]
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if response.status_code not in self.RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response, attempt
+            await asyncio.sleep(self._retry_delay(attempt, response))
+            attempt += 1
+
+    async def _afetch_page(self, client: "httpx.AsyncClient", semaphore: asyncio.Semaphore, url: str) -> str:
+        """Fetch page content from URL, see :meth:`RuntimeScraper._fetch_page`."""
+        start = time.perf_counter()
+        entry, body = await asyncio.to_thread(self._lookup_cache, url)
+        if body is not None:
+            self._record_timing(FetchTiming(url, None, time.perf_counter() - start, cached=True))
+            return body
+
+        try:
+            response, retries = await self._aget(client, semaphore, url, HttpCache.conditional_headers(entry))
+            self._record_timing(FetchTiming(url, response.status_code, time.perf_counter() - start, retries))
+            response.raise_for_status()
+        except httpx.HTTPError:  # pyright: ignore[reportOptionalMemberAccess]
+            self.logger.exception(f"Error fetching page {url}")
+            raise
+        return await asyncio.to_thread(
+            self._handle_response, url, entry, response.status_code, response.text, response.headers
+        )
+
+    async def _arevalidate_page(
+        self,
+        client: "httpx.AsyncClient",
+        semaphore: asyncio.Semaphore,
+        url: str,
+        validators: PageValidators | None,
+    ) -> str | None:
+        """Check whether a page changed since a previous scrape, see :meth:`RuntimeScraper._revalidate_page`."""
+        if validators is None:
+            return await self._afetch_page(client, semaphore, url)
+
+        resolved, content = await asyncio.to_thread(self._revalidate_cached, url, validators)
+        if resolved:
+            return content
+
+        start = time.perf_counter()
+        response, retries = await self._aget(client, semaphore, url, self._validator_headers(validators))
+        self._record_timing(FetchTiming(url, response.status_code, time.perf_counter() - start, retries))
+        if response.status_code == 304:
+            self.page_validators[url] = validators
+            return None
+        response.raise_for_status()
+        return await asyncio.to_thread(
+            self._handle_response, url, None, response.status_code, response.text, response.headers
+        )
+
+    def _retry_delay(self, attempt: int, response: "httpx.Response | None") -> float:
+        """Compute the backoff delay, honoring a numeric ``Retry-After`` header."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return float(retry_after)
+        return self.backoff_factor * (2**attempt)
+
+    async def _aparse_runtime(
+        self,
+        client: "httpx.AsyncClient",
+        semaphore: asyncio.Semaphore,
+        parse_executor: Executor,
+        release: RuntimeRelease,
+    ) -> list[Runtime]:
+        """Fetch the base and ML pages of a release concurrently and parse them off the event loop."""
+        loop = asyncio.get_running_loop()
+        runtimes = []
+        try:
+            urls = [release.url, release.ml_url] if release.ml_url else [release.url]
+            pages = await asyncio.gather(*(self._afetch_page(client, semaphore, url) for url in urls))
+
+            runtime = await loop.run_in_executor(
+                parse_executor, self._parse_runtime_page, release, release.url, pages[0]
+            )
+            if runtime is not None:
+                runtimes.append(runtime)
+                if release.ml_url:
+                    ml_runtime = await loop.run_in_executor(
+                        parse_executor, self._parse_ml_runtime_page, release, release.ml_url, runtime, pages[1]
+                    )
+                    if ml_runtime is not None:
+                        runtimes.append(ml_runtime)
+        except Exception:
+            self.logger.exception(f"Error parsing runtime page {release.version}")
+        return runtimes
+
+    async def _aupdate_runtime(
+        self,
+        client: "httpx.AsyncClient",
+        semaphore: asyncio.Semaphore,
+        parse_executor: Executor,
+        release: RuntimeRelease,
+        previous: CatalogRelease | None,
+        previous_runtimes: list[Runtime],
+    ) -> tuple[RuntimeRelease, list[Runtime]]:
+        """Parse a release, reusing the previous catalog result, see :meth:`RuntimeScraper._update_runtime`."""
+        if previous is None or not self._is_reusable(release, previous, previous_runtimes):
+            return release, await self._aparse_runtime(client, semaphore, parse_executor, release)
+
+        self.page_validators.update(previous.validators)
+        if previous.is_end_of_support:
+            self.logger.debug(f"Reusing end-of-support release {release.version} from catalog")
+            self.reused_releases.append(release.version)
+            return release, previous_runtimes
+
+        try:
+            urls = [release.url, release.ml_url] if release.ml_url else [release.url]
+            pages = await asyncio.gather(
+                *(self._arevalidate_page(client, semaphore, url, previous.validators.get(url)) for url in urls)
+            )
+        except Exception:
+            self.logger.exception(f"Error revalidating runtime pages of {release.version}, keeping previous result")
+            return release, previous_runtimes
+        ml_content = pages[1] if release.ml_url else None
+        runtimes = await asyncio.get_running_loop().run_in_executor(
+            parse_executor, self._reparse_release, release, previous_runtimes, pages[0], ml_content
+        )
+        return release, runtimes
+
+    async def _aiter_release_results(
+        self, previous: RuntimeCatalog | None = None, selector: RuntimeSelector | None = None
+    ) -> AsyncIterator[tuple[RuntimeRelease, list[Runtime]]]:
+        """Scrape all releases concurrently and yield each release with its runtimes as soon as it is parsed."""
+        self.reused_releases = []
+        self.failed_releases = []
+        previous_releases = {entry.release.version: entry for entry in previous.releases} if previous else {}
+        previous_by_url = {runtime.url: runtime for runtime in previous.runtimes} if previous else {}
+        # Selected releases that were not processed yet
+        pending: set[str] = set()
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        limits = httpx.Limits(  # pyright: ignore[reportOptionalMemberAccess]
+            max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency
+        )
+        try:
+            async with httpx.AsyncClient(  # pyright: ignore[reportOptionalMemberAccess]
+                verify=self.verify_ssl, timeout=30, limits=limits, follow_redirects=True
+            ) as client:
+                with ThreadPoolExecutor(
+                    max_workers=max(1, self.max_workers), thread_name_prefix="runtime-parse"
+                ) as parse_executor:
+                    self.logger.info("Fetching runtime version links")
+                    content = await self._afetch_page(client, semaphore, self.BASE_URL)
+                    releases = await loop.run_in_executor(parse_executor, self._scrape_runtime_links, content)
+                    if selector is not None:
+                        releases = selector.select_releases(releases)
+                        self.logger.info(f"Selected {len(releases)} releases")
+                    self.releases = releases
+                    pending.update(release.version for release in releases)
+
+                    tasks = [
+                        asyncio.ensure_future(
+                            self._aupdate_runtime(
+                                client,
+                                semaphore,
+                                parse_executor,
+                                release,
+                                previous_releases.get(release.version),
+                                [
+                                    previous_by_url[url]
+                                    for url in (release.url, release.ml_url)
+                                    if url in previous_by_url
+                                ],
+                            )
+                        )
+                        for release in releases
+                    ]
+                    try:
+                        for task in asyncio.as_completed(tasks):
+                            release, runtimes = await task
+                            self.logger.debug(f"Processed runtime release {release.version}")
+                            pending.discard(release.version)
+                            if len(runtimes) < (2 if release.ml_url else 1):
+                                self.failed_releases.append(release.version)
+                            yield release, runtimes
+                    finally:
+                        # Don't keep scraping if the consumer stopped early
+                        for task in tasks:
+                            task.cancel()
+                        await asyncio.gather(*tasks, return_exceptions=True)
+
+            if previous is not None:
+                self.logger.info(
+                    f"Reused {len(self.reused_releases)}/{len(releases)} unchanged releases from the previous catalog"
+                )
+            self.log_timing_summary()
+        except Exception:
+            self.logger.exception("Error scraping runtimes")
+            self.failed_releases.extend(sorted(pending))
+
+    def _iter_release_results(
+        self, previous: RuntimeCatalog | None = None, selector: RuntimeSelector | None = None
+    ) -> Iterator[tuple[RuntimeRelease, list[Runtime]]]:
+        """Run the async scrape on an event loop in a background thread and yield each release as it is parsed.
+
+        The loop keeps fetching the remaining pages while the consumer processes a release.
+        """
+        results = self._aiter_release_results(previous, selector)
+
+        async def next_result() -> tuple[RuntimeRelease, list[Runtime]]:
+            return await anext(results)
+
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name="runtime-scrape", daemon=True)
+        thread.start()
+        try:
+            while True:
+                try:
+                    result = asyncio.run_coroutine_threadsafe(next_result(), loop).result()
+                except StopAsyncIteration:
+                    return
+                yield result
+        finally:
+            asyncio.run_coroutine_threadsafe(results.aclose(), loop).result()
+            asyncio.run_coroutine_threadsafe(loop.shutdown_default_executor(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    async def aiter_supported_runtimes(
+        self, previous: RuntimeCatalog | None = None, selector: RuntimeSelector | None = None
+    ) -> AsyncIterator[Runtime]:
+        """Yield runtimes as soon as their release pages are parsed, see :meth:`RuntimeScraper.iter_supported_runtimes`.
+
+        Args:
+            previous: Catalog of a previous scrape. Releases whose row and pages did not change since are reused
+                from it instead of being fetched and parsed again.
+            selector: Only fetch the pages of releases matching this selection.
+
+        Yields:
+            Runtime objects with information about each runtime version
+        """
+        count = 0
+        async for release, runtimes in self._aiter_release_results(previous, selector):
+            if not runtimes:
+                self.logger.warning(f"Could not parse runtime info for {release.version}")
+            count += len(runtimes)
+            for runtime in runtimes:
+                yield runtime
+        self.logger.info(f"Successfully fetched {count} runtime versions")
+
+    async def aget_supported_runtimes(
+        self, previous: RuntimeCatalog | None = None, selector: RuntimeSelector | None = None
+    ) -> list[Runtime]:
+        """Scrape information for all available Databricks runtime versions.
+
+        Args:
+            previous: Catalog of a previous scrape. Releases whose row and pages did not change since are reused
+                from it instead of being fetched and parsed again.
+            selector: Only fetch the pages of releases matching this selection.
+
+        Returns:
+            List of Runtime objects with information about each runtime version, sorted by :meth:`sort_runtimes`
+        """
+        return self.sort_runtimes([runtime async for runtime in self.aiter_supported_runtimes(previous, selector)])
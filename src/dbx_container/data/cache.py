@@ -0,0 +1,135 @@
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+import time
+
+from dbx_container.utils.fileio import atomic_write_text
+from dbx_container.utils.logging import get_logger
+
+
+def default_cache_dir() -> Path:
+    """Return the default cache directory, honoring ``XDG_CACHE_HOME``."""
+    base = os.environ.get("XDG_CACHE_HOME")
+    return (Path(base) if base else Path.home() / ".cache") / "dbx-container"
+
+
+@dataclass
+class CacheEntry:
+    """A cached HTTP response body with its validators."""
+
+    url: str
+    body: str
+    etag: str | None = None
+    last_modified: str | None = None
+    fetched_at: float = 0.0
+
+
+class HttpCache:
+    """Disk-backed HTTP response cache keyed by URL.
+
+    Each entry is stored as a single JSON file holding the body and the ``ETag``/``Last-Modified`` validators.
+    Entries younger than ``ttl`` seconds are served without touching the network; older entries are revalidated
+    with a conditional request. When the cache grows beyond ``max_size`` bytes, the least recently validated
+    entries are evicted.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | str,
+        ttl: float = 6 * 60 * 60,
+        max_size: int = 256 * 1024 * 1024,
+    ) -> None:
+        """Initialize the HttpCache.
+
+        Args:
+            cache_dir: Directory where cache entries are stored
+            ttl: Number of seconds an entry is served without revalidation
+            max_size: Maximum total size of the cache in bytes before entries are evicted
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, url: str) -> CacheEntry | None:
+        """Return the cached entry for a URL, or None if it is missing or unreadable."""
+        path = self._path(url)
+        try:
+            data = json.loads(path.read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            self.logger.warning(f"Discarding corrupt cache entry {path}")
+            path.unlink(missing_ok=True)
+            return None
+        entry = CacheEntry(**data)
+        return entry if entry.url == url else None
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Check whether an entry can be served without revalidation."""
+        return time.time() - entry.fetched_at < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry | None) -> dict[str, str]:
+        """Build the conditional request headers used to revalidate an entry."""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, url: str, body: str, etag: str | None = None, last_modified: str | None = None) -> CacheEntry:
+        """Store a response body and its validators, evicting old entries if needed."""
+        entry = CacheEntry(url=url, body=body, etag=etag, last_modified=last_modified, fetched_at=time.time())
+        self._write(entry)
+        self.evict()
+        return entry
+
+    def touch(self, entry: CacheEntry) -> CacheEntry:
+        """Mark an entry as revalidated (e.g. after a 304 response)."""
+        entry.fetched_at = time.time()
+        self._write(entry)
+        return entry
+
+    def _write(self, entry: CacheEntry) -> None:
+        atomic_write_text(self._path(entry.url), json.dumps(asdict(entry)), fsync=False)
+
+    def evict(self) -> int:
+        """Evict the least recently validated entries until the cache fits into ``max_size``.
+
+        Returns:
+            Number of evicted entries
+        """
+        with self._lock:
+            files = []
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in files)
+            evicted = 0
+            for _, size, path in sorted(files):
+                if total <= self.max_size:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                evicted += 1
+
+        if evicted:
+            self.logger.debug(f"Evicted {evicted} cache entries from {self.cache_dir}")
+        return evicted
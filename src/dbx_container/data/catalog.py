@@ -0,0 +1,184 @@
+from collections.abc import Iterator
+from datetime import UTC, datetime
+import json
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from dbx_container.data.scraper import RuntimeScraper
+from dbx_container.data.selection import RuntimeSelector
+from dbx_container.models.catalog import CATALOG_SCHEMA_VERSION, CatalogRelease, RuntimeCatalog
+from dbx_container.models.runtime import Runtime
+from dbx_container.utils.fileio import atomic_write_text
+from dbx_container.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Default file name of the catalog snapshot inside the output directory
+CATALOG_FILENAME = "runtime_catalog.json"
+
+
+def load_catalog(path: Path) -> RuntimeCatalog | None:
+    """Load a runtime catalog snapshot.
+
+    Args:
+        path: Path to the catalog file
+
+    Returns:
+        The catalog, or None if it does not exist, is unreadable or was written with another schema version
+    """
+    try:
+        content = path.read_text()
+        data = json.loads(content)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        logger.warning(f"Ignoring unreadable runtime catalog {path}")
+        return None
+
+    schema_version = data.get("schema_version") if isinstance(data, dict) else None
+    if schema_version != CATALOG_SCHEMA_VERSION:
+        logger.warning(
+            f"Ignoring runtime catalog {path} with schema version {schema_version} (expected {CATALOG_SCHEMA_VERSION})"
+        )
+        return None
+
+    try:
+        return RuntimeCatalog.model_validate_json(content)
+    except ValidationError:
+        logger.warning(f"Ignoring invalid runtime catalog {path}")
+        return None
+
+
+def save_catalog(
+    runtimes: list[Runtime], path: Path, source_url: str, releases: list[CatalogRelease] | None = None
+) -> RuntimeCatalog:
+    """Atomically write a runtime catalog snapshot.
+
+    Args:
+        runtimes: The scraped runtimes
+        path: Path to the catalog file
+        source_url: The release notes index the runtimes were scraped from
+        releases: Fingerprints and page validators of the scraped releases, used for incremental scrapes
+
+    Returns:
+        The saved catalog
+    """
+    catalog = RuntimeCatalog(
+        generated_at=datetime.now(UTC), source_url=source_url, runtimes=runtimes, releases=releases or []
+    )
+    atomic_write_text(path, catalog.model_dump_json(indent=2))
+    logger.debug(f"Saved runtime catalog with {len(runtimes)} runtimes to {path}")
+    return catalog
+
+
+def _save_scraped(
+    scraper: RuntimeScraper,
+    runtimes: list[Runtime],
+    path: Path,
+    previous: RuntimeCatalog | None,
+) -> None:
+    if not runtimes:
+        logger.warning(f"No runtimes scraped, keeping existing catalog at {path}")
+        return
+
+    releases = scraper.catalog_releases()
+    if scraper.failed_releases and previous is not None:
+        # Keep the last good result of releases that failed to parse, with the validators it was parsed from, so
+        # they are neither dropped from the catalog nor reused as is by the next incremental scrape
+        failed = set(scraper.failed_releases)
+        logger.warning(f"Keeping the previous catalog entries of {len(failed)} releases that failed to parse")
+        scraped = {runtime.url for runtime in runtimes}
+        runtimes = [
+            *runtimes,
+            *(runtime for runtime in previous.runtimes if runtime.version in failed and runtime.url not in scraped),
+        ]
+        previous_releases = {entry.release.version: entry for entry in previous.releases}
+        releases = [
+            previous_releases.get(entry.release.version, entry) if entry.release.version in failed else entry
+            for entry in releases
+        ]
+    save_catalog(RuntimeScraper.sort_runtimes(runtimes), path, scraper.BASE_URL, releases)
+
+
+def _load_current(path: Path, refresh: bool) -> tuple[RuntimeCatalog | None, bool]:
+    """Load the catalog and decide whether it can be used as is."""
+    catalog = load_catalog(path)
+    if catalog is not None and not refresh:
+        logger.debug(
+            f"Loaded {len(catalog.runtimes)} runtimes from {path} (generated {catalog.generated_at.isoformat()})"
+        )
+        return catalog, True
+    return catalog, False
+
+
+def get_runtimes(
+    scraper: RuntimeScraper,
+    path: Path,
+    refresh: bool = False,
+    incremental: bool = True,
+    selector: RuntimeSelector | None = None,
+) -> list[Runtime]:
+    """Load runtimes from the catalog snapshot, scraping and saving a new snapshot if needed.
+
+    Args:
+        scraper: Scraper used when the catalog is missing, outdated or a refresh is requested
+        path: Path to the catalog file
+        refresh: Always scrape and overwrite the catalog
+        incremental: When refreshing, only re-parse releases that changed since the existing catalog
+        selector: Only return matching runtimes. Scrapes always cover all releases so that the saved catalog is
+            complete.
+
+    Returns:
+        List of runtimes, newest release first
+    """
+    catalog, current = _load_current(path, refresh)
+    if current:
+        runtimes = catalog.runtimes  # pyright: ignore[reportOptionalMemberAccess]
+    else:
+        runtimes = scraper.get_supported_runtimes(previous=catalog if incremental else None)
+        _save_scraped(scraper, runtimes, path, catalog)
+    return selector.select_runtimes(runtimes) if selector is not None else runtimes
+
+
+def iter_runtimes(
+    scraper: RuntimeScraper,
+    path: Path,
+    refresh: bool = False,
+    incremental: bool = True,
+    selector: RuntimeSelector | None = None,
+) -> Iterator[Runtime]:
+    """Streaming variant of :func:`get_runtimes`.
+
+    Scraped runtimes are yielded as soon as they are parsed, in completion order. The new snapshot is saved once
+    the scrape is complete.
+
+    Args:
+        scraper: Scraper used when the catalog is missing, outdated or a refresh is requested
+        path: Path to the catalog file
+        refresh: Always scrape and overwrite the catalog
+        incremental: When refreshing, only re-parse releases that changed since the existing catalog
+        selector: Only yield matching runtimes. Scrapes always cover all releases so that the saved catalog is
+            complete.
+
+    Yields:
+        Runtimes, newest release first if loaded from the catalog
+    """
+    catalog, current = _load_current(path, refresh)
+    if current:
+        runtimes = catalog.runtimes  # pyright: ignore[reportOptionalMemberAccess]
+        yield from selector.select_runtimes(runtimes) if selector is not None else runtimes
+        return
+
+    runtimes = []
+    selected: set[str] | None = None
+    for runtime in scraper.iter_supported_runtimes(previous=catalog if incremental else None):
+        runtimes.append(runtime)
+        if selector is not None:
+            if selected is None:
+                # The release index is scraped before the first runtime is parsed
+                selected = {release.version for release in selector.select_releases(scraper.releases)}
+            if runtime.version not in selected or (runtime.is_ml and not selector.include_ml):
+                continue
+        yield runtime
+    _save_scraped(scraper, runtimes, path, catalog)
@@ -0,0 +1,128 @@
+from lxml import html
+from lxml.etree import XPath, _Element
+
+from dbx_container.models.environment import SystemEnvironment
+
+# Section anchors used on runtime pages, mapped to the library language they describe. Earlier ids take precedence.
+LIBRARY_SECTIONS = {
+    "installed-python-libraries": "python",
+    "python-libraries": "python",  # For ML runtimes
+    "python-libraries-on-cpu-clusters": "python",  # Alternative for ML runtimes
+    "installed-r-libraries": "r",
+    "r-libraries": "r",  # For ML runtimes
+}
+SYSTEM_ENVIRONMENT_SECTION = "system-environment"
+SYSTEM_ENVIRONMENT_ENTRIES = ("operating system", "java", "scala", "python", "r", "delta lake")
+
+_ANCHORS = XPath(
+    "//*[" + " or ".join(f"@id='{anchor}'" for anchor in [SYSTEM_ENVIRONMENT_SECTION, *LIBRARY_SECTIONS]) + "]"
+)
+# Equivalent of BeautifulSoup's ``find_next(tag)``: the first matching element after the start tag in document order
+_NEXT_UL = XPath("(descendant::ul | following::ul)[1]")
+_NEXT_TABLE = XPath("(descendant::table | following::table)[1]")
+
+
+def _text(element: _Element) -> str:
+    return element.text_content().strip()
+
+
+class RuntimePage:
+    """Targeted view of a runtime release notes page.
+
+    The page is parsed once into an lxml tree and a single XPath query locates every section anchor the scraper
+    needs, so extracting the system environment and library tables does not walk the whole document again. The
+    results are identical to the BeautifulSoup based parsing in :class:`RuntimeScraper`.
+    """
+
+    def __init__(self, content: str) -> None:
+        """Initialize the RuntimePage.
+
+        Args:
+            content: HTML content of the runtime page
+        """
+        self.root = html.document_fromstring(content.encode(), parser=html.HTMLParser(encoding="utf-8"))
+        self.anchors: dict[str, _Element] = {}
+        for element in _ANCHORS(self.root):
+            self.anchors.setdefault(element.get("id"), element)
+
+    @property
+    def is_beta(self) -> bool:
+        """Whether the page describes a Beta release."""
+        return "Beta" in (self.root.findtext("head/title") or "")
+
+    def _system_environment_lists(self) -> tuple[_Element | None, _Element | None]:
+        """Return the system environment list and the (GPU) list following it."""
+        section = self.anchors.get(SYSTEM_ENVIRONMENT_SECTION)
+        if section is None:
+            return None, None
+        first = next(iter(_NEXT_UL(section)), None)
+        if first is None:
+            return None, None
+        return first, next(iter(_NEXT_UL(first)), None)
+
+    def system_environment(self) -> SystemEnvironment | None:
+        """Parse the system environment section."""
+        ul, _ = self._system_environment_lists()
+        if ul is None:
+            return None
+
+        versions = {}
+        for li in ul.iter("li"):
+            strong = next(li.iter("strong"), None)
+            if strong is None:
+                continue
+            name = _text(strong).lower()
+            if name in SYSTEM_ENVIRONMENT_ENTRIES and name not in versions:
+                versions[name] = _text(li).split(": ")[1]
+
+        return SystemEnvironment(
+            operating_system=versions.get("operating system") or "",
+            java_version=versions.get("java") or "",
+            scala_version=versions.get("scala") or "",
+            python_version=versions.get("python") or "",
+            r_version=versions.get("r") or "",
+            delta_lake_version=versions.get("delta lake") or "",
+        )
+
+    def included_libraries(self) -> dict[str, dict[str, str | tuple[str, str]]]:
+        """Parse the included library tables, keyed by language."""
+        libraries = {}
+        parsed_languages = set()
+        for id_name, lang in LIBRARY_SECTIONS.items():
+            if lang in parsed_languages:
+                continue
+            libraries[lang] = {}
+            section = self.anchors.get(id_name)
+            if section is None:
+                continue
+            table = next(iter(_NEXT_TABLE(section)), None)
+            if table is None:
+                continue
+            entries = list(table.iter("tr"))
+            if not entries:
+                continue
+            headers = [_text(col) for col in entries[0].iter("th")]
+
+            multi_col = int(len(headers) / len(set(headers)))
+            for row in entries[1:]:
+                cells = list(row.iter("td"))
+                for i in range(0, multi_col):
+                    library = _text(cells[i * 2])
+                    version = _text(cells[(i * 2) + 1])
+                    if library:
+                        libraries[lang][library] = version
+
+            parsed_languages.add(lang)
+
+        return libraries
+
+    def gpu_libraries(self) -> dict[str, str]:
+        """Parse the GPU library list that follows the system environment on ML pages."""
+        _, ul = self._system_environment_lists()
+        if ul is None:
+            return {}
+        libraries = {}
+        for li in ul.iter("li"):
+            text = _text(li).lower().split(" ")
+            libraries[text[0]] = text[1]
+        return libraries
@@ -1,21 +1,47 @@
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import date, datetime
+from functools import partial
 from pathlib import Path
+import threading
+import time
 from urllib.parse import urlparse, urlunparse
 import warnings
 
 from bs4 import BeautifulSoup
 import requests
+from requests.adapters import HTTPAdapter
 from rich.panel import Panel
 from rich.table import Table
+from urllib3.util.retry import Retry
 
+from dbx_container.data.cache import CacheEntry, HttpCache
+from dbx_container.data.page_parser import RuntimePage
+from dbx_container.data.selection import RuntimeSelector
+from dbx_container.models.catalog import CatalogRelease, PageValidators, RuntimeCatalog
 from dbx_container.models.environment import SystemEnvironment
 from dbx_container.models.runtime import Runtime, RuntimeRelease
 from dbx_container.utils.logging import get_logger
 
 
+@dataclass
+class FetchTiming:
+    """Timing information for a single page fetch."""
+
+    url: str
+    status: int | None
+    elapsed: float
+    retries: int = 0
+    cached: bool = False
+
+
 class RuntimeScraper:
     """Class for scraping Databricks runtime information from documentation."""
 
+    # Status codes that are retried with exponential backoff
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
     # Base URL for the Databricks runtime documentation
     BASE_URL = "https://docs.databricks.com/aws/en/release-notes/runtime/"
 
@@ -23,32 +49,207 @@ class RuntimeScraper:
         self,
         max_workers: int = 5,
         verify_ssl: bool = False,
+        cache_dir: Path | str | None = None,
+        offline: bool = False,
+        cache_ttl: float = 6 * 60 * 60,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        pool_size: int | None = None,
+        base_url: str | None = None,
+        fast_parser: bool = True,
     ) -> None:
         """Initialize the RuntimeScraper.
 
         Args:
             max_workers: Maximum number of worker threads to use for fetching runtime data.
             verify_ssl: Whether to verify SSL certificates when making HTTP requests.
+            cache_dir: Directory for the persistent HTTP cache. If None, pages are always downloaded.
+            offline: Serve pages from the cache only and never touch the network.
+            cache_ttl: Number of seconds a cached page is served without revalidation.
+            max_retries: Number of retries for connection errors and 429/5xx responses.
+            backoff_factor: Base delay in seconds for the exponential backoff between retries.
+            pool_size: Number of pooled connections per host. Defaults to twice ``max_workers``, since base and ML
+                pages are fetched by separate worker pools.
+            base_url: Release notes index to scrape, e.g. the Azure or GCP documentation tree.
+                Defaults to ``BASE_URL``.
+            fast_parser: Parse runtime pages with the targeted lxml parser (:class:`RuntimePage`) instead of
+                building full BeautifulSoup trees.
         """
         self.logger = get_logger(self.__class__.__name__)
         self.max_workers = max_workers
+        self.fast_parser = fast_parser
         self.verify_ssl = verify_ssl
+        self.offline = offline
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        if base_url is not None:
+            self.BASE_URL = base_url
+        self.cache = HttpCache(cache_dir, ttl=cache_ttl) if cache_dir is not None else None
+
+        if offline and self.cache is None:
+            raise ValueError("Offline mode requires a cache directory")
+
+        self.session = self._create_session(max_retries, backoff_factor, pool_size or 2 * max(1, max_workers))
+        self.timings: list[FetchTiming] = []
+        self._timings_lock = threading.Lock()
+
+        # State of the last scrape, used to build incremental catalog snapshots
+        self.releases: list[RuntimeRelease] = []
+        self.page_validators: dict[str, PageValidators] = {}
+        self.reused_releases: list[str] = []
+        # Releases whose base or ML runtime could not be parsed
+        self.failed_releases: list[str] = []
 
         # Suppress InsecureRequestWarning if SSL verification is disabled
         if not verify_ssl:
             warnings.filterwarnings("ignore", "Unverified HTTPS request")
             self.logger.warning("SSL certificate verification is disabled")
 
+    def _create_session(self, max_retries: int, backoff_factor: float, pool_size: int) -> requests.Session:
+        """Create a keep-alive session with a connection pool and retry policy."""
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=self.RETRY_STATUS_CODES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _record_timing(self, timing: FetchTiming) -> None:
+        with self._timings_lock:
+            self.timings.append(timing)
+
+    def log_timing_summary(self) -> None:
+        """Log where scrape time went, based on the recorded fetch timings."""
+        with self._timings_lock:
+            timings = list(self.timings)
+        if not timings:
+            return
+        network = [t for t in timings if not t.cached]
+        total = sum(t.elapsed for t in network)
+        retries = sum(t.retries for t in network)
+        self.logger.info(
+            f"Fetched {len(timings)} pages ({len(timings) - len(network)} from cache, {retries} retries), "
+            f"{total:.2f}s total network time"
+        )
+        for timing in sorted(network, key=lambda t: t.elapsed, reverse=True)[:5]:
+            self.logger.debug(f"{timing.elapsed:.2f}s [{timing.status}] {timing.url}")
+
+    def _lookup_cache(self, url: str) -> tuple[CacheEntry | None, str | None]:
+        """Look up a URL in the HTTP cache.
+
+        Returns:
+            The cached entry (if any) and its body when it can be served without a request.
+        """
+        entry = self.cache.get(url) if self.cache is not None else None
+        if entry is not None and (self.offline or self.cache.is_fresh(entry)):  # pyright: ignore[reportOptionalMemberAccess]
+            self.logger.debug(f"Serving {url} from cache")
+            self._record_validators(url, entry.etag, entry.last_modified)
+            return entry, entry.body
+        if self.offline:
+            raise requests.exceptions.ConnectionError(f"{url} is not cached and offline mode is enabled")
+        return entry, None
+
+    def _record_validators(self, url: str, etag: str | None, last_modified: str | None) -> None:
+        if etag or last_modified:
+            self.page_validators[url] = PageValidators(etag=etag, last_modified=last_modified)
+
+    def _handle_response(
+        self, url: str, entry: CacheEntry | None, status_code: int, text: str, headers: Mapping[str, str]
+    ) -> str:
+        """Resolve a successful (or 304) response to the page body and update the cache."""
+        if status_code == 304 and entry is not None:
+            self.logger.debug(f"Revalidated cached {url}")
+            self._record_validators(url, entry.etag, entry.last_modified)
+            return self.cache.touch(entry).body  # pyright: ignore[reportOptionalMemberAccess]
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        self._record_validators(url, etag, last_modified)
+        if self.cache is not None:
+            self.cache.store(url, text, etag=etag, last_modified=last_modified)
+        return text
+
     def _fetch_page(self, url: str) -> str:
-        """Fetch page content from URL."""
+        """Fetch page content from URL.
+
+        If a cache is configured, fresh entries are served from disk and stale entries are revalidated with
+        ``If-None-Match``/``If-Modified-Since``, so unchanged pages only cost a 304 response.
+        """
+        start = time.perf_counter()
+        entry, body = self._lookup_cache(url)
+        if body is not None:
+            self._record_timing(FetchTiming(url, None, time.perf_counter() - start, cached=True))
+            return body
+
         try:
-            response = requests.get(url, timeout=30, verify=self.verify_ssl)
+            response = self.session.get(
+                url, headers=HttpCache.conditional_headers(entry), timeout=30, verify=self.verify_ssl
+            )
+            history = getattr(getattr(response.raw, "retries", None), "history", ())
+            self._record_timing(FetchTiming(url, response.status_code, time.perf_counter() - start, len(history)))
             response.raise_for_status()
-            return response.text  # noqa: TRY300
+            return self._handle_response(url, entry, response.status_code, response.text, response.headers)
         except requests.exceptions.RequestException:
             self.logger.exception(f"Error fetching page {url}")
             raise
 
+    def _revalidate_cached(self, url: str, validators: PageValidators) -> tuple[bool, str | None]:
+        """Revalidate a page against a fresh cache entry, or keep the previous result in offline mode.
+
+        Returns:
+            Whether the page was resolved without a request, and its content if it changed
+        """
+        entry = self.cache.get(url) if self.cache is not None else None
+        if entry is not None and (self.offline or self.cache.is_fresh(entry)):  # pyright: ignore[reportOptionalMemberAccess]
+            self._record_validators(url, entry.etag, entry.last_modified)
+            unchanged = (entry.etag, entry.last_modified) == (validators.etag, validators.last_modified)
+            return True, None if unchanged else entry.body
+        if self.offline:
+            # Nothing to compare against without network access, keep the previous result
+            self.page_validators[url] = validators
+            return True, None
+        return False, None
+
+    @staticmethod
+    def _validator_headers(validators: PageValidators) -> dict[str, str]:
+        """Build the conditional request headers that check a page against the validators of a previous scrape."""
+        headers = {}
+        if validators.etag:
+            headers["If-None-Match"] = validators.etag
+        if validators.last_modified:
+            headers["If-Modified-Since"] = validators.last_modified
+        return headers
+
+    def _revalidate_page(self, url: str, validators: PageValidators | None) -> str | None:
+        """Check whether a page changed since it was scraped with the given validators.
+
+        Returns:
+            None if the page is unchanged, otherwise its current content
+        """
+        if validators is None:
+            return self._fetch_page(url)
+
+        resolved, content = self._revalidate_cached(url, validators)
+        if resolved:
+            return content
+
+        start = time.perf_counter()
+        response = self.session.get(
+            url, headers=self._validator_headers(validators), timeout=30, verify=self.verify_ssl
+        )
+        history = getattr(getattr(response.raw, "retries", None), "history", ())
+        self._record_timing(FetchTiming(url, response.status_code, time.perf_counter() - start, len(history)))
+        if response.status_code == 304:
+            self.page_validators[url] = validators
+            return None
+        response.raise_for_status()
+        return self._handle_response(url, None, response.status_code, response.text, response.headers)
+
     def _parse_date(self, date_str: str) -> date | str:
         parts = date_str.split(maxsplit=1)  # Split into first word and the rest
         if len(parts) == 2:
@@ -58,15 +259,19 @@ class RuntimeScraper:
             return datetime.strptime(fixed_date_str, "%b %d, %Y").date()
         return date_str
 
-    def _scrape_runtime_links(self) -> list[RuntimeRelease]:
+    def _scrape_runtime_links(self, content: str | None = None) -> list[RuntimeRelease]:
         """Get links to individual runtime versions from the main page.
 
+        Args:
+            content: Pre-fetched content of the main page. Fetched from ``BASE_URL`` if not provided.
+
         Returns:
             List of RuntimeRelease objects containing version information
         """
         releases = []
         try:
-            content = self._fetch_page(self.BASE_URL)
+            if content is None:
+                content = self._fetch_page(self.BASE_URL)
             soup = BeautifulSoup(content, "lxml")
 
             section = soup.find(id="all-supported-databricks-runtime-releases")
@@ -208,18 +413,38 @@ class RuntimeScraper:
 
         return libraries
 
-    def _parse_runtime_page(self, release: RuntimeRelease, url: str) -> Runtime | None:
-        content = self._fetch_page(url)
+    def _parse_page_system_environment(self, page: RuntimePage) -> SystemEnvironment | None:
+        """Parse system environment information with the targeted lxml parser."""
+        try:
+            return page.system_environment()
+        except Exception:
+            self.logger.exception("Error parsing system environment")
+        return None
+
+    def _parse_page_included_libraries(self, page: RuntimePage) -> dict[str, dict[str, str | tuple[str, str]]]:
+        """Parse included libraries with the targeted lxml parser."""
+        if page.is_beta:
+            self.logger.warning("The contents of the supported environments might change during the Beta")
+        return page.included_libraries()
+
+    def _parse_runtime_page(self, release: RuntimeRelease, url: str, content: str | None = None) -> Runtime | None:
+        if content is None:
+            content = self._fetch_page(url)
         is_ml = url.endswith("ml")
         is_lts = "lts" in url
-        soup = BeautifulSoup(content, "lxml")
-
-        system_env = self._parse_system_environment(soup, is_ml)
+        if self.fast_parser:
+            page = RuntimePage(content)
+            system_env = self._parse_page_system_environment(page)
+            parse_libraries = partial(self._parse_page_included_libraries, page)
+        else:
+            soup = BeautifulSoup(content, "lxml")
+            system_env = self._parse_system_environment(soup, is_ml)
+            parse_libraries = partial(self._parse_included_libraries, soup)
         if not system_env:
             self.logger.warning(f"Could not parse system environment for {url}")
             return None
 
-        included_libraries = self._parse_included_libraries(soup)
+        included_libraries = parse_libraries()
 
         runtime = Runtime(
             version=release.version,
@@ -253,16 +478,23 @@ class RuntimeScraper:
             libraries[text[0]] = text[1]
         return libraries
 
-    def _parse_ml_runtime_page(self, release: RuntimeRelease, url: str, runtime_base: Runtime) -> Runtime | None:
-        content = self._fetch_page(url)
+    def _parse_ml_runtime_page(
+        self, release: RuntimeRelease, url: str, runtime_base: Runtime, content: str | None = None
+    ) -> Runtime | None:
+        if content is None:
+            content = self._fetch_page(url)
         is_ml = url.endswith("ml")
         is_lts = "lts" in url
-        soup = BeautifulSoup(content, "lxml")
-
-        # Parse ML-specific libraries (includes ML Python packages)
-        included_libraries = self._parse_included_libraries(soup)
-        # Add GPU libraries specific to ML runtime
-        included_libraries["gpu"] = self._parse_gpu_libraries(soup)  # pyright: ignore[reportArgumentType]
+        if self.fast_parser:
+            page = RuntimePage(content)
+            included_libraries = self._parse_page_included_libraries(page)
+            included_libraries["gpu"] = page.gpu_libraries()  # pyright: ignore[reportArgumentType]
+        else:
+            soup = BeautifulSoup(content, "lxml")
+            # Parse ML-specific libraries (includes ML Python packages)
+            included_libraries = self._parse_included_libraries(soup)
+            # Add GPU libraries specific to ML runtime
+            included_libraries["gpu"] = self._parse_gpu_libraries(soup)  # pyright: ignore[reportArgumentType]
 
         runtime = Runtime(
             version=release.version,
@@ -277,55 +509,255 @@ class RuntimeScraper:
         )
         return runtime
 
-    def _parse_runtime(self, release: RuntimeRelease) -> list[Runtime]:
-        """Parse a single runtime version page and return Runtime object."""
+    def _parse_runtime(self, release: RuntimeRelease, fetch_executor: Executor | None = None) -> list[Runtime]:
+        """Parse a single runtime version page and return Runtime object.
+
+        Args:
+            release: The release whose base (and ML) pages should be parsed.
+            fetch_executor: Optional executor used to fetch the ML page while the base page is fetched and parsed.
+        """
         runtimes = []
+        ml_future: Future[str] | None = None
         try:
+            if release.ml_url and fetch_executor is not None:
+                ml_future = fetch_executor.submit(self._fetch_page, release.ml_url)
             runtime = self._parse_runtime_page(release, release.url)
             if runtime is not None:
                 runtimes.append(runtime)
                 if release.ml_url:
-                    ml_runtime = self._parse_ml_runtime_page(release, release.ml_url, runtime)
+                    ml_content = ml_future.result() if ml_future is not None else None
+                    ml_runtime = self._parse_ml_runtime_page(release, release.ml_url, runtime, content=ml_content)
                     if ml_runtime is not None:
                         runtimes.append(ml_runtime)
         except Exception:
             self.logger.exception(f"Error parsing runtime page {release.version}")
+        finally:
+            if ml_future is not None:
+                ml_future.cancel()
         return runtimes
 
-    def get_supported_runtimes(self) -> list[Runtime]:
-        """Scrape information for all available Databricks runtime versions.
+    def _update_runtime(
+        self,
+        release: RuntimeRelease,
+        previous: CatalogRelease | None,
+        previous_runtimes: list[Runtime],
+        fetch_executor: Executor | None = None,
+    ) -> list[Runtime]:
+        """Parse a release, reusing the previous catalog result if neither its row nor its pages changed.
+
+        End-of-support releases with an unchanged row are reused without any request. Other unchanged rows are
+        revalidated with the stored page validators, and only pages that changed are parsed again.
+        """
+        if previous is None or not self._is_reusable(release, previous, previous_runtimes):
+            return self._parse_runtime(release, fetch_executor)
 
-        Returns:
-            List of Runtime objects with information about each runtime version
+        self.page_validators.update(previous.validators)
+        if previous.is_end_of_support:
+            self.logger.debug(f"Reusing end-of-support release {release.version} from catalog")
+            self.reused_releases.append(release.version)
+            return previous_runtimes
+
+        ml_future: Future[str | None] | None = None
+        try:
+            if release.ml_url and fetch_executor is not None:
+                ml_future = fetch_executor.submit(
+                    self._revalidate_page, release.ml_url, previous.validators.get(release.ml_url)
+                )
+            base_content = self._revalidate_page(release.url, previous.validators.get(release.url))
+            ml_content = None
+            if ml_future is not None:
+                ml_content = ml_future.result()
+            elif release.ml_url:
+                ml_content = self._revalidate_page(release.ml_url, previous.validators.get(release.ml_url))
+        except Exception:
+            self.logger.exception(f"Error revalidating runtime pages of {release.version}, keeping previous result")
+            return previous_runtimes
+        finally:
+            if ml_future is not None:
+                ml_future.cancel()
+        return self._reparse_release(release, previous_runtimes, base_content, ml_content)
+
+    @staticmethod
+    def _is_reusable(release: RuntimeRelease, previous: CatalogRelease, previous_runtimes: list[Runtime]) -> bool:
+        """Whether the previous result of a release applies, i.e. its row did not change since."""
+        has_base = any(not runtime.is_ml for runtime in previous_runtimes)
+        return has_base and previous.fingerprint == CatalogRelease.fingerprint_of(release)
+
+    def _reparse_release(
+        self,
+        release: RuntimeRelease,
+        previous_runtimes: list[Runtime],
+        base_content: str | None,
+        ml_content: str | None,
+    ) -> list[Runtime]:
+        """Parse the pages of a reusable release that changed since the previous scrape.
+
+        Args:
+            release: The release
+            previous_runtimes: The base (and ML) runtime of the previous scrape
+            base_content: Content of the base page, None if it is unchanged
+            ml_content: Content of the ML page, None if it is unchanged
         """
+        if base_content is None and ml_content is None:
+            self.logger.debug(f"Reusing unchanged release {release.version} from catalog")
+            self.reused_releases.append(release.version)
+            return previous_runtimes
+
         runtimes = []
+        try:
+            base = next(runtime for runtime in previous_runtimes if not runtime.is_ml)
+            if base_content is not None:
+                base = self._parse_runtime_page(release, release.url, content=base_content)
+                if base is None:
+                    return runtimes
+            runtimes.append(base)
+
+            if release.ml_url:
+                ml_previous = next((r for r in previous_runtimes if r.is_ml), None)
+                if ml_content is not None:
+                    ml = self._parse_ml_runtime_page(release, release.ml_url, base, content=ml_content)
+                elif ml_previous is not None:
+                    ml = ml_previous.model_copy(update={"system_environment": base.system_environment})
+                else:
+                    ml = None
+                if ml is not None:
+                    runtimes.append(ml)
+        except Exception:
+            self.logger.exception(f"Error parsing runtime page {release.version}")
+        return runtimes
+
+    def _iter_release_results(
+        self, previous: RuntimeCatalog | None = None, selector: RuntimeSelector | None = None
+    ) -> Iterator[tuple[RuntimeRelease, list[Runtime]]]:
+        """Scrape all releases concurrently and yield each release with its runtimes as soon as it is parsed.
+
+        Releases are processed on a pool of ``max_workers`` threads. A second pool of the same size fetches ML
+        pages so that the base and ML page of a release are downloaded in parallel.
+        """
+        self.reused_releases = []
+        self.failed_releases = []
+        previous_releases = {entry.release.version: entry for entry in previous.releases} if previous else {}
+        previous_by_url = {runtime.url: runtime for runtime in previous.runtimes} if previous else {}
+        # Selected releases that were not processed yet
+        pending: set[str] = set()
         try:
             # Get all runtime version links
             self.logger.info("Fetching runtime version links")
             releases = self._scrape_runtime_links()
-
-            # Process each link with progress bar
-            for release in self.logger.progress(releases, description="[green]Processing runtimes"):
-                self.logger.debug(f"Processing runtime release {release.version}")
-                parsed_runtimes = self._parse_runtime(release)
-                if parsed_runtimes:
-                    runtimes.extend(parsed_runtimes)
-                else:
-                    self.logger.warning(f"Could not parse runtime info for {release.version}")
-
-            self.logger.info(f"Successfully fetched {len(runtimes)} runtime versions")
+            if selector is not None:
+                releases = selector.select_releases(releases)
+                self.logger.info(f"Selected {len(releases)} releases")
+            self.releases = releases
+            pending.update(release.version for release in releases)
+
+            workers = max(1, self.max_workers)
+            with (
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix="runtime-parse") as parse_executor,
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix="runtime-fetch") as fetch_executor,
+            ):
+                futures = {
+                    parse_executor.submit(
+                        self._update_runtime,
+                        release,
+                        previous_releases.get(release.version),
+                        [previous_by_url[url] for url in (release.url, release.ml_url) if url in previous_by_url],
+                        fetch_executor,
+                    ): release
+                    for release in releases
+                }
+                try:
+                    # Process each link with progress bar, in completion order
+                    for future in self.logger.progress(
+                        as_completed(futures), description="[green]Processing runtimes", total=len(futures)
+                    ):
+                        release = futures[future]
+                        self.logger.debug(f"Processed runtime release {release.version}")
+                        runtimes = future.result()
+                        pending.discard(release.version)
+                        if len(runtimes) < (2 if release.ml_url else 1):
+                            self.failed_releases.append(release.version)
+                        yield release, runtimes
+                finally:
+                    # Don't keep scraping if the consumer stopped early
+                    for future in futures:
+                        future.cancel()
+
+            if previous is not None:
+                self.logger.info(
+                    f"Reused {len(self.reused_releases)}/{len(releases)} unchanged releases from the previous catalog"
+                )
+            self.log_timing_summary()
         except Exception:
             self.logger.exception("Error scraping runtimes")
+            self.failed_releases.extend(sorted(pending))
 
-        runtimes.sort(key=lambda r: r.release_date, reverse=True)
+    def iter_supported_runtimes(
+        self, previous: RuntimeCatalog | None = None, selector: RuntimeSelector | None = None
+    ) -> Iterator[Runtime]:
+        """Yield runtimes as soon as their release pages are parsed.
 
-        return runtimes
+        Runtimes are yielded in completion order, a base runtime always before its ML variant. Use
+        :meth:`sort_runtimes` to bring them into display order.
+
+        Args:
+            previous: Catalog of a previous scrape. Releases whose row and pages did not change since are reused
+                from it instead of being fetched and parsed again.
+            selector: Only fetch the pages of releases matching this selection.
+
+        Yields:
+            Runtime objects with information about each runtime version
+        """
+        count = 0
+        for release, runtimes in self._iter_release_results(previous, selector):
+            if not runtimes:
+                self.logger.warning(f"Could not parse runtime info for {release.version}")
+            count += len(runtimes)
+            yield from runtimes
+        self.logger.info(f"Successfully fetched {count} runtime versions")
+
+    def get_supported_runtimes(
+        self, previous: RuntimeCatalog | None = None, selector: RuntimeSelector | None = None
+    ) -> list[Runtime]:
+        """Scrape information for all available Databricks runtime versions.
+
+        Args:
+            previous: Catalog of a previous scrape. Releases whose row and pages did not change since are reused
+                from it instead of being fetched and parsed again.
+            selector: Only fetch the pages of releases matching this selection.
+
+        Returns:
+            List of Runtime objects with information about each runtime version, sorted by :meth:`sort_runtimes`
+        """
+        return self.sort_runtimes(self.iter_supported_runtimes(previous, selector))
+
+    @staticmethod
+    def sort_runtimes(runtimes: Iterable[Runtime]) -> list[Runtime]:
+        """Sort runtimes newest release first, each base runtime before its ML variant."""
+        return sorted(runtimes, key=lambda r: (r.release_date, r.version, not r.is_ml), reverse=True)
+
+    def catalog_releases(self) -> list[CatalogRelease]:
+        """Build the catalog release entries (fingerprints and page validators) of the last scrape."""
+        return [
+            CatalogRelease(
+                release=release,
+                fingerprint=CatalogRelease.fingerprint_of(release),
+                validators={
+                    url: self.page_validators[url]
+                    for url in (release.url, release.ml_url)
+                    if url and url in self.page_validators
+                },
+            )
+            for release in self.releases
+        ]
 
-    def display_runtimes(self) -> bool:
-        """Display runtime information in a rich table."""
-        # Create a fetcher to load or fetch runtimes
+    def display_runtimes(self, runtimes: list[Runtime] | None = None) -> bool:
+        """Display runtime information in a rich table.
 
-        runtimes = self.get_supported_runtimes()
+        Args:
+            runtimes: Runtimes to display. Scraped if not provided.
+        """
+        if runtimes is None:
+            runtimes = self.get_supported_runtimes()
 
         if not runtimes:
             self.logger.print(Panel("Failed to fetch runtime information.", title="Error", style="red"))
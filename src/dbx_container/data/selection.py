@@ -0,0 +1,63 @@
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import date
+from typing import Protocol, TypeVar
+
+from dbx_container.models.runtime import Runtime, RuntimeRelease
+
+
+class _Versioned(Protocol):
+    version: str
+    release_date: date | str
+
+    @property
+    def is_lts(self) -> bool: ...
+
+
+T = TypeVar("T", bound=_Versioned)
+
+
+@dataclass(frozen=True)
+class RuntimeSelector:
+    """Selection of runtimes to scrape or build.
+
+    The selection only depends on the rows of the release index (version, release date, LTS flag), so it can be
+    applied to the :class:`RuntimeRelease` list before any runtime page is fetched.
+    """
+
+    # Exact runtime versions to select, None for all versions
+    versions: frozenset[str] | None = None
+    # Only select LTS releases
+    lts_only: bool = False
+    # Only select the latest N LTS releases by release date (implies lts_only)
+    latest_lts: int | None = None
+    # Select ML variants, which costs an additional page per release
+    include_ml: bool = True
+
+    @property
+    def is_partial(self) -> bool:
+        """Whether the selection may exclude runtimes, i.e. a scrape with it is not a complete catalog."""
+        return self != RuntimeSelector()
+
+    def _select(self, items: Sequence[T]) -> list[T]:
+        selected = [item for item in items if self.versions is None or item.version in self.versions]
+        if self.lts_only or self.latest_lts is not None:
+            selected = [item for item in selected if item.is_lts]
+        if self.latest_lts is not None:
+            release_dates = {}
+            for item in selected:
+                release_dates.setdefault(item.version, item.release_date)
+            keep = set(sorted(release_dates, key=release_dates.__getitem__, reverse=True)[: self.latest_lts])
+            selected = [item for item in selected if item.version in keep]
+        return selected
+
+    def select_releases(self, releases: Sequence[RuntimeRelease]) -> list[RuntimeRelease]:
+        """Select releases from the release index. ML page URLs are dropped if ML variants are excluded."""
+        selected = self._select(releases)
+        if not self.include_ml:
+            selected = [release.model_copy(update={"ml_url": ""}) for release in selected]
+        return selected
+
+    def select_runtimes(self, runtimes: Iterable[Runtime]) -> list[Runtime]:
+        """Select already parsed runtimes, e.g. from a catalog snapshot."""
+        return [runtime for runtime in self._select(list(runtimes)) if self.include_ml or not runtime.is_ml]
@@ -1,7 +1,13 @@
 from abc import ABC, abstractmethod, update_abstractmethods
+from typing import TYPE_CHECKING
 
 from dbx_container.utils.stringbuilder import StringBuilder
 
+if TYPE_CHECKING:
+    from dbx_container.docker.optimizer import OptimizationReport
+
+SYNTAX_DIRECTIVE = "# syntax=docker/dockerfile:1"
+
 
 class DockerInstruction(ABC):
     """A composable Dockerfile step."""
@@ -22,6 +28,14 @@ class DockerfileBuilder:
         self, base_image: DockerInstruction, instrs: list[DockerInstruction] | None = None, registry: str | None = None
     ) -> None:
         self.builder = StringBuilder()
+        # Applied instructions of the final stage in order, rendered by render
+        self.instructions: list[DockerInstruction | str] = []
+        # Named build stages in order, rendered before the final stage
+        self.stages: dict[str, list[DockerInstruction | str]] = {}
+        # Instruction list that add_instruction appends to
+        self._target = self.instructions
+        # Changes of the last optimized render
+        self.optimization: OptimizationReport | None = None
         self.base_image = base_image
         self.registry = registry
         self.base_image.apply(self)
@@ -46,11 +60,41 @@ class DockerfileBuilder:
             return self.image_name
         return f"{self.registry}/{self.image_name}"
 
-    def add_instruction(self, instruction: str) -> "DockerfileBuilder":
-        """Add a generic instruction to the Dockerfile."""
-        self.builder.append_line(instruction)
+    def add_instruction(self, instruction: "DockerInstruction | str") -> "DockerfileBuilder":
+        """Add an instruction, or a generic instruction line, to the Dockerfile."""
+        self._target.append(instruction)
+        return self
+
+    def add_stage(self, base_image: DockerInstruction, instrs: list[DockerInstruction]) -> "DockerfileBuilder":
+        """Add a named build stage, whose files the final stage can copy with ``CopyInstruction(from_stage=...)``.
+
+        Stages are rendered in the order they were added, before the final stage.
+
+        Args:
+            base_image: The FROM instruction of the stage, with the stage name
+            instrs: Instructions of the stage
+
+        Raises:
+            ValueError: If the FROM instruction has no stage name or the name is already used
+        """
+        name = getattr(base_image, "stage", None)
+        if not name:
+            raise ValueError(f"Build stages need a name: {base_image}")
+        if name in self.stages:
+            raise ValueError(f"Build stage {name} already exists")
+        self._target = self.stages[name] = []
+        try:
+            for instr in [base_image, *instrs]:
+                instr.apply(self)
+        finally:
+            self._target = self.instructions
         return self
 
+    @property
+    def all_instructions(self) -> list["DockerInstruction | str"]:
+        """Instructions of all stages in the order they are rendered."""
+        return [instruction for stage in [*self.stages.values(), self.instructions] for instruction in stage]
+
     def add(self, feature: DockerInstruction) -> "DockerfileBuilder":
         """Compose a feature into this Dockerfile."""
         feature.apply(self)
@@ -76,6 +120,46 @@ class DockerfileBuilder:
             feat.apply(self)
         return self
 
-    def render(self) -> str:
-        """Render the complete Dockerfile as a string."""
+    def render(self, optimize: bool = False, no_install_recommends: bool = False, cache_mounts: bool = False) -> str:
+        """Render the complete Dockerfile as a string.
+
+        Args:
+            optimize: Merge adjacent compatible RUN instructions into one layer and clean up after apt in the same
+                layer, see :func:`~dbx_container.docker.optimizer.optimize`. The report of the changes is stored in
+                ``optimization``.
+            no_install_recommends: Let the optimizer install apt packages without recommended packages
+            cache_mounts: Mount BuildKit caches for apt and pip downloads, see
+                :func:`~dbx_container.docker.optimizer.add_cache_mounts`
+
+        Returns:
+            The Dockerfile content
+        """
+        # Every stage starts from a fresh filesystem, so the passes work on each stage on its own
+        stages = [*self.stages.values(), self.instructions]
+        # Imported here, the optimizer works on the instruction classes which depend on this module
+        if optimize:
+            from dbx_container.docker.optimizer import OptimizationReport
+            from dbx_container.docker.optimizer import optimize as optimize_instructions
+
+            self.optimization = OptimizationReport()
+            optimized = []
+            for stage in stages:
+                stage, report = optimize_instructions(stage, no_install_recommends)
+                self.optimization.update(report)
+                optimized.append(stage)
+            stages = optimized
+        if cache_mounts:
+            from dbx_container.docker.optimizer import add_cache_mounts
+
+            stages = [add_cache_mounts(stage) for stage in stages]
+
+        self.builder.clear()
+        if any(getattr(instruction, "mounts", None) for stage in stages for instruction in stage):
+            # RUN --mount needs a BuildKit frontend, the directive has to be the first line
+            self.builder.append_line(SYNTAX_DIRECTIVE)
+        for index, stage in enumerate(stages):
+            if index:
+                self.builder.append_line()
+            for instruction in stage:
+                self.builder.append_line(str(instruction))
         return str(self.builder)
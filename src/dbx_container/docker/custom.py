@@ -1,21 +1,52 @@
 from dbx_container.docker.builder import DockerfileBuilder, DockerInstruction
 from dbx_container.docker.instructions import RunInstruction
 
+# BuildKit cache mounts shared by all builds on a builder, apt needs exclusive access to its cache
+APT_ARCHIVES_MOUNT = "type=cache,target=/var/cache/apt,sharing=locked"
+# The package lists depend on the OS and apt sources of the image being built. They are only mounted into RUN
+# instructions that update them before installing, the lock keeps other builds out until the RUN is done.
+APT_LISTS_MOUNT = "type=cache,target=/var/lib/apt/lists,sharing=locked"
+APT_CACHE_MOUNTS = [APT_ARCHIVES_MOUNT, APT_LISTS_MOUNT]
+PIP_CACHE_MOUNTS = ["type=cache,target=/root/.cache/pip"]
+# The Ubuntu images delete downloaded packages after every install, which would leave the apt cache empty
+APT_KEEP_CACHE = (
+    "rm -f /etc/apt/apt.conf.d/docker-clean && "
+    """echo 'Binary::apt::APT::Keep-Downloaded-Packages "true";' > /etc/apt/apt.conf.d/keep-cache"""
+)
+
 
 class PipInstallInstruction(RunInstruction):
-    """Installs Python dependencies via pip from a requirements file."""
+    """Installs Python dependencies via pip from a requirements file, optionally with a download cache mount."""
 
-    def __init__(self, requirements_file: str) -> None:
-        super().__init__(f"pip install -r {requirements_file}")
+    def __init__(self, requirements_file: str, cache: bool = False) -> None:
+        super().__init__(f"pip install -r {requirements_file}", mounts=PIP_CACHE_MOUNTS if cache else None)
 
 
 class AptInstallInstruction(RunInstruction):
-    """Installs packages via apt-get, with optional cache cleaning."""
+    """Installs packages via apt-get, with optional cache cleaning and without recommended packages.
+
+    With ``cache``, downloads are kept in a cache mount instead, so they never end up in the image. The package lists
+    are only cached together with ``update``, as another build could replace them between separate RUN instructions.
+    """
 
-    def __init__(self, packages: list[str], update: bool = True, clean: bool = True) -> None:
-        command = "apt-get install -y " + " ".join(packages)
+    def __init__(
+        self,
+        packages: list[str],
+        update: bool = True,
+        clean: bool = True,
+        no_install_recommends: bool = False,
+        cache: bool = False,
+    ) -> None:
+        command = (
+            "apt-get install -y " + ("--no-install-recommends " if no_install_recommends else "") + " ".join(packages)
+        )
         if update:
             command = "apt-get update && " + command
-        if clean:
+        if cache:
+            command = f"{APT_KEEP_CACHE} && {command}"
+        if clean and not (cache and update):
             command += " && rm -rf /var/lib/apt/lists/*"
-        super().__init__(command)
+        mounts = None
+        if cache:
+            mounts = APT_CACHE_MOUNTS if update else [APT_ARCHIVES_MOUNT]
+        super().__init__(command, mounts=mounts)
@@ -4,15 +4,18 @@ from dbx_container.docker.builder import DockerfileBuilder, DockerInstruction
 
 
 class FromInstruction(DockerInstruction):
-    """Adds a FROM instruction."""
+    """Adds a FROM instruction, optionally naming the build stage it starts."""
 
-    def __init__(self, image: str) -> None:
+    def __init__(self, image: str, stage: str | None = None) -> None:
         self.image = image
+        self.stage = stage
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
+        if self.stage:
+            return f"FROM {self.image} AS {self.stage}"
         return f"FROM {self.image}"
 
 
@@ -24,7 +27,7 @@ class ArgInstruction(DockerInstruction):
         self.default = default
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
         if self.default is None:
@@ -40,23 +43,24 @@ class EnvInstruction(DockerInstruction):
         self.value = value
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
         return f"ENV {self.name}={self.value}"
 
 
 class RunInstruction(DockerInstruction):
-    """Adds a RUN instruction."""
+    """Adds a RUN instruction, optionally with BuildKit mounts like ``type=cache,target=/root/.cache/pip``."""
 
-    def __init__(self, command: str) -> None:
+    def __init__(self, command: str, mounts: list[str] | None = None) -> None:
         self.command = command
+        self.mounts = list(mounts or [])
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
-        return f"RUN {self.command}"
+        return " ".join(["RUN", *(f"--mount={mount}" for mount in self.mounts), self.command])
 
 
 class WorkdirInstruction(DockerInstruction):
@@ -66,7 +70,7 @@ class WorkdirInstruction(DockerInstruction):
         self.path = path
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
         return f"WORKDIR {self.path}"
@@ -79,27 +83,31 @@ class EntrypointInstruction(DockerInstruction):
         self.entrypoint = entrypoint
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
         return f"ENTRYPOINT {self.entrypoint}"
 
 
 class CopyInstruction(DockerInstruction):
-    """Copies files or directories into the image, optionally with --chown."""
+    """Copies files or directories into the image, optionally with --chown or from another build stage."""
 
-    def __init__(self, src: str, dest: str, chown: str | None = None) -> None:
+    def __init__(self, src: str, dest: str, chown: str | None = None, from_stage: str | None = None) -> None:
         self.src = src
         self.dest = dest
         self.chown = chown
+        self.from_stage = from_stage
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
+        options = []
+        if self.from_stage:
+            options.append(f"--from={self.from_stage}")
         if self.chown:
-            return f"COPY --chown={self.chown} {self.src} {self.dest}"
-        return f"COPY {self.src} {self.dest}"
+            options.append(f"--chown={self.chown}")
+        return " ".join(["COPY", *options, self.src, self.dest])
 
 
 class CmdInstruction(DockerInstruction):
@@ -109,7 +117,7 @@ class CmdInstruction(DockerInstruction):
         self.cmd = cmd
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
         return f"CMD {self.cmd}"
@@ -122,7 +130,7 @@ class CommentInstruction(DockerInstruction):
         self.comment = comment
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
         return f"# {self.comment}"
@@ -136,7 +144,7 @@ class LabelInstruction(DockerInstruction):
         self.value = value
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
         return f"LABEL {self.key}={self.value}"
@@ -149,7 +157,7 @@ class ExposeInstruction(DockerInstruction):
         self.port = port
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
         return f"EXPOSE {self.port}"
@@ -162,7 +170,7 @@ class UserInstruction(DockerInstruction):
         self.user = user
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
         return f"USER {self.user}"
@@ -175,7 +183,7 @@ class VolumeInstruction(DockerInstruction):
         self.path = path
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
         return f"VOLUME {self.path}"
@@ -191,7 +199,7 @@ class HealthcheckInstruction(DockerInstruction):
         self.retries = retries
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
         return f"HEALTHCHECK --interval={self.interval} --timeout={self.timeout} --retries={self.retries} CMD {self.command}"
@@ -204,7 +212,7 @@ class ShellInstruction(DockerInstruction):
         self.shell = shell
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
         return f"SHELL {self.shell}"
@@ -218,7 +226,7 @@ class AddInstruction(DockerInstruction):
         self.dest = dest
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
         return f"ADD {self.src} {self.dest}"
@@ -231,7 +239,7 @@ class StopSignalInstruction(DockerInstruction):
         self.signal = signal
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
         return f"STOPSIGNAL {self.signal}"
@@ -244,7 +252,7 @@ class OnbuildInstruction(DockerInstruction):
         self.instruction = instruction
 
     def apply(self, builder: DockerfileBuilder) -> None:
-        builder.add_instruction(str(self))
+        builder.add_instruction(self)
 
     def __str__(self) -> str:
         return f"ONBUILD {self.instruction}"
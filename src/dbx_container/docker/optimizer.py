@@ -0,0 +1,375 @@
+from dataclasses import dataclass
+import re
+
+from dbx_container.docker.builder import DockerInstruction
+from dbx_container.docker.custom import APT_ARCHIVES_MOUNT, APT_KEEP_CACHE, APT_LISTS_MOUNT, PIP_CACHE_MOUNTS
+from dbx_container.docker.instructions import AddInstruction, CommentInstruction, CopyInstruction, RunInstruction
+
+# Shell builtins whose effect would leak into the commands merged after them, e.g. a changed working directory
+_SHELL_STATE = re.compile(r"(^|[;&|(]\s*)(cd|pushd|popd|export|unset|set|source|\.|alias|umask|exit|exec)(\s|$)")
+
+# Continuation between merged commands
+_SEPARATOR = " && \\\n    "
+
+_APT_UPDATE = re.compile(r"\bapt(-get)?\s+(-\S+\s+)*update\b")
+_APT_INSTALL = re.compile(r"\bapt(-get)?\s+(-\S+\s+)*install\b")
+_APT_LISTS_REMOVED = re.compile(r"\brm\s+-\S*\s+(\S+\s+)*/var/lib/apt/lists")
+# Steps that change the package sources, after which the package lists have to be updated again
+_APT_SOURCES_CHANGED = re.compile(r"add-apt-repository|apt-key|sources\.list|\bgpg\b.*\bapt\b")
+_APT_CLEANUP = ["apt-get clean", "rm -rf /var/lib/apt/lists/*"]
+_APT_CLEAN = re.compile(r"^apt-get\s+clean$")
+_APT_LISTS = re.compile(r"\s+/var/lib/apt/lists/\*?")
+_PIP_DOWNLOAD = re.compile(r"\bpip[\w.${}-]*\s+(install|download)\b|\bpython[\w.${}-]*\s+get-pip\.py\b")
+
+
+@dataclass
+class OptimizationReport:
+    """Layer counts of a Dockerfile before and after optimization, and the changes made to get there."""
+
+    layers_before: int = 0
+    layers_after: int = 0
+    # Changes of the apt pass, see optimize_apt
+    apt_updates_removed: int = 0
+    apt_updates_added: int = 0
+    apt_cleanups_added: int = 0
+    apt_cleanups_moved: int = 0
+    apt_recommends_disabled: int = 0
+
+    @property
+    def apt_changes(self) -> int:
+        """Number of changes made by the apt pass."""
+        return (
+            self.apt_updates_removed
+            + self.apt_updates_added
+            + self.apt_cleanups_added
+            + self.apt_cleanups_moved
+            + self.apt_recommends_disabled
+        )
+
+    def update(self, other: "OptimizationReport") -> None:
+        """Add the counts of another report, e.g. to total them over all images of a build."""
+        self.layers_before += other.layers_before
+        self.layers_after += other.layers_after
+        self.apt_updates_removed += other.apt_updates_removed
+        self.apt_updates_added += other.apt_updates_added
+        self.apt_cleanups_added += other.apt_cleanups_added
+        self.apt_cleanups_moved += other.apt_cleanups_moved
+        self.apt_recommends_disabled += other.apt_recommends_disabled
+
+    def __str__(self) -> str:
+        changes = [
+            f"{count} {change}"
+            for count, change in [
+                (self.apt_updates_removed, "redundant apt-get updates removed"),
+                (self.apt_updates_added, "apt-get updates added"),
+                (self.apt_cleanups_added, "apt cleanups added"),
+                (self.apt_cleanups_moved, "apt cleanups moved to the end of their layer"),
+                (self.apt_recommends_disabled, "installs without recommends"),
+            ]
+            if count
+        ]
+        return ", ".join([f"{self.layers_before} → {self.layers_after} layers", *changes])
+
+
+def count_layers(instructions: list[DockerInstruction | str]) -> int:
+    """Count the instructions that add a filesystem layer (RUN, COPY and ADD)."""
+    return sum(
+        isinstance(instruction, RunInstruction | CopyInstruction | AddInstruction)
+        or (isinstance(instruction, str) and instruction.lstrip().upper().startswith(("RUN ", "COPY ", "ADD ")))
+        for instruction in instructions
+    )
+
+
+def is_mergeable(instruction: DockerInstruction | str) -> bool:
+    """Whether a RUN instruction can share a layer with the RUN instructions next to it.
+
+    Exec form commands, heredocs and commands that change the shell state (working directory, environment, options)
+    are kept on their own.
+    """
+    if not isinstance(instruction, RunInstruction):
+        return False
+    command = instruction.command.strip()
+    return not (command.startswith("[") or "<<" in command or _SHELL_STATE.search(command))
+
+
+def _is_grouped(command: str) -> bool:
+    """Whether the whole command is one parenthesized group."""
+    depth = 0
+    for position, char in enumerate(command):
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        if depth == 0:
+            return position == len(command) - 1 and command.startswith("(")
+    return False
+
+
+def _group(command: str) -> str:
+    # Commands with ; or || would swallow the failure of the command merged before them
+    if (";" in command or "||" in command) and not _is_grouped(command):
+        return f"({command})"
+    return command
+
+
+def coalesce_runs(
+    instructions: list[DockerInstruction | str],
+) -> tuple[list[DockerInstruction | str], OptimizationReport]:
+    """Merge adjacent RUN instructions into one RUN, so they produce a single layer.
+
+    Only RUN instructions separated by nothing but comments are merged, any other instruction (ARG, ENV, COPY, USER,
+    ...) ends a group as it may change what the following commands see. Comments inside a group are moved above the
+    merged RUN in their original order. The merged commands run in order and the RUN fails as soon as one of them
+    fails, like separate RUN instructions.
+
+    Args:
+        instructions: The instructions of a Dockerfile
+
+    Returns:
+        The optimized instructions and the layer counts before and after
+    """
+    optimized: list[DockerInstruction | str] = []
+    runs: list[RunInstruction] = []
+    # Comments between the RUN instructions of the current group, and after its last RUN so far
+    inner: list[DockerInstruction | str] = []
+    trailing: list[DockerInstruction | str] = []
+
+    def flush() -> None:
+        if len(runs) > 1:
+            optimized.extend(inner)
+            mounts = list(dict.fromkeys(mount for run in runs for mount in run.mounts))
+            optimized.append(RunInstruction(_SEPARATOR.join(_group(run.command) for run in runs), mounts))
+        else:
+            optimized.extend(runs)
+        # Comments after the last RUN describe whatever follows
+        optimized.extend(trailing)
+        runs.clear()
+        inner.clear()
+        trailing.clear()
+
+    for instruction in instructions:
+        if is_mergeable(instruction):
+            inner.extend(trailing)
+            trailing.clear()
+            runs.append(instruction)  # pyright: ignore[reportArgumentType]
+        elif runs and isinstance(instruction, CommentInstruction):
+            trailing.append(instruction)
+        else:
+            flush()
+            optimized.append(instruction)
+    flush()
+
+    return optimized, OptimizationReport(count_layers(instructions), count_layers(optimized))
+
+
+def split_commands(command: str) -> list[str]:
+    """Split a shell command into the steps chained with && at the top level, outside of quotes and groups."""
+    steps = []
+    depth = 0
+    quote = None
+    start = 0
+    position = 0
+    while position < len(command):
+        char = command[position]
+        if quote is not None:
+            if char == "\\" and quote == '"':
+                position += 1
+            elif char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char in "({":
+            depth += 1
+        elif char in ")}":
+            depth -= 1
+        elif depth == 0 and command.startswith("&&", position):
+            steps.append(command[start:position])
+            start = position + 2
+            position += 1
+        position += 1
+    steps.append(command[start:])
+    # Drop line continuations around the separators
+    return [step.strip().removeprefix("\\").removesuffix("\\").strip() for step in steps]
+
+
+def _installs_remote_packages(step: str) -> bool:
+    """Whether an apt install step downloads packages, as opposed to installing local .deb files only."""
+    match = _APT_INSTALL.search(step)
+    if match is None:
+        return False
+    packages = [word for word in step[match.end() :].split() if not word.startswith("-")]
+    return not packages or any(not package.startswith(("./", "/")) for package in packages)
+
+
+def _is_apt_cleanup(step: str) -> bool:
+    """Whether a step only cleans up after apt, i.e. runs apt-get clean or removes the package lists."""
+    if _APT_UPDATE.search(step) or _APT_INSTALL.search(step):
+        return False
+    return _APT_CLEAN.match(step) is not None or _APT_LISTS_REMOVED.search(step) is not None
+
+
+def _optimize_apt_command(command: str, report: OptimizationReport, no_install_recommends: bool) -> list[str] | None:
+    """Rewrite the apt steps of a RUN command, None if it does not use apt."""
+    steps = split_commands(command)
+    apt_steps = [index for index, step in enumerate(steps) if _APT_UPDATE.search(step) or _APT_INSTALL.search(step)]
+    if not apt_steps:
+        return None
+
+    # Cleanups followed by more apt steps would leave those without package lists and keep what they leave behind
+    moved = [index for index in range(apt_steps[-1]) if _is_apt_cleanup(steps[index])]
+    if moved:
+        steps = [step for index, step in enumerate(steps) if index not in moved] + [steps[index] for index in moved]
+        report.apt_cleanups_moved += 1
+
+    rewritten: list[str] = []
+    # Whether the package lists are up to date at this point of the layer
+    fresh = False
+    # Whether package lists or downloaded packages are left behind at this point of the layer
+    dirty = False
+    for step in steps:
+        updates = _APT_UPDATE.search(step) is not None
+        installs = _APT_INSTALL.search(step) is not None
+        if updates and installs:
+            # A group that updates the lists itself, e.g. (apt-get update && apt-get install ...) || true
+            fresh = dirty = True
+        elif updates and not _APT_LISTS_REMOVED.search(step):
+            if fresh:
+                report.apt_updates_removed += 1
+                continue
+            fresh = dirty = True
+        elif _installs_remote_packages(step):
+            if not fresh:
+                rewritten.append("apt-get update")
+                report.apt_updates_added += 1
+                fresh = True
+            if no_install_recommends and "--no-install-recommends" not in step:
+                step = _APT_INSTALL.sub(lambda match: f"{match.group()} --no-install-recommends", step, count=1)
+                report.apt_recommends_disabled += 1
+            dirty = True
+        elif installs:
+            # Local packages like zulu-repo may add new package sources, apt still leaves its package caches behind
+            fresh = False
+            dirty = True
+        if _APT_SOURCES_CHANGED.search(step):
+            fresh = False
+        if _APT_LISTS_REMOVED.search(step):
+            fresh = dirty = False
+        rewritten.append(step)
+
+    if dirty:
+        rewritten.extend(_APT_CLEANUP)
+        report.apt_cleanups_added += 1
+    return rewritten
+
+
+def optimize_apt(
+    instructions: list[DockerInstruction | str], no_install_recommends: bool = False
+) -> tuple[list[DockerInstruction | str], OptimizationReport]:
+    """Rewrite the apt usage of RUN instructions so package lists never end up in an image layer.
+
+    Within every RUN instruction, ``apt-get update`` is removed while the package lists are still up to date, added
+    before installing packages if the lists of an earlier layer are not guaranteed to exist, and the lists and
+    downloaded packages are removed at the end of every layer that created them. Existing cleanup steps that run
+    before further apt steps of the same layer are moved after them. RUN instructions that only update the package
+    lists are dropped, later layers update them where needed.
+
+    Args:
+        instructions: The instructions of a Dockerfile
+        no_install_recommends: Install packages with ``--no-install-recommends``
+
+    Returns:
+        The optimized instructions and a report of the changes
+    """
+    report = OptimizationReport(layers_before=count_layers(instructions))
+    optimized: list[DockerInstruction | str] = []
+    for instruction in instructions:
+        if not isinstance(instruction, RunInstruction) or instruction.command.strip().startswith("["):
+            optimized.append(instruction)
+            continue
+        steps = _optimize_apt_command(instruction.command, report, no_install_recommends)
+        if steps is None or steps == split_commands(instruction.command):
+            optimized.append(instruction)
+        elif steps[-2:] == _APT_CLEANUP and all(_APT_UPDATE.search(step) for step in steps[:-2]):
+            # Only updates the package lists, which are not kept
+            report.apt_updates_removed += len(steps) - 2
+            report.apt_cleanups_added -= 1
+        else:
+            separator = _SEPARATOR if "\\\n" in instruction.command else " && "
+            optimized.append(RunInstruction(separator.join(steps), instruction.mounts))
+    report.layers_after = count_layers(optimized)
+    return optimized, report
+
+
+def optimize(
+    instructions: list[DockerInstruction | str], no_install_recommends: bool = False
+) -> tuple[list[DockerInstruction | str], OptimizationReport]:
+    """Run all optimization passes: merge RUN instructions, then rewrite their apt usage.
+
+    Args:
+        instructions: The instructions of a Dockerfile
+        no_install_recommends: Install packages with ``--no-install-recommends``
+
+    Returns:
+        The optimized instructions and a report of the changes
+    """
+    instructions, report = coalesce_runs(instructions)
+    instructions, apt_report = optimize_apt(instructions, no_install_recommends)
+    apt_report.layers_before = report.layers_before
+    return instructions, apt_report
+
+
+def add_cache_mounts(instructions: list[DockerInstruction | str]) -> list[DockerInstruction | str]:
+    """Mount BuildKit caches into the RUN instructions that download apt or pip packages.
+
+    Cached downloads are shared by all builds on the same builder, so a rebuild only downloads what changed. Steps that
+    clean up the cached directories, ``apt-get clean``, removing the package lists and ``--no-cache-dir``, are
+    removed as they would empty the cache, the cache directories are not part of the image anyway. The first RUN
+    using apt configures apt to keep downloaded packages.
+
+    The package lists depend on the OS and apt sources of the image, and another build on the builder may update them
+    for a different image between two RUN instructions. They are only cached for RUN instructions that update them,
+    install and remove them again, other RUN instructions keep the package lists of the image as without cache mounts.
+
+    Args:
+        instructions: The instructions of a Dockerfile
+
+    Returns:
+        The instructions with cache mounts
+    """
+    mounted: list[DockerInstruction | str] = []
+    keeps_cache = False
+    for instruction in instructions:
+        if not isinstance(instruction, RunInstruction) or instruction.command.strip().startswith("["):
+            mounted.append(instruction)
+            continue
+        steps = split_commands(instruction.command)
+        mounts = list(instruction.mounts)
+        rewritten = steps
+        updates = any(_APT_UPDATE.search(step) for step in steps)
+        installs = any(_APT_INSTALL.search(step) for step in steps)
+        if updates or installs:
+            cache_lists = updates and installs and any(_APT_LISTS_REMOVED.search(step) for step in steps)
+            rewritten = []
+            for step in steps:
+                if _APT_CLEAN.match(step):
+                    continue
+                if cache_lists and step.startswith("rm ") and _APT_LISTS.search(step):
+                    step = _APT_LISTS.sub("", step)
+                    if all(word.startswith("-") for word in step.split()[1:]):
+                        continue
+                rewritten.append(step)
+            if not keeps_cache and APT_KEEP_CACHE not in instruction.command:
+                rewritten = [*split_commands(APT_KEEP_CACHE), *rewritten]
+            keeps_cache = True
+            mounts.append(APT_ARCHIVES_MOUNT)
+            if cache_lists:
+                mounts.append(APT_LISTS_MOUNT)
+        if any(_PIP_DOWNLOAD.search(step) for step in steps):
+            rewritten = [
+                step.replace(" --no-cache-dir", "") if _PIP_DOWNLOAD.search(step) else step for step in rewritten
+            ]
+            mounts.extend(PIP_CACHE_MOUNTS)
+
+        if rewritten == steps:
+            command = instruction.command
+        else:
+            command = (_SEPARATOR if "\\\n" in instruction.command else " && ").join(rewritten)
+        mounted.append(RunInstruction(command, list(dict.fromkeys(mounts))))
+    return mounted
@@ -0,0 +1,61 @@
+from dbx_container.docker.builder import DockerInstruction
+from dbx_container.docker.instructions import CommentInstruction, CopyInstruction, FromInstruction, RunInstruction
+
+
+def _parse_instruction(text: str) -> DockerInstruction | str:
+    keyword, _, arguments = text.partition(" ")
+    keyword = keyword.upper()
+    words = arguments.split()
+    if keyword == "FROM" and words and not words[0].startswith("-"):
+        if len(words) == 1:
+            return FromInstruction(words[0])
+        if len(words) == 3 and words[1].upper() == "AS":
+            return FromInstruction(words[0], stage=words[2])
+    elif keyword == "RUN":
+        mounts = []
+        command = arguments
+        while command.startswith("--mount="):
+            mount, _, command = command.partition(" ")
+            mounts.append(mount.removeprefix("--mount="))
+        return RunInstruction(command, mounts)
+    elif keyword == "COPY" and not arguments.startswith("["):
+        options = {}
+        while words and words[0].startswith("--"):
+            option, _, value = words.pop(0).removeprefix("--").partition("=")
+            options[option] = value
+        if len(words) >= 2 and set(options) <= {"from", "chown"}:
+            return CopyInstruction(
+                " ".join(words[:-1]), words[-1], chown=options.get("chown"), from_stage=options.get("from")
+            )
+    # Kept as written, e.g. ENV, LABEL or forms the instruction classes do not model
+    return text
+
+
+def parse_dockerfile(text: str) -> list[DockerInstruction | str]:
+    """Parse a Dockerfile into instructions, the inverse of :meth:`DockerfileBuilder.render`.
+
+    FROM, RUN and COPY instructions and comments become instruction objects that render to the same text, every other
+    instruction is kept as its text. Instructions continued over several lines are kept as one instruction.
+
+    Args:
+        text: The Dockerfile content
+
+    Returns:
+        The instructions of all stages in order
+    """
+    instructions: list[DockerInstruction | str] = []
+    continued: list[str] = []
+    for line in text.splitlines():
+        if not continued:
+            if not line.strip():
+                continue
+            if line.lstrip().startswith("#"):
+                instructions.append(CommentInstruction(line.lstrip().removeprefix("#").removeprefix(" ")))
+                continue
+        continued.append(line)
+        if not line.endswith("\\"):
+            instructions.append(_parse_instruction("\n".join(continued)))
+            continued.clear()
+    if continued:
+        instructions.append(_parse_instruction("\n".join(continued)))
+    return instructions
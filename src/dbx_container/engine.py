@@ -1,18 +1,40 @@
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date
+import hashlib
+from itertools import chain
 import json
 from pathlib import Path
+import threading
 from typing import Any
 
 from rich.panel import Panel
 
+from dbx_container.data.catalog import get_runtimes, iter_runtimes
 from dbx_container.data.scraper import RuntimeScraper
+from dbx_container.data.selection import RuntimeSelector
+from dbx_container.docker.optimizer import OptimizationReport
+from dbx_container.docker.parser import parse_dockerfile
+from dbx_container.graph import BuildGraph, ImageNode
 from dbx_container.images.gpu import GpuDockerfile
 from dbx_container.images.minimal import MinimalUbuntuDockerfile
 from dbx_container.images.python import PythonDockerfile, PythonDockerfileVersions
 from dbx_container.images.standard import StandardDockerfile
+from dbx_container.layers import ImageInvalidation, Layer, layer_keys, predict_invalidation
+from dbx_container.models.build import BuildShard, BuildSummary, ImageRecord
 from dbx_container.models.environment import SystemEnvironment
 from dbx_container.models.runtime import Runtime
+from dbx_container.sharding import pack_shards, shard_of
 from dbx_container.utils.logging import get_logger
+from dbx_container.utils.manifest import ArtifactWriter
+
+# GitHub Actions runs at most this many jobs per matrix
+MAX_MATRIX_JOBS = 256
+
+# Relative build cost of images without recorded durations, GPU images pull CUDA and ML runtimes install far more
+# packages
+GPU_COST_FACTOR = 2.0
+ML_COST_FACTOR = 3.0
 
 
 class RuntimeContainerEngine:
@@ -26,6 +48,16 @@ class RuntimeContainerEngine:
         latest_lts_count: int | None = 2,
         force_ubuntu_version: str | None = None,
         skip_ml_variants: bool = True,
+        cache_dir: Path | str | None = None,
+        offline: bool = False,
+        catalog_path: Path | str | None = None,
+        refresh_catalog: bool = False,
+        jobs: int = 1,
+        atomic: bool = False,
+        optimize: bool = False,
+        no_install_recommends: bool = False,
+        cache_mounts: bool = False,
+        multi_stage: bool = False,
     ) -> None:
         """Initialize the ContainerEngine.
 
@@ -37,13 +69,44 @@ class RuntimeContainerEngine:
             force_ubuntu_version: Force a specific Ubuntu version for all base images (e.g., "22.04").
                                   If None, defaults to "24.04" unless matching runtime's OS version.
             skip_ml_variants: Skip ML runtime variants during generation (default: True)
+            cache_dir: Directory for the persistent HTTP cache used by the scraper (None disables caching)
+            offline: Only use cached documentation pages and never touch the network
+            catalog_path: Runtime catalog snapshot to load instead of scraping (None always scrapes)
+            refresh_catalog: Scrape even if the catalog snapshot exists and overwrite it
+            jobs: Number of runtimes to generate images for in parallel
+            atomic: Write into a staging directory that replaces data_dir in one step once generation is complete
+            optimize: Merge adjacent RUN instructions of the generated Dockerfiles into fewer layers and clean up after
+                apt in the same layer
+            no_install_recommends: Install apt packages without recommended packages, only applies with optimize
+            cache_mounts: Mount BuildKit caches for apt and pip downloads into the RUN instructions of the generated
+                Dockerfiles, so rebuilds on the same builder reuse them
+            multi_stage: Build the python environments in a builder stage, so build tools and headers are not
+                shipped in the python images
         """
         self.logger = get_logger(self.__class__.__name__)
         self.data_dir = Path(data_dir) if isinstance(data_dir, str) else data_dir
-        self.scraper = RuntimeScraper(max_workers=max_workers, verify_ssl=verify_ssl)
+        self.scraper = RuntimeScraper(
+            max_workers=max_workers, verify_ssl=verify_ssl, cache_dir=cache_dir, offline=offline
+        )
+        self.catalog_path = Path(catalog_path) if catalog_path is not None else None
+        self.refresh_catalog = refresh_catalog
         self.latest_lts_count = latest_lts_count
         self.force_ubuntu_version = force_ubuntu_version
         self.skip_ml_variants = skip_ml_variants
+        self.jobs = max(1, jobs)
+        self.optimize = optimize
+        self.no_install_recommends = no_install_recommends
+        self.cache_mounts = cache_mounts
+        self.multi_stage = multi_stage
+        # Layer counts of the Dockerfiles optimized during the current build
+        self.optimization = OptimizationReport()
+        self._optimization_lock = threading.Lock()
+        # Runtimes built by build_all_images_for_all_runtimes, ML variants are only skipped for latest LTS builds
+        self.selector = (
+            RuntimeSelector(latest_lts=latest_lts_count, include_ml=not skip_ml_variants)
+            if latest_lts_count is not None
+            else RuntimeSelector()
+        )
 
         # Store workspace root for relative path calculations
         # Find the project root by looking for pyproject.toml
@@ -55,8 +118,13 @@ class RuntimeContainerEngine:
 
         # Ensure data directory exists
         self.data_dir.mkdir(exist_ok=True)
+        # Skips rewriting unchanged artifacts and prunes stale ones after a full build
+        self.artifacts = ArtifactWriter(self.data_dir, staged=atomic)
+        # OS base images rendered during the current build, keyed by (image type, Ubuntu version, registry)
+        self._os_base_images: dict[tuple[str, str, str | None], Path | None] = {}
+        self._os_base_images_lock = threading.Lock()
 
-        # Image type configurations with dependency chains
+        # Image type configurations with dependency chains, see get_build_graph for the resulting images
         # Standard chain: minimal -> standard -> python
         # GPU chain: nvidia/cuda -> minimal-gpu -> standard-gpu -> python-gpu
         # Standalone GPU: nvidia/cuda -> gpu
@@ -67,6 +135,7 @@ class RuntimeContainerEngine:
                 "kwargs": {},
                 "depends_on": None,  # Standalone, uses nvidia/cuda directly
                 "runtime_specific": False,  # Does not need runtime-specific builds
+                "os_specific": False,
             },
             "minimal": {
                 "class": MinimalUbuntuDockerfile,
@@ -74,6 +143,7 @@ class RuntimeContainerEngine:
                 "kwargs": {},
                 "depends_on": None,  # Base image, no dependencies
                 "runtime_specific": False,
+                "os_specific": True,  # Built per Ubuntu version of the runtimes
             },
             "minimal-gpu": {
                 "class": MinimalUbuntuDockerfile,
@@ -81,6 +151,7 @@ class RuntimeContainerEngine:
                 "kwargs": {"use_gpu_base": True},
                 "depends_on": "gpu",  # Depends on gpu base image
                 "runtime_specific": False,
+                "os_specific": True,  # Built per Ubuntu version of the runtimes
             },
             "standard": {
                 "class": StandardDockerfile,
@@ -88,6 +159,7 @@ class RuntimeContainerEngine:
                 "kwargs": {},
                 "depends_on": "minimal",
                 "runtime_specific": False,  # Does not need runtime-specific builds
+                "os_specific": True,  # Built per Ubuntu version of the runtimes
             },
             "standard-gpu": {
                 "class": StandardDockerfile,
@@ -95,6 +167,7 @@ class RuntimeContainerEngine:
                 "kwargs": {"use_gpu_base": True},
                 "depends_on": "minimal-gpu",
                 "runtime_specific": False,  # Does not need runtime-specific builds
+                "os_specific": True,  # Built per Ubuntu version of the runtimes
             },
             "python": {
                 "class": PythonDockerfile,
@@ -102,6 +175,7 @@ class RuntimeContainerEngine:
                 "kwargs": {},
                 "depends_on": "standard",
                 "runtime_specific": True,  # Needs runtime-specific requirements.txt
+                "os_specific": False,
             },
             "python-gpu": {
                 "class": PythonDockerfile,
@@ -109,9 +183,41 @@ class RuntimeContainerEngine:
                 "kwargs": {"use_gpu_base": True},
                 "depends_on": "standard-gpu",
                 "runtime_specific": True,  # Needs runtime-specific requirements.txt
+                "os_specific": False,
             },
         }
 
+    def get_runtimes(self, selector: RuntimeSelector | None = None) -> list[Runtime]:
+        """Get all supported runtimes, from the catalog snapshot if configured.
+
+        Args:
+            selector: Only get matching runtimes. Without a catalog, only matching runtimes are scraped.
+
+        Returns:
+            List of runtimes, newest release first
+        """
+        if self.catalog_path is None:
+            return self.scraper.get_supported_runtimes(selector=selector)
+        return get_runtimes(self.scraper, self.catalog_path, refresh=self.refresh_catalog, selector=selector)
+
+    def iter_runtimes(self, selector: RuntimeSelector | None = None) -> Iterator[Runtime]:
+        """Iterate over all supported runtimes, yielding scraped runtimes as soon as they are parsed.
+
+        Args:
+            selector: Only yield matching runtimes. Without a catalog, only matching runtimes are scraped.
+
+        Yields:
+            Runtimes in completion order when scraping, newest release first when loaded from the catalog
+        """
+        if self.catalog_path is None:
+            return self.scraper.iter_supported_runtimes(selector=selector)
+        return iter_runtimes(self.scraper, self.catalog_path, refresh=self.refresh_catalog, selector=selector)
+
+    @property
+    def covers_catalog(self) -> bool:
+        """Whether the last build covered the complete catalog: no runtime filtered out, every release parsed."""
+        return not self.selector.is_partial and not self.scraper.failed_releases
+
     def get_dependency_image_reference(
         self,
         image_type: str,
@@ -338,7 +444,8 @@ class RuntimeContainerEngine:
 
         # Handle OS version for base images (minimal, minimal-gpu, standard, standard-gpu)
         # Check if we need to build with a specific OS version
-        if image_type in ["minimal", "minimal-gpu", "standard", "standard-gpu"] and variation:
+        os_specific = [k for k, v in self.image_types.items() if v["os_specific"]]
+        if image_type in os_specific and variation:
             should_upgrade, os_version_to_use = self.should_upgrade_os_version(variation)
             runtime_os = variation.get("os_version", "24.04")
 
@@ -354,8 +461,7 @@ class RuntimeContainerEngine:
                 os_version_to_use = runtime_os
 
             # Pass ubuntu_version to minimal/minimal-gpu and standard/standard-gpu images
-            if image_type in ["minimal", "minimal-gpu", "standard", "standard-gpu"]:
-                kwargs["ubuntu_version"] = os_version_to_use
+            kwargs["ubuntu_version"] = os_version_to_use
 
         # Override base image if not already specified and we have a dependency
         # For images without dependencies (minimal, minimal-gpu), let the class handle the base image
@@ -371,11 +477,11 @@ class RuntimeContainerEngine:
         # Only python and python-gpu images accept runtime parameter
         if image_type in runtime_specific:
             kwargs["runtime"] = runtime
+            kwargs["multi_stage"] = self.multi_stage
 
-            # Generate requirements.txt and pass the path
+            # Pass the path of the requirements.txt rendered next to the Dockerfile (see render_image)
             # The path needs to be relative to the build context (project root)
-            # Generate the requirements.txt file
-            requirements_abs_path = self.generate_requirements_txt(runtime, image_type, variation)
+            requirements_abs_path = self.get_runtime_dir(runtime, image_type, variation) / "requirements.txt"
 
             # Convert to relative path if it's absolute, otherwise use as-is
             if requirements_abs_path.is_absolute():
@@ -394,40 +500,73 @@ class RuntimeContainerEngine:
         image_instance = image_class(**kwargs)
 
         # Generate the Dockerfile
-        dockerfile_content = image_instance.render()
+        dockerfile_content = image_instance.render(
+            optimize=self.optimize, no_install_recommends=self.no_install_recommends, cache_mounts=self.cache_mounts
+        )
+        if image_instance.optimization is not None:
+            # Rewritten apt commands change what ends up in the image, layer counts are just noise
+            log = self.logger.info if image_instance.optimization.apt_changes else self.logger.debug
+            log(f"Optimized {image_type} image for runtime {runtime.version}: {image_instance.optimization}")
+            with self._optimization_lock:
+                self.optimization.update(image_instance.optimization)
 
         return dockerfile_content
 
-    def save_dockerfile(
-        self, dockerfile_content: str, runtime: Runtime, image_type: str, variation: dict[str, str] | None = None
-    ) -> Path:
-        """Save a generated Dockerfile to the appropriate location.
+    def get_runtime_dir(self, runtime: Runtime, image_type: str, variation: dict[str, str] | None = None) -> Path:
+        """Get the output directory of a runtime-specific image.
 
         Args:
-            dockerfile_content: The Dockerfile content to save
-            runtime: The runtime this Dockerfile is for
+            runtime: The runtime
             image_type: The type of image
             variation: Optional variation config for naming
 
         Returns:
-            Path to the saved file
+            Directory data/{image_type}/{runtime_version}[-variation][-ml]/
         """
-        # Create directory structure: data/{image_type}/{runtime_version}[-variation][-ml]/
         runtime_version = self.sanitize_runtime_version(runtime.version)
         if variation:
             separator = variation.get("separator", "-")
             runtime_version = f"{runtime_version}{separator}{variation['suffix']}"
         if runtime.is_ml:
             runtime_version = f"{runtime_version}-ml"
+        return self.data_dir / image_type / runtime_version
+
+    def get_os_base_dir(self, image_type: str, os_version: str = "24.04") -> Path:
+        """Get the output directory of an image that is not runtime-specific.
+
+        Args:
+            image_type: The type of image
+            os_version: Ubuntu version the image is built with
+
+        Returns:
+            Ubuntu 24.04 goes to data/{image_type}/latest/, other versions get their own folder
+        """
+        if os_version == "24.04":
+            return self.data_dir / image_type / "latest"
+        return self.data_dir / image_type / f"ubuntu{os_version.replace('.', '')}"
 
-        runtime_dir = self.data_dir / image_type / runtime_version
+    def save_dockerfile(
+        self, dockerfile_content: str, runtime: Runtime, image_type: str, variation: dict[str, str] | None = None
+    ) -> Path:
+        """Save a generated Dockerfile to the appropriate location.
+
+        Args:
+            dockerfile_content: The Dockerfile content to save
+            runtime: The runtime this Dockerfile is for
+            image_type: The type of image
+            variation: Optional variation config for naming
+
+        Returns:
+            Path to the saved file
+        """
+        runtime_dir = self.get_runtime_dir(runtime, image_type, variation)
         runtime_dir.mkdir(parents=True, exist_ok=True)
 
         # Determine filename - always use "Dockerfile" now that ML variants have their own folder
         filename = "Dockerfile"
 
         dockerfile_path = runtime_dir / filename
-        dockerfile_path.write_text(dockerfile_content)
+        self.artifacts.write(dockerfile_path, dockerfile_content)
 
         variation_info = f" ({variation['suffix']})" if variation else ""
         self.logger.debug(
@@ -435,6 +574,30 @@ class RuntimeContainerEngine:
         )
         return dockerfile_path
 
+    def render_requirements_txt(self, runtime: Runtime) -> str:
+        """Render requirements.txt from runtime's included libraries.
+
+        Args:
+            runtime: The runtime with included_libraries data
+
+        Returns:
+            The requirements.txt content
+        """
+        # Generate requirements from included_libraries
+        python_libs = runtime.included_libraries.get("python", {})
+
+        lines = [
+            "# Python requirements for Databricks runtime\n",
+            f"# Runtime version: {runtime.version}\n",
+            "# Generated from included_libraries\n\n",
+        ]
+        # Sort libraries alphabetically for consistency
+        for lib_name, lib_version in sorted(python_libs.items()):
+            # Handle both string versions and tuple (version, channel) format
+            version = lib_version[0] if isinstance(lib_version, tuple) else lib_version
+            lines.append(f"{lib_name}=={version}\n")
+        return "".join(lines)
+
     def generate_requirements_txt(
         self, runtime: Runtime, image_type: str, variation: dict[str, str] | None = None
     ) -> Path:
@@ -448,57 +611,23 @@ class RuntimeContainerEngine:
         Returns:
             Path to the generated requirements.txt file
         """
-        runtime_version = self.sanitize_runtime_version(runtime.version)
-        if variation:
-            separator = variation.get("separator", "-")
-            runtime_version = f"{runtime_version}{separator}{variation['suffix']}"
-        if runtime.is_ml:
-            runtime_version = f"{runtime_version}-ml"
-
-        runtime_dir = self.data_dir / image_type / runtime_version
-        runtime_dir.mkdir(parents=True, exist_ok=True)
+        requirements_path = self.get_runtime_dir(runtime, image_type, variation) / "requirements.txt"
+        self.artifacts.write(requirements_path, self.render_requirements_txt(runtime))
 
-        requirements_path = runtime_dir / "requirements.txt"
-
-        # Generate requirements from included_libraries
         python_libs = runtime.included_libraries.get("python", {})
-
-        # Write requirements.txt
-        with requirements_path.open("w") as f:
-            f.write("# Python requirements for Databricks runtime\n")
-            f.write(f"# Runtime version: {runtime.version}\n")
-            f.write("# Generated from included_libraries\n\n")
-
-            # Sort libraries alphabetically for consistency
-            for lib_name, lib_version in sorted(python_libs.items()):
-                # Handle both string versions and tuple (version, channel) format
-                version = lib_version[0] if isinstance(lib_version, tuple) else lib_version
-                f.write(f"{lib_name}=={version}\n")
-
         self.logger.debug(f"Generated requirements.txt with {len(python_libs)} packages for {runtime.version}")
         return requirements_path
 
-    def save_runtime_metadata(self, runtime: Runtime, image_type: str, variation: dict[str, str] | None = None) -> Path:
-        """Save runtime metadata as JSON for reference.
+    def render_runtime_metadata(self, runtime: Runtime, variation: dict[str, str] | None = None) -> str:
+        """Render runtime metadata as JSON for reference.
 
         Args:
-            runtime: The runtime to save metadata for
-            image_type: The type of image this metadata corresponds to
-            variation: Optional variation config for naming
+            runtime: The runtime to render metadata for
+            variation: Optional variation config
 
         Returns:
-            Path to the saved metadata file
+            The runtime_metadata.json content
         """
-        runtime_version = self.sanitize_runtime_version(runtime.version)
-        if variation:
-            separator = variation.get("separator", "-")
-            runtime_version = f"{runtime_version}{separator}{variation['suffix']}"
-        if runtime.is_ml:
-            runtime_version = f"{runtime_version}-ml"
-
-        runtime_dir = self.data_dir / image_type / runtime_version
-        runtime_dir.mkdir(parents=True, exist_ok=True)
-
         release_date = (
             runtime.release_date if isinstance(runtime.release_date, str) else runtime.release_date.isoformat()
         )
@@ -536,22 +665,96 @@ class RuntimeContainerEngine:
                 "suffix": variation["suffix"],
             }
 
-        # Determine filename - always use "runtime_metadata.json" now that ML variants have their own folder
-        filename = "runtime_metadata.json"
+        return json.dumps(metadata, indent=2)
 
-        metadata_path = runtime_dir / filename
-        metadata_path.write_text(json.dumps(metadata, indent=2))
+    def save_runtime_metadata(self, runtime: Runtime, image_type: str, variation: dict[str, str] | None = None) -> Path:
+        """Save runtime metadata as JSON for reference.
+
+        Args:
+            runtime: The runtime to save metadata for
+            image_type: The type of image this metadata corresponds to
+            variation: Optional variation config for naming
+
+        Returns:
+            Path to the saved metadata file
+        """
+        # Always use "runtime_metadata.json" now that ML variants have their own folder
+        metadata_path = self.get_runtime_dir(runtime, image_type, variation) / "runtime_metadata.json"
+        self.artifacts.write(metadata_path, self.render_runtime_metadata(runtime, variation))
 
         variation_info = f" ({variation['suffix']})" if variation else ""
         self.logger.debug(f"Saved runtime metadata for {runtime.version}{variation_info} to {metadata_path}")
         return metadata_path
 
-    def build_all_images_for_runtime(self, runtime: Runtime, registry: str | None = None) -> dict[str, list[Path]]:
+    def render_image(
+        self,
+        runtime: Runtime,
+        image_type: str,
+        variation: dict[str, str] | None = None,
+        registry: str | None = None,
+    ) -> dict[Path, bytes]:
+        """Render all files of an image for a runtime without writing them.
+
+        Args:
+            runtime: The runtime to build the image for
+            image_type: The type of image
+            variation: Optional variation config with os_version and python_version
+            registry: Optional registry prefix for image naming
+
+        Returns:
+            Content by path of the Dockerfile, the requirements.txt (for runtime-specific images) and the
+            runtime_metadata.json
+        """
+        config = self.image_types[image_type]
+        runtime_dir = self.get_runtime_dir(runtime, image_type, variation)
+        artifacts = {
+            runtime_dir / "Dockerfile": self.generate_dockerfile_for_image_type(
+                runtime, image_type, config, variation, registry
+            ).encode()
+        }
+        if config["runtime_specific"]:
+            artifacts[runtime_dir / "requirements.txt"] = self.render_requirements_txt(runtime).encode()
+        artifacts[runtime_dir / "runtime_metadata.json"] = self.render_runtime_metadata(runtime, variation).encode()
+        return artifacts
+
+    def _image_files(self, runtime: Runtime, image_type: str, variation: dict[str, str] | None) -> list[Path]:
+        """Files of an image that are listed in the build summary."""
+        runtime_dir = self.get_runtime_dir(runtime, image_type, variation)
+        return [runtime_dir / "Dockerfile", runtime_dir / "runtime_metadata.json"]
+
+    def render_runtime(self, runtime: Runtime, registry: str | None = None) -> dict[Path, bytes]:
+        """Render all images of a runtime without writing them.
+
+        Args:
+            runtime: The runtime to render images for
+            registry: Optional registry prefix for image naming
+
+        Returns:
+            Content by path of the runtime-specific images of every variation and the OS base images they need
+        """
+        variations = self.get_runtime_variations(runtime)
+        artifacts = self.render_os_base_images(self.get_os_base_versions(variations), registry)
+        for image_type, config in self.image_types.items():
+            if not config["runtime_specific"]:
+                continue
+            for variation in variations:
+                try:
+                    artifacts.update(self.render_image(runtime, image_type, variation, registry))
+                except Exception:
+                    self.logger.exception(
+                        f"Failed to generate {image_type} image for runtime {runtime.version} variation {variation['suffix']}"
+                    )
+        return artifacts
+
+    def build_all_images_for_runtime(
+        self, runtime: Runtime, registry: str | None = None, show_progress: bool = True
+    ) -> dict[str, list[Path]]:
         """Build all image variations for a single runtime.
 
         Args:
             runtime: The runtime to build images for
             registry: Optional registry prefix for image naming
+            show_progress: Show a progress bar over the image types (disabled when runtimes are built in parallel)
 
         Returns:
             Dictionary mapping image types to lists of generated file paths
@@ -568,108 +771,309 @@ class RuntimeContainerEngine:
         # Get all variations for this runtime
         variations = self.get_runtime_variations(runtime)
 
-        # Check if we need to build OS-specific base images (minimal, standard)
-        # This happens when the runtime uses a different OS version or force_ubuntu_version is set
+        # Build the OS-specific base images (minimal, standard) this runtime depends on, each is rendered once per build
+        os_versions = self.get_os_base_versions(variations)
         for variation in variations:
             should_upgrade, os_version_to_use = self.should_upgrade_os_version(variation)
-            runtime_os = variation.get("os_version", "24.04")
-
-            # Build OS-specific base images if needed
-            if runtime_os != "24.04" or self.force_ubuntu_version:
-                # Build minimal and standard images with the specific OS version
-                for base_type in ["minimal", "standard"]:
-                    # Also build GPU variants if they're in the dependency chain
-                    for use_gpu in [False, True]:
-                        image_type = f"{base_type}-gpu" if use_gpu else base_type
-                        config = self.image_types.get(image_type)
-
-                        if not config:
-                            continue
-
-                        try:
-                            # Create a minimal dummy runtime for base images
-                            dummy_runtime = Runtime(
-                                version="generic",
-                                release_date=date.today(),
-                                end_of_support_date=date.today(),
-                                spark_version="N/A",
-                                url="",
-                                is_ml=False,
-                                is_lts=False,
-                                system_environment=SystemEnvironment(
-                                    operating_system=f"Ubuntu {os_version_to_use} LTS",
-                                    java_version="N/A",
-                                    scala_version="N/A",
-                                    python_version="N/A",
-                                    r_version="N/A",
-                                    delta_lake_version="N/A",
-                                ),
-                                included_libraries={},
-                            )
-
-                            # Generate Dockerfile with OS-specific version
-                            dockerfile_content = self.generate_dockerfile_for_image_type(
-                                dummy_runtime, image_type, config, variation, registry
-                            )
-
-                            # Save to OS-specific directory
-                            # Ubuntu 24.04 goes to "latest", other versions get their own folder
-                            if os_version_to_use == "24.04":
-                                os_dir = self.data_dir / image_type / "latest"
-                            else:
-                                os_dir = self.data_dir / image_type / f"ubuntu{os_version_to_use.replace('.', '')}"
-                            os_dir.mkdir(parents=True, exist_ok=True)
-                            dockerfile_path = os_dir / "Dockerfile"
-                            dockerfile_path.write_text(dockerfile_content)
-
-                            self.logger.debug(f"Generated {image_type} base image for Ubuntu {os_version_to_use}")
-
-                        except Exception:
-                            self.logger.exception(
-                                f"Failed to generate {image_type} base image for Ubuntu {os_version_to_use}"
-                            )
+            if should_upgrade:
+                self.logger.info(
+                    f"🔄 Runtime {runtime.version} uses Ubuntu {variation['os_version']}, "
+                    f"automatically upgrading base images to Ubuntu {os_version_to_use}"
+                )
+        self.build_os_base_images(os_versions, registry)
 
         # Build runtime-specific images: python chain (standard -> python)
         runtime_specific_types = [k for k, v in self.image_types.items() if v["runtime_specific"]]
 
-        # Filter image types to only those that need runtime variations
-        filtered_image_types = {k: v for k, v in self.image_types.items() if k in runtime_specific_types}
+        # Render all images first, then write them in one go
+        artifacts: dict[Path, bytes] = {}
 
         # Use rich track for progress indication
-        for image_type, config in self.logger.progress(
-            filtered_image_types.items(), description=f"Generating {runtime.version}"
-        ):
+        image_types = runtime_specific_types
+        if show_progress:
+            image_types = self.logger.progress(image_types, description=f"Generating {runtime.version}")
+        for image_type in image_types:
             generated_files[image_type] = []
 
-            try:
-                # Build images for each variation
-                for variation in variations:
-                    try:
-                        # Generate Dockerfile (requirements.txt is generated inside for python images)
-                        dockerfile_content = self.generate_dockerfile_for_image_type(
-                            runtime, image_type, config, variation, registry
-                        )
-                        dockerfile_path = self.save_dockerfile(dockerfile_content, runtime, image_type, variation)
+            # Build images for each variation
+            for variation in variations:
+                try:
+                    artifacts.update(self.render_image(runtime, image_type, variation, registry))
 
-                        # Save metadata
-                        metadata_path = self.save_runtime_metadata(runtime, image_type, variation)
+                    generated_files[image_type].extend(self._image_files(runtime, image_type, variation))
 
-                        generated_files[image_type].extend([dockerfile_path, metadata_path])
+                    # Minimal success indication (no permanent log entry)
+                    # Just log debug message instead of print
+                    self.logger.debug(f"Generated {image_type} image for variation {variation['suffix']}")
 
-                        # Minimal success indication (no permanent log entry)
-                        # Just log debug message instead of print
-                        self.logger.debug(f"Generated {image_type} image for variation {variation['suffix']}")
+                except Exception:
+                    self.logger.exception(
+                        f"Failed to generate {image_type} image for runtime {runtime.version} variation {variation['suffix']}"
+                    )
 
-                    except Exception:
-                        self.logger.exception(
-                            f"Failed to generate {image_type} image for runtime {runtime.version} variation {variation['suffix']}"
-                        )
+        self.artifacts.write_all(artifacts)
+        return generated_files
 
-            except Exception:
-                self.logger.exception(f"Failed to generate {image_type} image for runtime {runtime.version}")
+    @staticmethod
+    def _generic_runtime(os_version: str = "24.04") -> Runtime:
+        """Placeholder runtime for images that do not depend on a specific runtime."""
+        return Runtime(
+            version="generic",
+            release_date=date.today(),
+            end_of_support_date=date.today(),
+            spark_version="N/A",
+            url="",
+            is_ml=False,
+            is_lts=False,
+            system_environment=SystemEnvironment(
+                operating_system=f"Ubuntu {os_version} LTS",
+                java_version="N/A",
+                scala_version="N/A",
+                python_version="N/A",
+                r_version="N/A",
+                delta_lake_version="N/A",
+            ),
+            included_libraries={},
+        )
+
+    def get_os_base_versions(self, variations: Iterable[dict[str, str]]) -> set[str]:
+        """Get the Ubuntu versions OS-specific base images are needed for.
+
+        Base images are only built per OS when a variation uses a different OS than the default or
+        force_ubuntu_version is set.
+
+        Args:
+            variations: Runtime variations with os_version
+
+        Returns:
+            Ubuntu versions to build the base images with
+        """
+        return {
+            self.should_upgrade_os_version(variation)[1]
+            for variation in variations
+            if variation.get("os_version", "24.04") != "24.04" or self.force_ubuntu_version
+        }
+
+    def build_os_base_images(self, os_versions: Iterable[str], registry: str | None = None) -> dict[str, list[Path]]:
+        """Build the OS-specific base images for the given Ubuntu versions.
+
+        Each (image type, Ubuntu version) is rendered once per build, runtimes sharing an OS reuse the file that was
+        generated first.
+
+        Args:
+            os_versions: Ubuntu versions to build the base images with
+            registry: Optional registry prefix for image naming
 
+        Returns:
+            Dictionary mapping image types to lists of generated file paths
+        """
+        generated_files: dict[str, list[Path]] = {}
+        for os_version in sorted(set(os_versions)):
+            for image_type, config in self.image_types.items():
+                if not config["os_specific"]:
+                    continue
+
+                key = (image_type, os_version, registry)
+                # Held while rendering, so runtimes generated in parallel do not render the same image twice
+                with self._os_base_images_lock:
+                    if key not in self._os_base_images:
+                        self._os_base_images[key] = self._build_os_base_image(image_type, config, os_version, registry)
+                    path = self._os_base_images[key]
+                if path is not None:
+                    generated_files.setdefault(image_type, []).append(path)
         return generated_files
 
+    def _build_os_base_image(
+        self, image_type: str, config: dict[str, Any], os_version: str, registry: str | None
+    ) -> Path | None:
+        try:
+            path, dockerfile_content = self._render_os_base_image(image_type, config, os_version, registry)
+            self.artifacts.write(path, dockerfile_content)
+        except Exception:
+            self.logger.exception(f"Failed to generate {image_type} base image for Ubuntu {os_version}")
+            return None
+
+        self.logger.debug(f"Generated {image_type} base image for Ubuntu {os_version}")
+        return path
+
+    def _render_os_base_image(
+        self, image_type: str, config: dict[str, Any], os_version: str, registry: str | None
+    ) -> tuple[Path, str]:
+        dockerfile_content = self.generate_dockerfile_for_image_type(
+            self._generic_runtime(os_version), image_type, config, {"os_version": os_version}, registry
+        )
+        return self.get_os_base_dir(image_type, os_version) / "Dockerfile", dockerfile_content
+
+    def render_os_base_images(self, os_versions: Iterable[str], registry: str | None = None) -> dict[Path, bytes]:
+        """Render the OS-specific base images for the given Ubuntu versions without writing them.
+
+        Args:
+            os_versions: Ubuntu versions to render the base images with
+            registry: Optional registry prefix for image naming
+
+        Returns:
+            Dockerfile content by path
+        """
+        artifacts = {}
+        for os_version in sorted(set(os_versions)):
+            for image_type, config in self.image_types.items():
+                if not config["os_specific"]:
+                    continue
+                try:
+                    path, dockerfile_content = self._render_os_base_image(image_type, config, os_version, registry)
+                except Exception:
+                    self.logger.exception(f"Failed to generate {image_type} base image for Ubuntu {os_version}")
+                    continue
+                artifacts[path] = dockerfile_content.encode()
+        return artifacts
+
+    def get_build_graph(self, runtimes: Iterable[Runtime] = ()) -> BuildGraph:
+        """Get the graph of images generated for the given runtimes.
+
+        Nodes are images (image type, Ubuntu version, Python version, runtime, ML) and every image has an edge to the
+        image it is built FROM, following the depends_on chain of the image types. OS base images are chained to the
+        base images of the same Ubuntu version, runtime-specific images to the base images of the Ubuntu version
+        they are built on.
+
+        Args:
+            runtimes: Runtimes to add the runtime-specific and OS base images for. Without runtimes, the graph only
+                contains the images that are not runtime-specific.
+
+        Returns:
+            The build graph
+        """
+        graph = BuildGraph()
+        for image_type, config in self.image_types.items():
+            if not config["runtime_specific"]:
+                self._add_base_image(graph, image_type)
+
+        for runtime in runtimes:
+            variations = self.get_runtime_variations(runtime)
+            for os_version in sorted(self.get_os_base_versions(variations)):
+                for image_type, config in self.image_types.items():
+                    if config["os_specific"]:
+                        self._add_base_image(graph, image_type, os_version)
+
+            for variation in variations:
+                _, base_os_version = self.should_upgrade_os_version(variation)
+                for image_type, config in self.image_types.items():
+                    if not config["runtime_specific"]:
+                        continue
+                    node = ImageNode(
+                        image_type=image_type,
+                        os_version=variation["os_version"],
+                        python_version=variation["python_version"],
+                        runtime=runtime.version,
+                        is_ml=runtime.is_ml,
+                        dockerfile=self.get_runtime_dir(runtime, image_type, variation) / "Dockerfile",
+                        suffix=f"{variation.get('separator', '-')}{variation['suffix']}",
+                    )
+                    parent = self._add_base_image(graph, config["depends_on"], base_os_version)
+                    graph.add(node, parent)
+
+        return graph
+
+    def _add_base_image(self, graph: BuildGraph, image_type: str | None, os_version: str = "24.04") -> ImageNode | None:
+        """Add an image that is not runtime-specific and the images it depends on to the graph."""
+        if image_type is None:
+            return None
+        config = self.image_types[image_type]
+        depends_on = config["depends_on"]
+        # Only images built per OS exist for other Ubuntu versions
+        parent_os_version = os_version if depends_on and self.image_types[depends_on]["os_specific"] else "24.04"
+        parent = self._add_base_image(graph, depends_on, parent_os_version)
+        node = ImageNode(
+            image_type=image_type,
+            os_version=os_version,
+            dockerfile=self.get_os_base_dir(image_type, os_version) / "Dockerfile",
+        )
+        return graph.add(node, parent)
+
+    def render_build_graph(self, graph: BuildGraph) -> str:
+        """Render the build graph as JSON, with Dockerfile paths relative to the workspace root."""
+        return json.dumps(graph.to_dict(self.workspace_root), indent=2)
+
+    def save_build_graph(self, graph: BuildGraph) -> Path:
+        """Save the build graph, so downstream docker builds can be scheduled level by level.
+
+        Args:
+            graph: The build graph of the generated images
+
+        Returns:
+            Path to the saved graph file
+        """
+        graph_path = self.data_dir / "build_graph.json"
+        self.artifacts.write(graph_path, self.render_build_graph(graph))
+
+        self.logger.info(
+            f"Saved build graph with {len(graph)} images in {len(graph.levels())} levels "
+            f"(critical path: {graph.critical_path_length():g} images) to {graph_path}"
+        )
+        return graph_path
+
+    def get_image_records(
+        self,
+        graph: BuildGraph,
+        runtimes: Iterable[Runtime] = (),
+        digest: Callable[[Path], str | None] | None = None,
+    ) -> list[ImageRecord]:
+        """Describe every image of the build graph for the build summary.
+
+        Args:
+            graph: The build graph of the generated images
+            runtimes: The runtimes the graph was built for
+            digest: Returns the SHA-256 of a generated Dockerfile, None if it was not generated
+
+        Returns:
+            A record per image, in build order
+        """
+        is_lts = {(runtime.version, runtime.is_ml): runtime.is_lts for runtime in runtimes}
+        records = []
+        for node in graph.topological_order():
+            parents = sorted(str(dependency) for dependency in graph.dependencies(node))
+            records.append(
+                ImageRecord(
+                    name=str(node),
+                    image_type=node.image_type,
+                    os_version=node.os_version,
+                    python_version=node.python_version,
+                    runtime=node.runtime,
+                    runtime_version=ImageRecord.parse_version(node.runtime) if node.runtime else [],
+                    is_lts=is_lts.get((node.runtime, node.is_ml), False),
+                    is_ml=node.is_ml,
+                    suffix=node.suffix,
+                    dockerfile=str(node.dockerfile.absolute().relative_to(self.workspace_root)),
+                    sha256=digest(node.dockerfile) if digest is not None else None,
+                    parent=parents[0] if parents else None,
+                )
+            )
+        return records
+
+    def _render_non_runtime_specific_image(self, image_type: str, registry: str | None) -> str:
+        # Generate Dockerfile without runtime-specific configuration
+        # Create a minimal Runtime object for the method signature (minimal images don't use it)
+        dummy_runtime = self._generic_runtime()
+        return self.generate_dockerfile_for_image_type(
+            dummy_runtime, image_type, self.image_types[image_type], variation=None, registry=registry
+        )
+
+    def render_non_runtime_specific_images(self, registry: str | None = None) -> dict[Path, bytes]:
+        """Render image types that don't need runtime variations without writing them.
+
+        Args:
+            registry: Optional registry prefix for image naming
+
+        Returns:
+            Dockerfile content by path
+        """
+        artifacts = {}
+        for node in self.get_build_graph().topological_order():
+            try:
+                artifacts[node.dockerfile] = self._render_non_runtime_specific_image(node.image_type, registry).encode()
+            except Exception:
+                self.logger.exception(f"Failed to generate {node.image_type} image (non-runtime-specific)")
+        return artifacts
+
     def build_non_runtime_specific_images(self, registry: str | None = None) -> dict[str, list[Path]]:
         """Build image types that don't need runtime variations.
 
@@ -681,51 +1085,23 @@ class RuntimeContainerEngine:
         """
         self.logger.print("\n🔨 Building non-runtime-specific images")
         generated_files = {}
+        artifacts: dict[Path, bytes] = {}
 
-        # Image types that don't need runtime variations
-        non_runtime_types = [k for k, v in self.image_types.items() if not v["runtime_specific"]]
-
-        # Filter image types to only those that don't need runtime variations
-        filtered_image_types = {k: v for k, v in self.image_types.items() if k in non_runtime_types}
+        # Image types that don't need runtime variations, in dependency order
+        nodes = self.get_build_graph().topological_order()
 
         # Use rich track for progress indication
-        for image_type, config in self.logger.progress(
-            filtered_image_types.items(), description="Generating non-runtime-specific images"
-        ):
+        for node in self.logger.progress(nodes, description="Generating non-runtime-specific images"):
+            image_type = node.image_type
             try:
-                # Generate Dockerfile without runtime-specific configuration
-                # Create a minimal Runtime object for the method signature (minimal images don't use it)
-                dummy_runtime = Runtime(
-                    version="generic",
-                    release_date=date.today(),
-                    end_of_support_date=date.today(),
-                    spark_version="N/A",
-                    url="",
-                    is_ml=False,
-                    is_lts=False,
-                    system_environment=SystemEnvironment(
-                        operating_system="Ubuntu 24.04 LTS",
-                        java_version="N/A",
-                        scala_version="N/A",
-                        python_version="N/A",
-                        r_version="N/A",
-                        delta_lake_version="N/A",
-                    ),
-                    included_libraries={},
-                )
-
-                dockerfile_content = self.generate_dockerfile_for_image_type(
-                    dummy_runtime, image_type, config, variation=None, registry=registry
-                )
-
                 # Save to a generic location without runtime version
-                base_dir = self.data_dir / image_type / "latest"
-                base_dir.mkdir(parents=True, exist_ok=True)
-
-                dockerfile_path = base_dir / "Dockerfile"
-                dockerfile_path.write_text(dockerfile_content)
+                artifacts[node.dockerfile] = self._render_non_runtime_specific_image(image_type, registry).encode()
+                generated_files[image_type] = [node.dockerfile]
 
-                generated_files[image_type] = [dockerfile_path]
+                if self.image_types[image_type]["os_specific"]:
+                    # Same file runtimes on the default Ubuntu version would build as their OS base image
+                    with self._os_base_images_lock:
+                        self._os_base_images[(image_type, "24.04", registry)] = node.dockerfile
 
                 self.logger.debug(f"Generated {image_type} image (non-runtime-specific)")
 
@@ -733,7 +1109,8 @@ class RuntimeContainerEngine:
                 self.logger.exception(f"Failed to generate {image_type} image (non-runtime-specific)")
                 generated_files[image_type] = []
 
-        self.logger.info(f"Successfully generated {len(filtered_image_types.items())} images")
+        self.artifacts.write_all(artifacts)
+        self.logger.info(f"Successfully generated {len(nodes)} images")
         return generated_files
 
     def save_runtime_metadata_generic(self, runtime: Runtime, image_type: str) -> Path:
@@ -746,7 +1123,7 @@ class RuntimeContainerEngine:
         Returns:
             Path to the saved metadata file
         """
-        base_dir = self.data_dir / image_type / "latest"
+        base_dir = self.get_os_base_dir(image_type)
         base_dir.mkdir(parents=True, exist_ok=True)
 
         release_date = (
@@ -778,58 +1155,94 @@ class RuntimeContainerEngine:
         }
 
         metadata_path = base_dir / "runtime_metadata.json"
-        metadata_path.write_text(json.dumps(metadata, indent=2))
+        self.artifacts.write(metadata_path, json.dumps(metadata, indent=2))
 
         self.logger.debug(f"Saved generic runtime metadata for {image_type} to {metadata_path}")
         return metadata_path
 
-    def _filter_latest_lts_runtimes(self, runtimes: list[Runtime], count: int) -> list[Runtime]:
-        """Filter to only the latest N LTS versions.
+    @staticmethod
+    def _runtime_key(runtime: Runtime) -> str:
+        return f"{runtime.version}{'_ml' if runtime.is_ml else ''}"
 
-        Args:
-            runtimes: List of all runtimes
-            count: Number of latest LTS versions to keep
+    def _build_runtimes(
+        self, runtimes: Iterable[Runtime], registry: str | None = None
+    ) -> list[tuple[Runtime, dict[str, list[Path]]]]:
+        """Build all images for each runtime, on a pool of ``jobs`` threads if configured.
 
         Returns:
-            Filtered list containing only the latest N LTS versions (base and ML variants)
+            Runtimes with their generated files, in completion order
         """
-        # Group LTS runtimes by version (base and ML together)
-        lts_versions = {}
-        for runtime in runtimes:
-            if runtime.is_lts:
-                # Use version without ML suffix as key
-                version_key = runtime.version
-                if version_key not in lts_versions:
-                    lts_versions[version_key] = []
-                lts_versions[version_key].append(runtime)
-
-        # Sort versions by release date (most recent first)
-        sorted_versions = sorted(
-            lts_versions.items(),
-            key=lambda x: x[1][0].release_date if x[1] else "",
-            reverse=True,
-        )
+        if self.jobs == 1:
+            return [
+                (runtime, self.build_all_images_for_runtime(runtime, registry))
+                for runtime in self.logger.progress(runtimes, description="Processing runtimes")
+            ]
+
+        # Runtimes are submitted as they arrive, the progress bar starts once all of them are known
+        with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="generate") as executor:
+            futures = {
+                executor.submit(self.build_all_images_for_runtime, runtime, registry, show_progress=False): runtime
+                for runtime in runtimes
+            }
+            return [
+                (futures[future], future.result())
+                for future in self.logger.progress(
+                    as_completed(futures), description="Processing runtimes", total=len(futures)
+                )
+            ]
 
-        # Take the latest N versions
-        latest_versions = sorted_versions[:count]
+    def render_all(self, runtimes: Iterable[Runtime], registry: str | None = None) -> dict[Path, bytes]:
+        """Render the complete output for the given runtimes without writing anything.
 
-        # Flatten the list to include all variants (base and ML) of selected versions
-        filtered_runtimes = []
-        selected_versions = set()
-        for version, runtime_list in latest_versions:
-            if self.skip_ml_variants:
-                # Only include non-ML variants
-                filtered_runtimes.extend([r for r in runtime_list if not r.is_ml])
-            else:
-                filtered_runtimes.extend(runtime_list)
-            selected_versions.add(version)
+        The result contains the same files :meth:`build_all_images_for_all_runtimes` writes for these runtimes,
+        including the build summary and the build graph. Write it with ``engine.artifacts.write_all``.
+
+        Args:
+            runtimes: The runtimes to render images for
+            registry: Optional registry prefix for image naming
 
-        # Log which versions were selected
-        if selected_versions:
-            version_list = ", ".join(sorted(selected_versions))
-            self.logger.info(f"Building latest {count} LTS versions: {version_list}")
+        Returns:
+            File content by path
+        """
+        runtimes = RuntimeScraper.sort_runtimes(runtimes)
+        artifacts = self.render_non_runtime_specific_images(registry)
+        all_generated_files = {
+            "non_runtime_specific": {
+                node.image_type: [node.dockerfile] if node.dockerfile in artifacts else []
+                for node in self.get_build_graph().topological_order()
+            }
+        }
 
-        return filtered_runtimes
+        # Base images for the default Ubuntu version are the non-runtime-specific ones rendered above
+        os_versions = {
+            os for runtime in runtimes for os in self.get_os_base_versions(self.get_runtime_variations(runtime))
+        }
+        artifacts.update(self.render_os_base_images(os_versions - {"24.04"}, registry))
+
+        runtime_specific = [k for k, v in self.image_types.items() if v["runtime_specific"]]
+        for runtime in runtimes:
+            runtime_files = all_generated_files.setdefault(self._runtime_key(runtime), {})
+            for image_type in runtime_specific:
+                runtime_files[image_type] = []
+                for variation in self.get_runtime_variations(runtime):
+                    try:
+                        artifacts.update(self.render_image(runtime, image_type, variation, registry))
+                    except Exception:
+                        self.logger.exception(
+                            f"Failed to generate {image_type} image for runtime {runtime.version} variation {variation['suffix']}"
+                        )
+                        continue
+                    runtime_files[image_type].extend(self._image_files(runtime, image_type, variation))
+
+        graph = self.get_build_graph(runtimes)
+        images = self.get_image_records(
+            graph, runtimes, lambda path: hashlib.sha256(artifacts[path]).hexdigest() if path in artifacts else None
+        )
+        artifacts[self.data_dir / "build_summary.json"] = self.render_build_summary(
+            all_generated_files, images
+        ).encode()
+        artifacts[self.data_dir / "build_graph.json"] = self.render_build_graph(graph).encode()
+        return artifacts
 
     def build_all_images_for_all_runtimes(self, registry: str | None = None) -> dict[str, dict[str, list[Path]]]:
         """Build all image variations for all available runtimes.
@@ -849,38 +1262,52 @@ class RuntimeContainerEngine:
             )
         )
 
-        # Get all supported runtimes
-        with self.logger.status("[bold green]Fetching runtime information..."):
-            runtimes = self.scraper.get_supported_runtimes()
+        # OS base images are rendered once per build
+        with self._os_base_images_lock:
+            self._os_base_images.clear()
+        with self._optimization_lock:
+            self.optimization = OptimizationReport()
+
+        # Stream runtimes so Dockerfile generation overlaps with fetching the remaining pages. The selection is
+        # applied to the release index, so pages of runtimes that are not built are never fetched.
+        runtimes = self.iter_runtimes(self.selector)
 
-        if not runtimes:
+        first_runtime = next(runtimes, None)
+        if first_runtime is None:
             self.logger.error("No runtimes found")
             return {}
 
-        # Filter to latest LTS versions if configured
         if self.latest_lts_count is not None:
-            runtimes = self._filter_latest_lts_runtimes(runtimes, self.latest_lts_count)
             self.logger.print(
-                f"\n[bold cyan]📋 Processing {len(runtimes)} runtimes "
-                f"(latest {self.latest_lts_count} LTS versions)[/bold cyan]"
+                f"\n[bold cyan]📋 Processing runtimes (latest {self.latest_lts_count} LTS versions)[/bold cyan]"
             )
         else:
-            self.logger.print(f"\n[bold cyan]📋 Processing {len(runtimes)} runtimes[/bold cyan]")
-
-        all_generated_files = {}
+            self.logger.print("\n[bold cyan]📋 Processing runtimes as they are fetched[/bold cyan]")
 
         # Build non-runtime-specific images once
         non_runtime_files = self.build_non_runtime_specific_images(registry)
-        all_generated_files["non_runtime_specific"] = non_runtime_files
 
-        # Use rich track for overall progress
-        for runtime in self.logger.progress(runtimes, description="Processing runtimes"):
-            runtime_key = f"{runtime.version}{'_ml' if runtime.is_ml else ''}"
-            generated_files = self.build_all_images_for_runtime(runtime, registry)
-            all_generated_files[runtime_key] = generated_files
+        built = self._build_runtimes(chain([first_runtime], runtimes), registry)
+        runtime_files = {self._runtime_key(runtime): files for runtime, files in built}
+        processed = [runtime for runtime, _ in built]
+
+        # Report runtimes in display order, independent of the order in which they were fetched or built
+        all_generated_files = {"non_runtime_specific": non_runtime_files}
+        for runtime in RuntimeScraper.sort_runtimes(processed):
+            runtime_key = self._runtime_key(runtime)
+            all_generated_files[runtime_key] = runtime_files[runtime_key]
 
         # Save summary report
-        self.save_build_summary(all_generated_files)
+        graph = self.get_build_graph(processed)
+        self.save_build_summary(all_generated_files, self.get_image_records(graph, processed, self.artifacts.digest))
+        self.save_build_graph(graph)
+
+        # Only a build of the complete catalog regenerates every artifact, so that anything from earlier runs that was
+        # not written is stale. Filtered builds and builds with releases that failed to parse keep previous artifacts.
+        prune = self.covers_catalog
+        if not prune:
+            self.logger.info("Keeping artifacts of runtimes that were not built (partial or incomplete build)")
+        artifact_stats = self.artifacts.commit(prune=prune)
 
         # Final summary
         total_files = sum(
@@ -891,7 +1318,8 @@ class RuntimeContainerEngine:
             Panel(
                 f"[bold green]✅ Build Complete![/bold green]\n"
                 f"Generated [bold cyan]{total_files}[/bold cyan] files for "
-                f"[bold cyan]{len(runtimes)}[/bold cyan] runtimes",
+                f"[bold cyan]{len(processed)}[/bold cyan] runtimes\n"
+                f"Files: {artifact_stats}" + (f"\nLayers: {self.optimization}" if self.optimize else ""),
                 expand=False,
                 border_style="green",
             )
@@ -899,167 +1327,424 @@ class RuntimeContainerEngine:
 
         return all_generated_files
 
-    def save_build_summary(self, all_generated_files: dict[str, dict[str, list[Path]]]) -> Path:
-        """Save a summary of all generated files.
+    def _planned_files(self, runtimes: Iterable[Runtime]) -> dict[str, dict[str, list[Path]]]:
+        """Files a complete build generates for the runtimes if no image fails, in build summary order."""
+        all_files = {
+            "non_runtime_specific": {
+                node.image_type: [node.dockerfile] for node in self.get_build_graph().topological_order()
+            }
+        }
+        runtime_specific = [k for k, v in self.image_types.items() if v["runtime_specific"]]
+        for runtime in RuntimeScraper.sort_runtimes(runtimes):
+            variations = self.get_runtime_variations(runtime)
+            all_files[self._runtime_key(runtime)] = {
+                image_type: [
+                    path for variation in variations for path in self._image_files(runtime, image_type, variation)
+                ]
+                for image_type in runtime_specific
+            }
+        return all_files
+
+    def render_image_node(
+        self, node: ImageNode, runtimes: Mapping[tuple[str, bool], Runtime], registry: str | None = None
+    ) -> dict[Path, bytes]:
+        """Render all files of an image of the build graph without writing them.
+
+        Args:
+            node: The image
+            runtimes: Runtimes of the build graph by version and ML flag
+            registry: Optional registry prefix for image naming
+
+        Returns:
+            Content by path, see :meth:`render_image`
+        """
+        if node.runtime is None:
+            if node.os_version == "24.04":
+                content = self._render_non_runtime_specific_image(node.image_type, registry)
+            else:
+                config = self.image_types[node.image_type]
+                _, content = self._render_os_base_image(node.image_type, config, node.os_version, registry)
+            return {node.dockerfile: content.encode()}
+
+        runtime = runtimes[(node.runtime, node.is_ml)]
+        variation = next(
+            variation
+            for variation in self.get_runtime_variations(runtime)
+            if f"{variation.get('separator', '-')}{variation['suffix']}" == node.suffix
+        )
+        return self.render_image(runtime, node.image_type, variation, registry)
+
+    def get_shard_manifest_path(self, shard: int, shards: int) -> Path:
+        """Get the path of the partial build summary of a shard."""
+        return self.data_dir / f"build_shard-{shard}-of-{shards}.json"
+
+    def build_shard(self, shard: int, shards: int, registry: str | None = None) -> Path:
+        """Generate one slice of a complete build, for splitting generation across machines.
+
+        Every image of the build graph is assigned to a shard by a stable hash of its name, so all shards agree on
+        the partition without coordinating. The shard writes its files and a partial build summary, which
+        :meth:`merge_build_shards` combines once all shards are done.
+
+        Args:
+            shard: The shard to generate, from 1 to shards
+            shards: Number of shards
+            registry: Optional registry prefix for image naming
+
+        Returns:
+            Path to the partial build summary
+
+        Raises:
+            ValueError: If shard is not between 1 and shards
+        """
+        if not 1 <= shard <= shards:
+            raise ValueError(f"Shard must be between 1 and {shards}, got {shard}")
+
+        runtimes = RuntimeScraper.sort_runtimes(self.get_runtimes(self.selector))
+        graph = self.get_build_graph(runtimes)
+        assigned = [node for node in graph.topological_order() if shard_of(str(node), shards) == shard]
+
+        by_key = {(runtime.version, runtime.is_ml): runtime for runtime in runtimes}
+        artifacts: dict[Path, bytes] = {}
+        for node in self.logger.progress(assigned, description=f"Generating shard {shard}/{shards}"):
+            try:
+                artifacts.update(self.render_image_node(node, by_key, registry))
+            except Exception:
+                self.logger.exception(f"Failed to generate {node}")
+        self.artifacts.write_all(artifacts)
+
+        manifest = BuildShard(
+            shard=shard,
+            shards=shards,
+            build_details=self._relative_build_details(self._planned_files(runtimes)),
+            images=self.get_image_records(graph, runtimes, self.artifacts.digest),
+            assigned=[str(node) for node in assigned],
+            files={
+                str(path.absolute().relative_to(self.workspace_root)): hashlib.sha256(content).hexdigest()
+                for path, content in artifacts.items()
+            },
+        )
+        manifest_path = self.get_shard_manifest_path(shard, shards)
+        self.artifacts.write(manifest_path, manifest.model_dump_json(indent=2))
+        # Other shards write the rest of the output, nothing is stale
+        self.artifacts.commit()
+
+        self.logger.info(
+            f"Generated {len(assigned)} of {len(graph)} images as shard {shard}/{shards}, saved {manifest_path}"
+        )
+        return manifest_path
+
+    def merge_build_shards(self, paths: Iterable[Path] | None = None) -> Path:
+        """Combine the partial build summaries of all shards into the build summary and build graph.
+
+        Nothing is rendered again. The files of every shard must be in the output directory and match the hashes
+        their shard recorded, they are added to the artifact manifest. The partial summaries are removed once merged.
+
+        Args:
+            paths: Partial build summaries (default: all of them in the output directory)
+
+        Returns:
+            Path to the saved build summary
+
+        Raises:
+            ValueError: If shards are missing, come from different builds or their files do not match
+        """
+        paths = sorted(self.data_dir.glob("build_shard-*-of-*.json") if paths is None else paths)
+        manifests = [BuildShard.model_validate_json(path.read_bytes()) for path in paths]
+        if not manifests:
+            raise ValueError(f"No shard manifests found in {self.data_dir}")
+
+        shard_counts = {manifest.shards for manifest in manifests}
+        if len(shard_counts) != 1:
+            raise ValueError(f"Shard manifests come from builds with different shard counts: {sorted(shard_counts)}")
+        shards = shard_counts.pop()
+        numbers = sorted(manifest.shard for manifest in manifests)
+        if numbers != list(range(1, shards + 1)):
+            raise ValueError(f"Expected shards 1 to {shards} exactly once, got {numbers}")
+        names = [record.name for record in manifests[0].images]
+        if any([record.name for record in manifest.images] != names for manifest in manifests):
+            raise ValueError("Shard manifests come from different builds")
+
+        # Take every image record from the shard it was assigned to
+        owners = {name: manifest for manifest in manifests for name in manifest.assigned}
+        records = {id(manifest): {record.name: record for record in manifest.images} for manifest in manifests}
+        images = [records[id(owners[name])][name] for name in names]
+
+        for manifest in manifests:
+            for path, sha256 in manifest.files.items():
+                self.artifacts.track(self.workspace_root / path, sha256)
+
+        # Images that failed to generate are left out of the build details, like in a complete build
+        generated = {str(Path(record.dockerfile).parent) for record in images if record.sha256 is not None}
+        all_generated_files = {
+            runtime: {
+                image_type: [self.workspace_root / path for path in files if str(Path(path).parent) in generated]
+                for image_type, files in runtime_files.items()
+            }
+            for runtime, runtime_files in manifests[0].build_details.items()
+        }
+        summary_path = self.save_build_summary(all_generated_files, images)
+        self.save_build_graph(self._graph_from_records(images))
+        self.artifacts.commit()
+
+        # The output is now the same as a complete build, which has no partial summaries
+        for path in paths:
+            path.unlink()
+        self.logger.info(f"Merged {shards} shard manifests into {summary_path}")
+        return summary_path
+
+    def _graph_from_records(self, records: list[ImageRecord]) -> BuildGraph:
+        """Rebuild the build graph from the image records of a build summary."""
+        nodes = {
+            record.name: ImageNode(
+                image_type=record.image_type,
+                os_version=record.os_version,
+                python_version=record.python_version,
+                runtime=record.runtime,
+                is_ml=record.is_ml,
+                dockerfile=self.workspace_root / record.dockerfile,
+                suffix=record.suffix,
+            )
+            for record in records
+        }
+        graph = BuildGraph()
+        for record in records:
+            graph.add(nodes[record.name], nodes[record.parent] if record.parent is not None else None)
+        return graph
+
+    def _relative_build_details(
+        self, all_generated_files: dict[str, dict[str, list[Path]]]
+    ) -> dict[str, dict[str, list[str]]]:
+        return {
+            runtime: {
+                image_type: [str(path.absolute().relative_to(self.workspace_root)) for path in paths]
+                for image_type, paths in runtime_files.items()
+            }
+            for runtime, runtime_files in all_generated_files.items()
+        }
+
+    def render_build_summary(
+        self, all_generated_files: dict[str, dict[str, list[Path]]], images: Iterable[ImageRecord] = ()
+    ) -> str:
+        """Render a summary of all generated files as JSON.
 
         Args:
             all_generated_files: The complete mapping of generated files
+            images: A record per generated image, see :meth:`get_image_records`
 
         Returns:
-            Path to the saved summary file
+            The build_summary.json content
         """
-        summary = {
-            "total_runtimes": len(all_generated_files),
-            "image_types": list(self.image_types.keys()),
-            "total_files_generated": sum(
+        summary = BuildSummary(
+            total_runtimes=len(all_generated_files),
+            image_types=list(self.image_types.keys()),
+            total_files_generated=sum(
                 len(files) for runtime_files in all_generated_files.values() for files in runtime_files.values()
             ),
-            "build_details": {
-                runtime: {
-                    image_type: [str(path.absolute().relative_to(self.workspace_root)) for path in paths]
-                    for image_type, paths in runtime_files.items()
-                }
-                for runtime, runtime_files in all_generated_files.items()
-            },
-        }
+            build_details=self._relative_build_details(all_generated_files),
+            images=list(images),
+        )
+
+        return summary.model_dump_json(indent=2)
+
+    def save_build_summary(
+        self, all_generated_files: dict[str, dict[str, list[Path]]], images: Iterable[ImageRecord] = ()
+    ) -> Path:
+        """Save a summary of all generated files.
 
+        Args:
+            all_generated_files: The complete mapping of generated files
+            images: A record per generated image, see :meth:`get_image_records`
+
+        Returns:
+            Path to the saved summary file
+        """
         summary_path = self.data_dir / "build_summary.json"
-        summary_path.write_text(json.dumps(summary, indent=2))
+        self.artifacts.write(summary_path, self.render_build_summary(all_generated_files, images))
 
         self.logger.info(f"Saved build summary to {summary_path}")
         return summary_path
 
+    def estimate_build_costs(
+        self, records: Iterable[ImageRecord], durations: Mapping[str, float] | None = None
+    ) -> dict[str, float]:
+        """Estimate how long it takes to build each image.
+
+        Recorded durations are used where available. Other images get a heuristic cost from the image type and ML
+        flag, scaled to the recorded durations if there are any.
+
+        Args:
+            records: The images
+            durations: Recorded build durations in seconds by image name
+
+        Returns:
+            Estimated cost by image name
+        """
+        durations = durations or {}
+        heuristic = {
+            record.name: (GPU_COST_FACTOR if record.image_type.endswith("-gpu") else 1.0)
+            * (ML_COST_FACTOR if record.is_ml else 1.0)
+            for record in records
+        }
+        recorded = [name for name in heuristic if name in durations]
+        scale = sum(durations[name] / heuristic[name] for name in recorded) / len(recorded) if recorded else 1.0
+        return {name: float(durations.get(name, cost * scale)) for name, cost in heuristic.items()}
+
+    def load_build_durations(self, path: Path | None = None) -> dict[str, float]:
+        """Load recorded build durations.
+
+        Args:
+            path: JSON file mapping image names to build durations in seconds (default: build_durations.json in the
+                output directory)
+
+        Returns:
+            Durations by image name, empty if the file does not exist
+        """
+        path = path or self.data_dir / "build_durations.json"
+        if not path.exists():
+            return {}
+        return {name: float(seconds) for name, seconds in json.loads(path.read_text()).items()}
+
     def generate_build_matrix(
         self,
         only_lts: bool = False,
         image_type: str | None = None,
         latest_lts_count: int | None = None,
+        shards: int | None = None,
+        durations: Mapping[str, float] | None = None,
     ) -> dict:
-        """Generate a GitHub Actions build matrix from the build summary.
+        """Generate a GitHub Actions build matrix from the image records of the build summary.
 
         Args:
             only_lts: If True, only include LTS runtimes
             image_type: If specified, only include this image type
             latest_lts_count: If specified, only include the N latest LTS versions
+            shards: If specified, pack the images into this many jobs of similar estimated build cost. Every job
+                lists its images in build order.
+            durations: Recorded build durations in seconds by image name, see :meth:`estimate_build_costs`
+                (default: loaded from build_durations.json in the output directory)
 
         Returns:
-            Dictionary with matrix configuration for GitHub Actions
+            Dictionary with matrix configuration for GitHub Actions, newest runtime version first
+
+        Raises:
+            ValueError: If shards is not between 1 and the GitHub Actions matrix limit
         """
+        if shards is not None and not 1 <= shards <= MAX_MATRIX_JOBS:
+            raise ValueError(f"Number of shards must be between 1 and {MAX_MATRIX_JOBS}, got {shards}")
+
         summary_path = self.data_dir / "build_summary.json"
         if not summary_path.exists():
             self.logger.error(f"Build summary not found at {summary_path}. Run build first.")
             return {"include": []}
 
-        with summary_path.open() as f:
-            build_summary = json.load(f)
-
-        matrix_entries = []
-
-        # Process runtime-specific images (python, python-gpu)
-        for runtime_key, runtime_data in build_summary["build_details"].items():
-            # Skip non-runtime-specific builds
-            if runtime_key == "non_runtime_specific":
-                continue
-
-            # Extract runtime version and ML flag
-            is_ml = runtime_key.endswith("_ml")
-            runtime = runtime_key.replace("_ml", "")
+        summary = BuildSummary.model_validate_json(summary_path.read_bytes())
+        if not summary.images:
+            self.logger.error(f"Build summary at {summary_path} has no image records. Run build again.")
+            return {"include": []}
 
-            # Filter by LTS if requested
-            if only_lts and "LTS" not in runtime:
-                continue
+        # Only runtime-specific images (python, python-gpu) are built per runtime
+        records = summary.runtime_images(image_type, only_lts, latest_lts_count)
+        entries = {
+            record.name: {
+                "runtime": record.runtime,
+                "image_type": record.image_type,
+                "variant": ".ml" if record.is_ml else "",
+                "suffix": record.suffix,
+            }
+            for record in records
+        }
+        if shards is None:
+            if len(entries) > MAX_MATRIX_JOBS:
+                self.logger.warning(
+                    f"Matrix has {len(entries)} jobs, GitHub Actions runs at most {MAX_MATRIX_JOBS}. Use shards."
+                )
+            return {"include": list(entries.values())}
+
+        costs = self.estimate_build_costs(records, self.load_build_durations() if durations is None else durations)
+        packed = pack_shards(
+            records,
+            shards,
+            cost=lambda record: costs[record.name],
+            key=lambda record: record.name,
+            parent=lambda record: record.parent,
+        )
+        packed = [shard for shard in packed if shard]
+        return {
+            "include": [
+                {
+                    "shard": number,
+                    "shards": len(packed),
+                    "cost": round(sum(costs[record.name] for record in shard), 1),
+                    "images": [entries[record.name] for record in shard],
+                }
+                for number, shard in enumerate(packed, start=1)
+            ]
+        }
 
-            # Process each image type for this runtime
-            for img_type, files in runtime_data.items():
-                # Filter by image type if requested
-                if image_type and img_type != image_type:
-                    continue
+    @staticmethod
+    def _tree_prefix(data_dir: Path, records: Iterable[ImageRecord]) -> Path | None:
+        """Workspace-relative path a generated tree had when it was generated, found from its Dockerfiles."""
+        for record in records:
+            parts = Path(record.dockerfile).parts
+            for position in range(len(parts)):
+                if (data_dir / Path(*parts[position:])).is_file():
+                    return Path(*parts[:position])
+        return None
 
-                # Only process runtime-specific images
-                # Non-runtime-specific: minimal, minimal-gpu, standard, standard-gpu, gpu
-                # Runtime-specific: python, python-gpu
-                if img_type not in ["python", "python-gpu"]:
-                    continue
+    def get_layer_keys(self, data_dir: Path | None = None) -> dict[str, list[Layer]]:
+        """Compute the build cache keys of the layers of every image of a generated tree.
 
-                if not files:
-                    continue
+        The Dockerfiles are parsed from the tree, so trees generated by other versions can be compared. COPY sources
+        inside the tree, like requirements.txt, are read from the tree, other sources from the workspace.
 
-                # Extract variation suffix from the first file path
-                # e.g., "data/python/17.3-LTS-ubuntu2404-py312/Dockerfile"
-                # We want to extract: "-ubuntu2404-py312"
-                # The runtime dir includes: VERSION-LTS-SUFFIX or VERSION-SUFFIX
-                first_file = files[0]
-                parts = first_file.split("/")
-                if len(parts) >= 3:
-                    runtime_dir = parts[2]
-                    # Extract suffix: everything after the runtime version
-                    # Runtime version is stored in the 'runtime' variable (e.g., "17.3 LTS")
-                    # Replace spaces with dashes to match the directory format
-                    runtime_sanitized = runtime.replace(" ", "-")
-
-                    # Remove the runtime prefix to get just the suffix
-                    if runtime_dir.startswith(runtime_sanitized):
-                        suffix = runtime_dir[len(runtime_sanitized) :]
-                        # Remove -ml suffix if present (it's tracked separately)
-                        suffix = suffix.replace("-ml", "")
-                    else:
-                        # Fallback: try to find the ubuntu/py pattern
-                        import re
-
-                        match = re.search(r"(-ubuntu\d+-py\d+)", runtime_dir)
-                        suffix = match.group(1) if match else ""
-                else:
-                    suffix = ""
-
-                # Create matrix entry
-                entry = {
-                    "runtime": runtime,
-                    "image_type": img_type,
-                    "variant": ".ml" if is_ml else "",
-                    "suffix": suffix,
-                }
+        Args:
+            data_dir: Output directory of the build (default: the output directory of this engine)
 
-                matrix_entries.append(entry)
-
-        # Remove duplicates (multiple files for same runtime/image_type/variant combination)
-        unique_entries = []
-        seen = set()
-        for entry in matrix_entries:
-            key = (entry["runtime"], entry["image_type"], entry["variant"], entry["suffix"])
-            if key not in seen:
-                seen.add(key)
-                unique_entries.append(entry)
-
-        # Sort by runtime version (descending) and image type
-        unique_entries.sort(
-            key=lambda x: (
-                not x["runtime"].startswith("17"),  # Most recent LTS first
-                not x["runtime"].startswith("16"),
-                not x["runtime"].startswith("15"),
-                not x["runtime"].startswith("14"),
-                x["runtime"],
-                x["image_type"],
-                x["variant"],
-            )
-        )
+        Returns:
+            Layers by image name, in build order
 
-        # Apply latest LTS count filter if specified
-        if latest_lts_count is not None:
-            # Get unique runtime versions (sorted by most recent first)
-            runtime_versions = []
-            seen_versions = set()
-            for entry in unique_entries:
-                if entry["runtime"] not in seen_versions:
-                    runtime_versions.append(entry["runtime"])
-                    seen_versions.add(entry["runtime"])
+        Raises:
+            FileNotFoundError: If the tree has no build summary
+        """
+        data_dir = self.data_dir if data_dir is None else data_dir
+        summary_path = data_dir / "build_summary.json"
+        if not summary_path.exists():
+            raise FileNotFoundError(f"No build summary at {summary_path}, run `dbx-container build` first")
+        summary = BuildSummary.model_validate_json(summary_path.read_bytes())
+        prefix = self._tree_prefix(data_dir, summary.images)
+
+        def resolve(path: str) -> Path:
+            relative = Path(path)
+            if prefix is not None and relative.is_relative_to(prefix):
+                return data_dir / relative.relative_to(prefix)
+            return self.workspace_root / relative
+
+        def source_digest(path: str) -> str | None:
+            source = resolve(path)
+            return hashlib.sha256(source.read_bytes()).hexdigest() if source.is_file() else None
+
+        layers: dict[str, list[Layer]] = {}
+        for record in summary.images:
+            dockerfile = resolve(record.dockerfile)
+            if not dockerfile.is_file():
+                self.logger.warning(f"Dockerfile of {record.name} is missing at {dockerfile}")
+                continue
+            # Records are in build order, so the parent's layers are known
+            parent_layers = layers.get(record.parent) if record.parent else None
+            parent_key = parent_layers[-1].key if parent_layers else None
+            layers[record.name] = layer_keys(parse_dockerfile(dockerfile.read_text()), parent_key, source_digest)
+        return layers
 
-            # Take only the latest N versions
-            latest_versions = set(runtime_versions[:latest_lts_count])
+    def predict_rebuild(self, previous_dir: Path) -> list[ImageInvalidation]:
+        """Predict which layers building the output directory rebuilds after building a previous tree.
 
-            # Filter entries to only include latest versions
-            unique_entries = [e for e in unique_entries if e["runtime"] in latest_versions]
+        Args:
+            previous_dir: Output directory of the previous build, e.g. generated from the main branch
 
-        return {"include": unique_entries}
+        Returns:
+            An entry per image, see :func:`~dbx_container.layers.predict_invalidation`
+        """
+        return predict_invalidation(self.get_layer_keys(previous_dir), self.get_layer_keys())
 
     def run(self, registry: str | None = None) -> dict[str, dict[str, list[Path]]]:
         """Main entry point to run the complete engine process.
@@ -0,0 +1,185 @@
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class ImageNode:
+    """An image in the build graph."""
+
+    image_type: str
+    os_version: str
+    python_version: str | None = None
+    runtime: str | None = None
+    is_ml: bool = False
+    # Generated Dockerfile and variation suffix of the image tag, not part of the node identity
+    dockerfile: Path | None = field(default=None, compare=False)
+    suffix: str = field(default="", compare=False)
+
+    def sort_key(self) -> tuple[str, str, str, str, bool]:
+        """Key for a deterministic order of nodes."""
+        return (self.image_type, self.os_version, self.python_version or "", self.runtime or "", self.is_ml)
+
+    def __str__(self) -> str:
+        name = f"{self.image_type}:ubuntu{self.os_version.replace('.', '')}"
+        if self.python_version:
+            name = f"{name}-py{self.python_version.replace('.', '')}"
+        if self.runtime:
+            name = f"{name}-{self.runtime.replace(' ', '-')}"
+        if self.is_ml:
+            name = f"{name}-ml"
+        return name
+
+    def to_dict(self, root: Path | None = None) -> dict[str, str | bool | None]:
+        """Serialize the node, with the Dockerfile path relative to root if given."""
+        dockerfile = self.dockerfile
+        if dockerfile is not None and root is not None:
+            dockerfile = dockerfile.absolute().relative_to(root)
+        return {
+            "name": str(self),
+            "image_type": self.image_type,
+            "os_version": self.os_version,
+            "python_version": self.python_version,
+            "runtime": self.runtime,
+            "is_ml": self.is_ml,
+            "dockerfile": str(dockerfile) if dockerfile is not None else None,
+        }
+
+
+class BuildGraph:
+    """Directed acyclic graph of images, with an edge from every image to the image it is built FROM.
+
+    Images on the same topological level do not depend on each other, so levels can be generated and built in
+    parallel once all previous levels are done.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty BuildGraph."""
+        # The first instance added of every node, which may carry the Dockerfile path
+        self._nodes: dict[ImageNode, ImageNode] = {}
+        self._dependencies: dict[ImageNode, set[ImageNode]] = {}
+        self._dependents: dict[ImageNode, set[ImageNode]] = {}
+
+    def add(self, node: ImageNode, depends_on: ImageNode | None = None) -> ImageNode:
+        """Add an image and the image it is built from.
+
+        Args:
+            node: The image
+            depends_on: The FROM dependency, added to the graph if missing
+
+        Returns:
+            The node stored in the graph, the first one added wins if an equal node already exists
+        """
+        node = self._ensure(node)
+        if depends_on is not None:
+            depends_on = self._ensure(depends_on)
+            self._dependencies[node].add(depends_on)
+            self._dependents[depends_on].add(node)
+        return node
+
+    def _ensure(self, node: ImageNode) -> ImageNode:
+        if node not in self._nodes:
+            self._nodes[node] = node
+            self._dependencies[node] = set()
+            self._dependents[node] = set()
+        return self._nodes[node]
+
+    def __contains__(self, node: object) -> bool:
+        return node in self._nodes
+
+    def __iter__(self) -> Iterator[ImageNode]:
+        return iter(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._dependencies)
+
+    def dependencies(self, node: ImageNode) -> set[ImageNode]:
+        """Images the given image is built from."""
+        return set(self._dependencies[node])
+
+    def dependents(self, node: ImageNode) -> set[ImageNode]:
+        """Images built from the given image."""
+        return set(self._dependents[node])
+
+    def levels(self) -> list[list[ImageNode]]:
+        """Group the images into topological levels.
+
+        Returns:
+            Levels in build order, every image only depends on images of earlier levels. Images within a level are
+            sorted for deterministic output.
+
+        Raises:
+            ValueError: If the graph contains a cycle
+        """
+        remaining = {node: len(dependencies) for node, dependencies in self._dependencies.items()}
+        level = sorted((node for node, count in remaining.items() if count == 0), key=ImageNode.sort_key)
+        levels = []
+        while level:
+            levels.append(level)
+            next_level = []
+            for node in level:
+                del remaining[node]
+                for dependent in self._dependents[node]:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        next_level.append(dependent)
+            level = sorted(next_level, key=ImageNode.sort_key)
+
+        if remaining:
+            cycle = ", ".join(str(node) for node in sorted(remaining, key=ImageNode.sort_key))
+            raise ValueError(f"Image dependencies contain a cycle: {cycle}")
+        return levels
+
+    def topological_order(self) -> list[ImageNode]:
+        """All images in build order, level by level."""
+        return [node for level in self.levels() for node in level]
+
+    def critical_path(self, weight: Callable[[ImageNode], float] | None = None) -> list[ImageNode]:
+        """Find the longest dependency chain, which bounds the build time however many images are built in parallel.
+
+        Args:
+            weight: Cost of building an image (default: 1 for every image)
+
+        Returns:
+            The images on the critical path, base image first
+        """
+        cost = weight or (lambda _: 1)
+        best: dict[ImageNode, tuple[float, ImageNode | None]] = {}
+        for node in self.topological_order():
+            dependencies = sorted(self._dependencies[node], key=ImageNode.sort_key)
+            parent = max(dependencies, key=lambda dependency: best[dependency][0], default=None)
+            best[node] = ((best[parent][0] if parent is not None else 0) + cost(node), parent)
+
+        if not best:
+            return []
+        node: ImageNode | None = max(sorted(best, key=ImageNode.sort_key), key=lambda candidate: best[candidate][0])
+        path = []
+        while node is not None:
+            path.append(node)
+            node = best[node][1]
+        return path[::-1]
+
+    def critical_path_length(self, weight: Callable[[ImageNode], float] | None = None) -> float:
+        """Total cost of the critical path, see :meth:`critical_path`."""
+        cost = weight or (lambda _: 1)
+        return sum(cost(node) for node in self.critical_path(weight))
+
+    def to_dict(self, root: Path | None = None) -> dict:
+        """Serialize the graph for downstream build schedulers.
+
+        Args:
+            root: Directory Dockerfile paths are made relative to
+
+        Returns:
+            Levels of images with their dependencies, and the critical path
+        """
+        return {
+            "levels": [
+                [
+                    {**node.to_dict(root), "depends_on": sorted(str(dep) for dep in self._dependencies[node])}
+                    for node in level
+                ]
+                for level in self.levels()
+            ],
+            "critical_path": [str(node) for node in self.critical_path()],
+        }
@@ -14,6 +14,9 @@ from dbx_container.docker.instructions import (
 )
 from dbx_container.models.runtime import Runtime
 
+# Name of the stage that builds the python environments of multi-stage images
+BUILD_STAGE = "builder"
+
 
 # https://github.com/databricks/containers/blob/master/ubuntu/python/Dockerfile
 @dataclass
@@ -40,8 +43,10 @@ class PythonDockerfile(DockerfileBuilder):
         registry: str | None = None,
         use_gpu_base: bool = False,
         requirements_path: str | None = None,
+        multi_stage: bool = False,
     ) -> None:
         self.use_gpu_base = use_gpu_base
+        self.multi_stage = multi_stage
 
         if versions is None:
             self.versions = PythonDockerfileVersions()
@@ -68,33 +73,24 @@ class PythonDockerfile(DockerfileBuilder):
                 # Fall back to static requirements file
                 requirements_path = "src/dbx_container/data/requirements.txt"
 
-        instructions = [
+        arguments = [
             ArgInstruction(name="PYTHON_VERSION", default=f'"{self.versions.python}"'),
             ArgInstruction(name="PIP_VERSION", default=f'"{self.versions.pip}"'),
             ArgInstruction(name="SETUPTOOLS_VERSION", default=f'"{self.versions.setuptools}"'),
             ArgInstruction(name="WHEEL_VERSION", default=f'"{self.versions.wheel}"'),
             ArgInstruction(name="VIRTUALENV_VERSION", default=f'"{self.versions.virtualenv}"'),
-            CommentInstruction(comment="Installs python and virtualenv for Spark and Notebooks"),
-            RunInstruction(
-                command=(
-                    "apt-get update && apt-get install -y curl software-properties-common "
-                    "python${PYTHON_VERSION} python${PYTHON_VERSION}-dev && "
-                    "curl https://bootstrap.pypa.io/get-pip.py -o get-pip.py && "
-                    "/usr/bin/python${PYTHON_VERSION} get-pip.py --break-system-packages pip==${PIP_VERSION} "
-                    "setuptools==${SETUPTOOLS_VERSION} wheel==${WHEEL_VERSION} && "
-                    "rm get-pip.py"
-                )
-            ),
-            RunInstruction(
-                command=(
-                    "/usr/local/bin/pip${PYTHON_VERSION} install --break-system-packages --no-cache-dir "
-                    "virtualenv==${VIRTUALENV_VERSION} && "
-                    r"sed -i -r 's/^(PERIODIC_UPDATE_ON_BY_DEFAULT) = True$/\1 = False/' "
-                    "/usr/local/lib/python${PYTHON_VERSION}/dist-packages/virtualenv/seed/embed/base_embed.py && "
-                    "/usr/local/bin/pip${PYTHON_VERSION} download pip==${PIP_VERSION} --dest "
-                    "/usr/local/lib/python${PYTHON_VERSION}/dist-packages/virtualenv_support/"
-                )
-            ),
+        ]
+        install_virtualenv = RunInstruction(
+            command=(
+                "/usr/local/bin/pip${PYTHON_VERSION} install --break-system-packages --no-cache-dir "
+                "virtualenv==${VIRTUALENV_VERSION} && "
+                r"sed -i -r 's/^(PERIODIC_UPDATE_ON_BY_DEFAULT) = True$/\1 = False/' "
+                "/usr/local/lib/python${PYTHON_VERSION}/dist-packages/virtualenv/seed/embed/base_embed.py && "
+                "/usr/local/bin/pip${PYTHON_VERSION} download pip==${PIP_VERSION} --dest "
+                "/usr/local/lib/python${PYTHON_VERSION}/dist-packages/virtualenv_support/"
+            )
+        )
+        environment = [
             CommentInstruction(comment="Initialize the default environment that Spark and notebooks will use"),
             RunInstruction(
                 command=(
@@ -113,8 +109,12 @@ class PythonDockerfile(DockerfileBuilder):
             CopyInstruction(src=requirements_path, dest="/databricks/requirements.txt"),
             RunInstruction(command="apt-get install -y libpq-dev build-essential"),
             RunInstruction(command="/databricks/python3/bin/pip install --no-deps -r /databricks/requirements.txt"),
+        ]
+        pyspark_python = [
             CommentInstruction(comment="Specifies where Spark will look for the python process"),
             EnvInstruction(name="PYSPARK_PYTHON", value="/databricks/python3/bin/python3"),
+        ]
+        lsp_environment = [
             RunInstruction(
                 command=(
                     "virtualenv --python=python${PYTHON_VERSION} --system-site-packages "
@@ -127,6 +127,43 @@ class PythonDockerfile(DockerfileBuilder):
             ),
         ]
 
+        build_stage: list[DockerInstruction] = []
+        if multi_stage:
+            # Compile the environments in a builder stage, the final image only gets the python runtime, libpq for
+            # psycopg2 and the environments without the headers and compilers needed to build them
+            build_stage = [
+                *arguments,
+                self._install_python("python${PYTHON_VERSION} python${PYTHON_VERSION}-dev"),
+                install_virtualenv,
+                *environment,
+                *lsp_environment,
+            ]
+            instructions = [
+                *arguments,
+                CommentInstruction(comment="Installs python and virtualenv for Spark and Notebooks"),
+                self._install_python("python${PYTHON_VERSION} libpq5"),
+                install_virtualenv,
+                CommentInstruction(comment="Environments built in the builder stage"),
+                CopyInstruction(src="/databricks/python3", dest="/databricks/python3", from_stage=BUILD_STAGE),
+                CopyInstruction(
+                    src="/databricks/requirements.txt /databricks/python-lsp-requirements.txt",
+                    dest="/databricks/",
+                    from_stage=BUILD_STAGE,
+                ),
+                *pyspark_python,
+                CopyInstruction(src="/databricks/python-lsp", dest="/databricks/python-lsp", from_stage=BUILD_STAGE),
+            ]
+        else:
+            instructions = [
+                *arguments,
+                CommentInstruction(comment="Installs python and virtualenv for Spark and Notebooks"),
+                self._install_python("python${PYTHON_VERSION} python${PYTHON_VERSION}-dev"),
+                install_virtualenv,
+                *environment,
+                *pyspark_python,
+                *lsp_environment,
+            ]
+
         # Add runtime metadata labels if runtime is provided
         if runtime:
             # Sanitize runtime version for label (replace spaces with dashes)
@@ -147,6 +184,21 @@ class PythonDockerfile(DockerfileBuilder):
         if instrs:
             instructions.extend(instrs)
         super().__init__(base_image=FromInstruction(base_image), instrs=instructions, registry=registry)
+        if build_stage:
+            self.add_stage(FromInstruction(base_image, stage=BUILD_STAGE), build_stage)
+
+    @staticmethod
+    def _install_python(packages: str) -> RunInstruction:
+        """Install python, pip, setuptools and wheel along with the given apt packages."""
+        return RunInstruction(
+            command=(
+                f"apt-get update && apt-get install -y curl software-properties-common {packages} && "
+                "curl https://bootstrap.pypa.io/get-pip.py -o get-pip.py && "
+                "/usr/bin/python${PYTHON_VERSION} get-pip.py --break-system-packages pip==${PIP_VERSION} "
+                "setuptools==${SETUPTOOLS_VERSION} wheel==${WHEEL_VERSION} && "
+                "rm get-pip.py"
+            )
+        )
 
     @property
     def base_name(self) -> str:
@@ -0,0 +1,136 @@
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+import hashlib
+from typing import Literal
+
+from dbx_container.docker.builder import DockerInstruction
+from dbx_container.docker.instructions import (
+    AddInstruction,
+    CommentInstruction,
+    CopyInstruction,
+    FromInstruction,
+    RunInstruction,
+)
+
+
+@dataclass(frozen=True)
+class Layer:
+    """A filesystem layer of an image and the build cache key it is cached under."""
+
+    # Build stage the layer belongs to, None for unnamed stages like the final stage
+    stage: str | None
+    # First line of the instruction that creates the layer
+    instruction: str
+    key: str
+
+
+@dataclass(frozen=True)
+class ImageInvalidation:
+    """Layers of an image that a build has to rebuild instead of taking them from the cache."""
+
+    name: str
+    status: Literal["added", "changed", "unchanged", "removed"]
+    layers: list[Layer]
+    # Positions of the layers in layers that are not cached
+    rebuilt: list[int] = field(default_factory=list)
+
+
+def _hash(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+def _is_layer(instruction: DockerInstruction | str) -> bool:
+    if isinstance(instruction, str):
+        return instruction.lstrip().upper().startswith(("RUN ", "COPY ", "ADD "))
+    return isinstance(instruction, RunInstruction | CopyInstruction | AddInstruction)
+
+
+def layer_keys(
+    instructions: list[DockerInstruction | str],
+    parent_key: str | None = None,
+    source_digest: Callable[[str], str | None] = lambda _: None,
+) -> list[Layer]:
+    """Compute the chained build cache key of every layer of a Dockerfile.
+
+    The key of a layer hashes the key of the layer before it, or of the image a stage starts FROM, the instructions
+    since that layer, and the content of the files a COPY or ADD reads. A layer can be taken from the cache only if
+    its key is unchanged, so a changed instruction or file invalidates its layer and all layers after it.
+
+    Args:
+        instructions: The instructions of all stages, e.g. ``DockerfileBuilder.all_instructions``
+        parent_key: Key of the last layer of the locally built image the final stage starts FROM, images that are
+            not built locally are identified by their reference
+        source_digest: Returns the SHA-256 of a COPY or ADD source path, None if it is unknown
+
+    Returns:
+        The layers in build order
+    """
+    froms = [instruction for instruction in instructions if isinstance(instruction, FromInstruction)]
+    parent = froms[-1].image if froms and parent_key is not None else None
+    # Key of the last layer of every named stage
+    stage_keys: dict[str, str] = {}
+    key = _hash("FROM")
+    stage = None
+    pending: list[str] = []
+    layers = []
+    for instruction in instructions:
+        if isinstance(instruction, CommentInstruction):
+            continue
+        if isinstance(instruction, FromInstruction):
+            if instruction.image in stage_keys:
+                key = stage_keys[instruction.image]
+            elif instruction.image == parent:
+                key = parent_key  # pyright: ignore[reportAssignmentType]
+            else:
+                key = _hash("FROM", instruction.image)
+            stage = instruction.stage
+            pending = []
+            if stage:
+                stage_keys[stage] = key
+            continue
+
+        pending.append(str(instruction))
+        if not _is_layer(instruction):
+            continue
+        sources = []
+        if isinstance(instruction, CopyInstruction) and instruction.from_stage:
+            sources.append(stage_keys.get(instruction.from_stage) or _hash("FROM", instruction.from_stage))
+        elif isinstance(instruction, CopyInstruction | AddInstruction):
+            sources.extend(source_digest(source) or "" for source in instruction.src.split())
+        key = _hash(key, *pending, *sources)
+        # Mount options make the instruction hard to recognize, they are part of the key nonetheless
+        text = f"RUN {instruction.command}" if isinstance(instruction, RunInstruction) else str(instruction)
+        layers.append(Layer(stage, text.splitlines()[0], key))
+        pending = []
+        if stage:
+            stage_keys[stage] = key
+    return layers
+
+
+def predict_invalidation(old: Mapping[str, list[Layer]], new: Mapping[str, list[Layer]]) -> list[ImageInvalidation]:
+    """Predict which layers of which images a build of ``new`` rebuilds after a build of ``old``.
+
+    Assumes that the build cache holds every layer of ``old``, like a builder that built all of its images. A layer of
+    ``new`` is rebuilt if no image of ``old`` has a layer with the same key.
+
+    Args:
+        old: Layers by image name of the previous build
+        new: Layers by image name of the next build
+
+    Returns:
+        An entry per image of ``new`` in its order, followed by the images that only ``old`` has
+    """
+    cached = {layer.key for layers in old.values() for layer in layers}
+    invalidations = []
+    for name, layers in new.items():
+        rebuilt = [position for position, layer in enumerate(layers) if layer.key not in cached]
+        status: Literal["added", "changed", "unchanged"]
+        if name not in old:
+            status = "added"
+        elif rebuilt:
+            status = "changed"
+        else:
+            status = "unchanged"
+        invalidations.append(ImageInvalidation(name, status, layers, rebuilt))
+    invalidations.extend(ImageInvalidation(name, "removed", layers) for name, layers in old.items() if name not in new)
+    return invalidations
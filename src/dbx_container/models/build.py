@@ -0,0 +1,109 @@
+from functools import cached_property
+import re
+
+from pydantic import BaseModel, Field
+
+_VERSION_PATTERN = re.compile(r"\d+(?:\.\d+)*")
+
+
+class ImageRecord(BaseModel):
+    """A generated image in the build summary."""
+
+    name: str
+    image_type: str
+    os_version: str
+    python_version: str | None = None
+    # Runtime version as published, e.g. "17.3 LTS", None for images that are not runtime-specific
+    runtime: str | None = None
+    # Numeric parts of the runtime version, e.g. [17, 3], used for sorting
+    runtime_version: list[int] = Field(default_factory=list)
+    is_lts: bool = False
+    is_ml: bool = False
+    # Variation suffix of the image tag, e.g. "-ubuntu2404-py312"
+    suffix: str = ""
+    dockerfile: str
+    sha256: str | None = None
+    # Name of the image this image is built FROM
+    parent: str | None = None
+
+    @staticmethod
+    def parse_version(version: str) -> list[int]:
+        """Parse the numeric parts of a runtime version like "17.3 LTS", empty if it has none."""
+        match = _VERSION_PATTERN.search(version)
+        return [int(part) for part in match.group().split(".")] if match else []
+
+
+class BuildSummary(BaseModel):
+    """Summary of a build, with a record per generated image."""
+
+    total_runtimes: int
+    image_types: list[str]
+    total_files_generated: int
+    build_details: dict[str, dict[str, list[str]]] = Field(default_factory=dict)
+    images: list[ImageRecord] = Field(default_factory=list)
+
+    @staticmethod
+    def _sort_key(record: ImageRecord) -> tuple:
+        # Newest runtime version first, runtimes without a numeric version last
+        return (
+            not record.runtime_version,
+            [-part for part in record.runtime_version],
+            record.runtime,
+            record.image_type,
+            record.is_ml,
+            record.suffix,
+        )
+
+    @cached_property
+    def _runtime_images(self) -> list[ImageRecord]:
+        """Runtime-specific images in matrix order, sorted once per loaded summary.
+
+        Images that failed to render have no hash and no Dockerfile to build, so they are left out.
+        """
+        return sorted(
+            (record for record in self.images if record.runtime is not None and record.sha256 is not None),
+            key=self._sort_key,
+        )
+
+    @cached_property
+    def _runtime_images_by_type(self) -> dict[str, list[ImageRecord]]:
+        index: dict[str, list[ImageRecord]] = {}
+        for record in self._runtime_images:
+            index.setdefault(record.image_type, []).append(record)
+        return index
+
+    def runtime_images(
+        self, image_type: str | None = None, only_lts: bool = False, latest_lts_count: int | None = None
+    ) -> list[ImageRecord]:
+        """Query the runtime-specific images.
+
+        Args:
+            image_type: Only include this image type
+            only_lts: Only include LTS runtimes
+            latest_lts_count: Only include the N latest runtime versions of the result
+
+        Returns:
+            Matching images, newest runtime version first, then by image type and ML flag
+        """
+        records = self._runtime_images if image_type is None else self._runtime_images_by_type.get(image_type, [])
+        if only_lts:
+            records = [record for record in records if record.is_lts]
+        if latest_lts_count is not None:
+            latest = set(list(dict.fromkeys(record.runtime for record in records))[:latest_lts_count])
+            records = [record for record in records if record.runtime in latest]
+        return list(records)
+
+
+class BuildShard(BaseModel):
+    """Partial build summary written by one shard of a sharded build, merged into the build summary."""
+
+    shard: int
+    shards: int
+    # Files of the complete build by runtime and image type, in summary order
+    build_details: dict[str, dict[str, list[str]]] = Field(default_factory=dict)
+    # All images of the complete build, only images generated by this shard have a hash
+    images: list[ImageRecord] = Field(default_factory=list)
+    # Names of the images assigned to this shard
+    assigned: list[str] = Field(default_factory=list)
+    # Hashes of the files generated by this shard, by path
+    files: dict[str, str] = Field(default_factory=dict)
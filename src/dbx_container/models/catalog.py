@@ -0,0 +1,45 @@
+from datetime import date, datetime
+import hashlib
+
+from pydantic import BaseModel, Field
+
+from dbx_container.models.runtime import Runtime, RuntimeRelease
+
+# Bump whenever the catalog layout changes; catalogs with another version are ignored and re-scraped
+CATALOG_SCHEMA_VERSION = 2
+
+
+class PageValidators(BaseModel):
+    """HTTP validators of a documentation page, used for conditional revalidation."""
+
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class CatalogRelease(BaseModel):
+    """A release row from the release index, with the fingerprint and page validators of the last scrape."""
+
+    release: RuntimeRelease
+    fingerprint: str
+    validators: dict[str, PageValidators] = Field(default_factory=dict)
+
+    @staticmethod
+    def fingerprint_of(release: RuntimeRelease) -> str:
+        """Compute a stable fingerprint of a release row."""
+        return hashlib.sha256(release.model_dump_json().encode()).hexdigest()
+
+    @property
+    def is_end_of_support(self) -> bool:
+        """Whether the release has reached its end-of-support date and will not change anymore."""
+        eos = self.release.end_of_support_date
+        return isinstance(eos, date) and eos < date.today()
+
+
+class RuntimeCatalog(BaseModel):
+    """Persisted snapshot of all scraped Databricks runtimes."""
+
+    schema_version: int = CATALOG_SCHEMA_VERSION
+    generated_at: datetime
+    source_url: str
+    runtimes: list[Runtime] = Field(default_factory=list)
+    releases: list[CatalogRelease] = Field(default_factory=list)
@@ -17,6 +17,11 @@ class RuntimeRelease(BaseModel):
     url: str
     ml_url: str
 
+    @property
+    def is_lts(self) -> bool:
+        """Whether this is a long-term support release."""
+        return "lts" in self.url
+
 
 class Runtime(BaseModel):
     """Databricks Runtime version information."""
@@ -0,0 +1,91 @@
+from collections.abc import Callable, Hashable, Sequence
+import hashlib
+import heapq
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+def pack_shards(
+    items: Sequence[T],
+    shards: int,
+    cost: Callable[[T], float],
+    key: Callable[[T], Hashable] = id,
+    parent: Callable[[T], Hashable | None] = lambda _: None,
+) -> list[list[T]]:
+    """Pack items into shards of similar total cost.
+
+    Items are assigned greedily, heaviest first, to the shard with the lowest cost so far (longest processing time
+    first). An item and the items it depends on are kept in the same shard, so a FROM chain is never split across
+    jobs that run in parallel.
+
+    Args:
+        items: Items to pack, the order breaks ties for deterministic output
+        shards: Number of shards
+        cost: Estimated cost of an item
+        key: Identity of an item, referenced by ``parent``
+        parent: Key of the item an item depends on, None or keys of other items are ignored
+
+    Returns:
+        ``shards`` lists of items, each ordered with dependencies before their dependents. Shards may be empty if
+        there are fewer item groups than shards.
+
+    Raises:
+        ValueError: If shards is less than 1
+    """
+    if shards < 1:
+        raise ValueError(f"Number of shards must be at least 1, got {shards}")
+
+    index = {key(item): position for position, item in enumerate(items)}
+    parents = [index.get(parent(item)) for item in items]
+
+    # Union items with their parents, every connected group goes to one shard
+    roots = list(range(len(items)))
+
+    def find(position: int) -> int:
+        while roots[position] != position:
+            roots[position] = roots[roots[position]]
+            position = roots[position]
+        return position
+
+    for position, parent_position in enumerate(parents):
+        if parent_position is not None:
+            roots[find(position)] = find(parent_position)
+
+    groups: dict[int, list[int]] = {}
+    for position in range(len(items)):
+        groups.setdefault(find(position), []).append(position)
+    costs = {root: sum(cost(items[position]) for position in group) for root, group in groups.items()}
+
+    loads = [(0.0, shard) for shard in range(shards)]
+    assigned: list[list[int]] = [[] for _ in range(shards)]
+    for root in sorted(groups, key=lambda root: (-costs[root], groups[root][0])):
+        load, shard = heapq.heappop(loads)
+        assigned[shard].extend(groups[root])
+        heapq.heappush(loads, (load + costs[root], shard))
+
+    depths: dict[int, int] = {}
+
+    def depth(position: int) -> int:
+        if position not in depths:
+            parent_position = parents[position]
+            depths[position] = 0 if parent_position is None else depth(parent_position) + 1
+        return depths[position]
+
+    return [[items[position] for position in sorted(shard, key=lambda p: (depth(p), p))] for shard in assigned]
+
+
+def shard_of(key: str, shards: int) -> int:
+    """Assign a work item to one of ``shards`` shards by a stable hash of its key.
+
+    The assignment only depends on the key, so it is the same on every machine and does not change when other items
+    are added or removed.
+
+    Args:
+        key: Identity of the work item
+        shards: Number of shards
+
+    Returns:
+        The shard number, from 1 to shards
+    """
+    return int(hashlib.sha256(key.encode()).hexdigest(), 16) % shards + 1
@@ -0,0 +1,103 @@
+from collections.abc import Iterable
+import ctypes
+import errno
+import os
+from pathlib import Path
+import shutil
+import sys
+import uuid
+
+
+def atomic_write_bytes(path: Path, data: bytes, fsync: bool = True) -> None:
+    """Write bytes to a file atomically.
+
+    The data is written to a temporary file in the same directory, which is then renamed over the target, so
+    readers see either the old or the new content but never a partially written file.
+
+    Args:
+        path: Destination file
+        data: Content to write
+        fsync: Flush the temporary file to disk before renaming it
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    # Unlike mkstemp, which creates files readable by the owner only, this applies the umask as a regular write does
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        tmp_path.replace(path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def atomic_write_text(path: Path, text: str, fsync: bool = True) -> None:
+    """Write text to a file atomically, see :func:`atomic_write_bytes`."""
+    atomic_write_bytes(path, text.encode(), fsync=fsync)
+
+
+def fsync_files(paths: Iterable[Path]) -> None:
+    """Flush files and the directories containing them to disk.
+
+    Args:
+        paths: Files to flush, each directory is only flushed once
+    """
+    directories = set()
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        directories.add(path.parent)
+    for directory in sorted(directories):
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _exchange(first: Path, second: Path) -> bool:
+    """Atomically exchange two paths with renameat2(RENAME_EXCHANGE), returns False if unsupported."""
+    if sys.platform != "linux":
+        return False
+    renameat2 = getattr(ctypes.CDLL(None, use_errno=True), "renameat2", None)
+    if renameat2 is None:
+        return False
+    at_fdcwd, rename_exchange = -100, 2
+    if renameat2(at_fdcwd, os.fsencode(first), at_fdcwd, os.fsencode(second), rename_exchange) == 0:
+        return True
+    error = ctypes.get_errno()
+    # Kernels or file systems without support for the flag
+    if error in (errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+        return False
+    raise OSError(error, os.strerror(error), str(first), None, str(second))
+
+
+def replace_directory(source: Path, target: Path) -> None:
+    """Move a directory into place, replacing the target directory and everything in it.
+
+    On Linux both directories are exchanged atomically, so readers see either the complete old or the complete new
+    tree. Elsewhere the target is moved aside first, which leaves a short window in which it does not exist. The old
+    tree is removed afterwards.
+
+    Args:
+        source: Directory to move, on the same file system as the target
+        target: Directory to replace
+    """
+    if not target.exists():
+        source.rename(target)
+        return
+    if _exchange(source, target):
+        shutil.rmtree(source)
+        return
+    old = target.with_name(f".{target.name}.old")
+    shutil.rmtree(old, ignore_errors=True)
+    target.rename(old)
+    source.rename(target)
+    shutil.rmtree(old)
@@ -96,6 +96,7 @@ class RichLogger(logging.Logger):
         # Always create a separate progress instance to avoid conflicts with existing live displays
         sequence = args[0] if args else []
         description = kwargs.get("description", "Processing")
+        total = kwargs.get("total", len(sequence) if hasattr(sequence, "__len__") else None)
 
         # Create a separate console to avoid conflicts with the shared console
         separate_console = Console()
@@ -111,7 +112,7 @@ class RichLogger(logging.Logger):
 
         def _progress_generator():
             with progress:
-                task_id = progress.add_task(description, total=len(sequence) if hasattr(sequence, "__len__") else None)
+                task_id = progress.add_task(description, total=total)
                 for item in sequence:
                     yield item
                     progress.advance(task_id, 1)
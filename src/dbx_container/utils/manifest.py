@@ -0,0 +1,346 @@
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import threading
+from typing import Literal
+
+from dbx_container.utils.fileio import atomic_write_bytes, atomic_write_text, fsync_files, replace_directory
+from dbx_container.utils.logging import get_logger
+
+# File name of the manifest inside the output directory
+MANIFEST_FILENAME = "artifact_manifest.json"
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class ArtifactStats:
+    """Outcome of writing a set of generated artifacts."""
+
+    created: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.created} created, {self.changed} changed, {self.unchanged} unchanged, {self.deleted} deleted"
+
+
+@dataclass(frozen=True)
+class ArtifactChange:
+    """A file that a run would create, change or delete."""
+
+    path: str
+    action: Literal["create", "change", "delete"]
+    sha256: str | None = None
+    previous_sha256: str | None = None
+
+
+@dataclass
+class ArtifactPlan:
+    """Difference between rendered artifacts and the files on disk."""
+
+    changes: list[ArtifactChange] = field(default_factory=list)
+    stats: ArtifactStats = field(default_factory=ArtifactStats)
+
+    @property
+    def up_to_date(self) -> bool:
+        """Whether writing the artifacts would not change anything."""
+        return not self.changes
+
+
+class ArtifactWriter:
+    """Writes generated artifacts, skipping files whose content did not change.
+
+    A manifest of content hashes of all generated files is kept in the output directory. A file is only rewritten
+    if its content differs, so unchanged files keep their mtime. Size and mtime of the manifest entry are a fast path
+    that saves reading the file, files whose size or mtime changed since are compared by content. Committing a full
+    run prunes files that were generated before but not in this run, e.g. for removed runtimes. Files that were never
+    written through the writer, like the runtime catalog, are never touched.
+
+    In staged mode, artifacts are written to a staging directory next to the output directory instead, and
+    unchanged files are hardlinked from the current tree. Committing flushes the new files to disk and swaps the
+    staging directory into place, so a run that fails halfway leaves the previous output untouched and readers never
+    see a partially written tree.
+    """
+
+    def __init__(self, root: Path, staged: bool = False) -> None:
+        """Initialize the ArtifactWriter.
+
+        Args:
+            root: Output directory, manifest paths are relative to it
+            staged: Write into a staging directory that replaces the output directory on commit
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.root = root
+        self.staged = staged
+        # Next to the output directory, absolute so that relative roots like "." have a name to derive it from
+        self.staging_root: Path | None = None
+        if staged:
+            self.staging_root = root.absolute().with_name(f".{root.absolute().name}.staging")
+            # Left over by a run that failed before committing
+            shutil.rmtree(self.staging_root, ignore_errors=True)
+        self._staged_files: list[Path] = []
+        self.manifest_path = root / MANIFEST_FILENAME
+        self.previous = self._load()
+        self.current: dict[str, dict[str, str | int]] = {}
+        self.stats = ArtifactStats()
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[str, dict[str, str | int]]:
+        try:
+            data = json.loads(self.manifest_path.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            self.logger.warning(f"Ignoring unreadable artifact manifest {self.manifest_path}")
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("files", {})
+
+    def _relative(self, path: Path) -> Path | None:
+        """Path of an artifact relative to the output directory, None if it is outside."""
+        try:
+            return path.relative_to(self.root)
+        except ValueError:
+            pass
+        # Relative and absolute paths of the same file
+        try:
+            return path.absolute().relative_to(self.root.absolute())
+        except ValueError:
+            return None
+
+    def _key(self, path: Path) -> str:
+        relative = self._relative(path)
+        return (relative if relative is not None else path).as_posix()
+
+    def _staging_path(self, path: Path) -> Path | None:
+        """Location of an artifact in the staging directory, None if it is written in place."""
+        if self.staging_root is None:
+            return None
+        relative = self._relative(path)
+        return self.staging_root / relative if relative is not None else None
+
+    @staticmethod
+    def _link(source: Path, destination: Path) -> None:
+        """Hardlink a file of the current tree into the staging directory, copying it if links are not supported."""
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        destination.unlink(missing_ok=True)
+        try:
+            os.link(source, destination, follow_symlinks=False)
+        except OSError:
+            shutil.copy2(source, destination, follow_symlinks=False)
+
+    def write(self, path: Path, content: str | bytes) -> Path:
+        """Write an artifact unless the file already has this content.
+
+        Args:
+            path: Destination file
+            content: File content, text is encoded as UTF-8
+
+        Returns:
+            The destination path
+        """
+        data = content.encode() if isinstance(content, str) else content
+        digest = hashlib.sha256(data).hexdigest()
+        key = self._key(path)
+
+        previous = self.previous.get(key)
+        staging_path = self._staging_path(path)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            stat = None
+
+        # The file on disk is trusted to match its manifest entry as long as size and mtime were not touched since.
+        # Otherwise, e.g. after a touch or a fresh checkout, its content is compared before rewriting it.
+        if stat is not None and (
+            (
+                previous is not None
+                and previous["sha256"] == digest
+                and previous["size"] == stat.st_size
+                and previous["mtime_ns"] == stat.st_mtime_ns
+            )
+            or (stat.st_size == len(data) and path.read_bytes() == data)
+        ):
+            outcome = "unchanged"
+            if staging_path is not None:
+                self._link(path, staging_path)
+        elif staging_path is not None:
+            outcome = "created" if stat is None else "changed"
+            staging_path.parent.mkdir(parents=True, exist_ok=True)
+            staging_path.write_bytes(data)
+            stat = staging_path.stat()
+        else:
+            outcome = "created" if stat is None else "changed"
+            atomic_write_bytes(path, data, fsync=False)
+            stat = path.stat()
+        entry = {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+        with self._lock:
+            if key not in self.current:
+                setattr(self.stats, outcome, getattr(self.stats, outcome) + 1)
+            self.current[key] = entry
+            if staging_path is not None and outcome != "unchanged":
+                self._staged_files.append(staging_path)
+        return path
+
+    def write_all(self, artifacts: Mapping[Path, str | bytes]) -> list[Path]:
+        """Write a set of artifacts, see :meth:`write`.
+
+        Args:
+            artifacts: File content by path, e.g. rendered by the engine's render methods
+
+        Returns:
+            The destination paths
+        """
+        return [self.write(path, content) for path, content in artifacts.items()]
+
+    def track(self, path: Path, sha256: str | None = None) -> Path:
+        """Record a file that was generated elsewhere, e.g. by another shard, without rewriting it.
+
+        Args:
+            path: The generated file
+            sha256: Expected hash of the file content
+
+        Returns:
+            The path
+
+        Raises:
+            ValueError: If the file content does not match the expected hash
+        """
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        if sha256 is not None and digest != sha256:
+            raise ValueError(f"{path} does not match its recorded hash")
+        staging_path = self._staging_path(path)
+        if staging_path is not None:
+            self._link(path, staging_path)
+        stat = path.stat()
+
+        with self._lock:
+            if self._key(path) not in self.current:
+                self.stats.unchanged += 1
+            self.current[self._key(path)] = {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        return path
+
+    def digest(self, path: Path) -> str | None:
+        """Get the SHA-256 of an artifact written in this run, None if it was not written."""
+        with self._lock:
+            entry = self.current.get(self._key(path))
+        return str(entry["sha256"]) if entry is not None else None
+
+    def plan(self, artifacts: Mapping[Path, str | bytes], prune: bool = False) -> ArtifactPlan:
+        """Compare artifacts with the files on disk by content hash, without writing anything.
+
+        Args:
+            artifacts: File content by path, e.g. rendered by the engine's render methods
+            prune: Also report artifacts of previous runs that are not in the set as deleted, like a full run would
+
+        Returns:
+            The files that would be created, changed or deleted
+        """
+        plan = ArtifactPlan()
+        keys = set()
+        for path, content in artifacts.items():
+            data = content.encode() if isinstance(content, str) else content
+            digest = hashlib.sha256(data).hexdigest()
+            key = self._key(path)
+            keys.add(key)
+            try:
+                existing = path.read_bytes()
+            except FileNotFoundError:
+                plan.changes.append(ArtifactChange(key, "create", digest))
+                plan.stats.created += 1
+                continue
+            if existing == data:
+                plan.stats.unchanged += 1
+            else:
+                plan.changes.append(ArtifactChange(key, "change", digest, hashlib.sha256(existing).hexdigest()))
+                plan.stats.changed += 1
+
+        if prune:
+            for key in sorted(self.previous.keys() - keys):
+                path = self.root / key
+                if path.is_file():
+                    plan.changes.append(
+                        ArtifactChange(key, "delete", None, hashlib.sha256(path.read_bytes()).hexdigest())
+                    )
+                    plan.stats.deleted += 1
+
+        plan.changes.sort(key=lambda change: change.path)
+        return plan
+
+    def commit(self, prune: bool = False) -> ArtifactStats:
+        """Save the manifest of this run, and swap the staging directory into place in staged mode.
+
+        Args:
+            prune: Delete artifacts of previous runs that were not written in this run. Only use this for runs
+                that generate the complete output, partial runs keep the previous entries instead.
+
+        Returns:
+            Counts of created, changed, unchanged and deleted files
+        """
+        with self._lock:
+            if prune:
+                for key in sorted(self.previous.keys() - self.current.keys()):
+                    self._delete(key)
+                files = dict(self.current)
+            else:
+                files = {**self.previous, **self.current}
+
+        manifest = json.dumps({"version": MANIFEST_VERSION, "files": dict(sorted(files.items()))}, indent=2)
+        if self.staging_root is not None:
+            self._commit_staged(self.staging_root, files, manifest)
+        else:
+            atomic_write_text(self.manifest_path, manifest, fsync=False)
+        self.previous = files
+        self.current = {}
+        stats, self.stats = self.stats, ArtifactStats()
+        self.logger.info(f"Artifacts: {stats}")
+        return stats
+
+    def _commit_staged(self, staging_root: Path, files: dict[str, dict[str, str | int]], manifest: str) -> None:
+        # Carry over everything of the current tree that was not written in this run: previous artifacts of partial
+        # runs and files the writer does not manage, like the runtime catalog. Pruned artifacts are left behind.
+        written = self.current.keys() | {MANIFEST_FILENAME}
+        pruned = self.previous.keys() - files.keys()
+        if self.root.is_dir():
+            for path in self.root.rglob("*"):
+                if path.is_dir() and not path.is_symlink():
+                    continue
+                key = path.relative_to(self.root).as_posix()
+                if key not in written and key not in pruned:
+                    self._link(path, staging_root / key)
+
+        manifest_path = staging_root / MANIFEST_FILENAME
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        manifest_path.write_text(manifest)
+        fsync_files([*self._staged_files, manifest_path])
+        self._staged_files = []
+
+        replace_directory(staging_root, self.root)
+
+    def _delete(self, key: str) -> None:
+        path = self.root / key
+        if not path.is_file():
+            return
+        self.stats.deleted += 1
+        if self.staged:
+            # Not carried over into the staging directory, so it disappears when the trees are swapped
+            self.logger.debug(f"Dropped stale artifact {path}")
+            return
+        path.unlink()
+        self.logger.debug(f"Deleted stale artifact {path}")
+
+        # Remove directories that only contained stale artifacts
+        parent = path.parent
+        while parent != self.root and self.root in parent.parents:
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+            parent = parent.parent
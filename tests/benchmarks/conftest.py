@@ -0,0 +1,55 @@
+from collections.abc import Callable
+from pathlib import Path
+import tracemalloc
+from typing import Any
+
+import pytest
+
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures" / "docs"
+RUNTIME_PATH = "/aws/en/release-notes/runtime/"
+
+
+@pytest.fixture(scope="session")
+def sample_pages() -> dict[str, str]:
+    """Synthetic documentation pages keyed by file name, shaped like the real pages.
+
+    ``scripts/record_fixtures.py`` replaces them with recordings of the documentation.
+    """
+    return {path.name: path.read_text(encoding="utf-8") for path in sorted(FIXTURES_DIR.glob("*.html"))}
+
+
+@pytest.fixture
+def docs_pages(sample_pages: dict[str, str]) -> dict[str, str]:
+    """Serve the sample index, with every listed release answered by the sample base or ML page."""
+    pages = {RUNTIME_PATH: sample_pages["index.html"]}
+    for slug in ("12.2lts", "13.3lts", "14.3lts", "15.4lts", "16.4lts", "17.1", "17.2", "17.3lts"):
+        pages[f"{RUNTIME_PATH}{slug}"] = sample_pages["17.3lts.html"]
+        pages[f"{RUNTIME_PATH}{slug}ml"] = sample_pages["17.3ltsml.html"]
+    return pages
+
+
+def peak_memory(func: Callable[..., Any], *args: Any) -> int:
+    """Peak Python heap allocation of a single call, in bytes."""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.fixture
+def measure(benchmark) -> Callable[..., Any]:
+    """Benchmark a call and record its peak memory and throughput in the benchmark's ``extra_info``.
+
+    ``items`` is the number of units (pages, rows) processed per call, used to report throughput per second.
+    """
+
+    def run(func: Callable[..., Any], *args: Any, items: int = 1) -> Any:
+        benchmark.extra_info["peak_memory_kb"] = round(peak_memory(func, *args) / 1024)
+        result = benchmark(func, *args)
+        if benchmark.stats is not None:
+            benchmark.extra_info["items_per_second"] = round(items / benchmark.stats.stats.mean, 1)
+        return result
+
+    return run
@@ -0,0 +1,54 @@
+from datetime import date
+from pathlib import Path
+import sys
+
+import pytest
+
+from dbx_container.cli import main
+from dbx_container.data.catalog import save_catalog
+from dbx_container.engine import RuntimeContainerEngine
+from dbx_container.models.runtime import Runtime
+
+pytestmark = pytest.mark.benchmark(group="engine")
+
+
+@pytest.fixture
+def runtimes(make_runtime) -> list[Runtime]:
+    return [
+        make_runtime(
+            f"{10 + minor}.0 LTS",
+            os_version,
+            python,
+            is_ml,
+            release_date=date(2020 + minor // 2, 1 + minor % 12, 1),
+            included_libraries={"python": {f"package-{i}": f"1.{i}.0" for i in range(300)}},
+        )
+        for minor, (os_version, python) in enumerate(
+            [("Ubuntu 20.04.6 LTS", "3.9.5"), ("Ubuntu 22.04.5 LTS", "3.11.11"), ("Ubuntu 24.04.3 LTS", "3.12.3")] * 4
+        )
+        for is_ml in (False, True)
+    ]
+
+
+def test_render_all(measure, runtimes: list[Runtime], tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    engine = RuntimeContainerEngine(data_dir=tmp_path / "data")
+
+    artifacts = measure(engine.render_all, runtimes, items=len(runtimes))
+
+    assert len(artifacts) > 6 * len(runtimes)
+    assert list(engine.data_dir.iterdir()) == []
+
+
+def test_check(measure, benchmark, runtimes: list[Runtime], tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    save_catalog(runtimes, tmp_path / "data" / "runtime_catalog.json", "https://docs.databricks.com/")
+    monkeypatch.setattr(sys, "argv", ["dbx-container", "build", "--all-lts"])
+    assert main() == 0
+    monkeypatch.setattr(sys, "argv", ["dbx-container", "build", "--all-lts", "--check"])
+
+    assert measure(main) == 0
+
+    # Checking an up to date tree only renders in memory, it is meant to run as a quick CI step
+    if benchmark.stats is not None:
+        assert benchmark.stats.stats.mean < 1
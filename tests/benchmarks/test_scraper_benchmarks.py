@@ -0,0 +1,79 @@
+from collections.abc import Callable
+from typing import Any
+
+from bs4 import BeautifulSoup
+import pytest
+
+from dbx_container.data.page_parser import RuntimePage
+from dbx_container.data.scraper import RuntimeScraper
+
+
+@pytest.fixture(scope="module")
+def scraper() -> RuntimeScraper:
+    return RuntimeScraper(verify_ssl=True)
+
+
+def test_scrape_runtime_links(
+    measure: Callable[..., Any], scraper: RuntimeScraper, sample_pages: dict[str, str]
+) -> None:
+    content = sample_pages["index.html"]
+
+    releases = measure(scraper._scrape_runtime_links, content)
+
+    assert [r.version for r in releases][:2] == ["17.3 LTS", "17.2"]
+    assert len(releases) == 8
+
+
+def test_parse_system_environment(
+    measure: Callable[..., Any], scraper: RuntimeScraper, sample_pages: dict[str, str]
+) -> None:
+    soup = BeautifulSoup(sample_pages["17.3lts.html"], "lxml")
+
+    env = measure(scraper._parse_system_environment, soup, False)
+
+    assert env.python_version == "3.12.3"
+
+
+def test_parse_included_libraries(
+    measure: Callable[..., Any], scraper: RuntimeScraper, sample_pages: dict[str, str]
+) -> None:
+    soup = BeautifulSoup(sample_pages["17.3ltsml.html"], "lxml")
+
+    libraries = measure(scraper._parse_included_libraries, soup)
+
+    assert len(libraries["python"]) > 200
+    assert len(libraries["r"]) > 200
+
+
+@pytest.mark.parametrize("fast_parser", [True, False], ids=["lxml", "beautifulsoup"])
+@pytest.mark.parametrize("page", ["17.3lts.html", "17.3ltsml.html"])
+def test_parse_runtime_page(
+    measure: Callable[..., Any], sample_pages: dict[str, str], page: str, fast_parser: bool
+) -> None:
+    """Full page parse (document + all sections) with the targeted lxml parser and the BeautifulSoup parser."""
+    content = sample_pages[page]
+
+    def parse() -> dict:
+        if fast_parser:
+            page = RuntimePage(content)
+            page.system_environment()
+            return page.included_libraries()
+        scraper = RuntimeScraper(verify_ssl=True, fast_parser=False)
+        soup = BeautifulSoup(content, "lxml")
+        scraper._parse_system_environment(soup, False)
+        return scraper._parse_included_libraries(soup)
+
+    libraries = measure(parse)
+
+    assert libraries["python"]
+
+
+def test_get_supported_runtimes(measure: Callable[..., Any], docs_server: str) -> None:
+    """End-to-end scrape of the sample pages from a local stand-in for the documentation server."""
+
+    def scrape() -> list:
+        return RuntimeScraper(max_workers=4, verify_ssl=True, base_url=docs_server).get_supported_runtimes()
+
+    runtimes = measure(scrape, items=17)
+
+    assert len(runtimes) == 16
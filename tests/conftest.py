@@ -0,0 +1,164 @@
+from collections.abc import Callable, Iterator
+from datetime import date
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+from typing import Any
+
+import pytest
+
+from dbx_container.models.environment import SystemEnvironment
+from dbx_container.models.runtime import Runtime
+
+RUNTIME_PATH = "/aws/en/release-notes/runtime/"
+DOCS_URL = f"https://docs.databricks.com{RUNTIME_PATH}"
+
+
+def index_page(versions: list[str]) -> str:
+    rows = "".join(
+        f"<tr><td>{v}</td>"
+        f'<td><a href="{RUNTIME_PATH}{v}">Base</a><a href="{RUNTIME_PATH}{v}ml">ML</a></td>'
+        f"<td>3.5.0</td><td>January {i + 1}, 2024</td><td>January {i + 1}, 2027</td></tr>"
+        for i, v in enumerate(versions)
+    )
+    return (
+        "<html><head><title>Runtimes</title></head><body>"
+        '<h2 id="all-supported-databricks-runtime-releases">All supported releases</h2>'
+        "<table><tr><th>Version</th><th>Variants</th><th>Apache Spark version</th>"
+        f"<th>Release date</th><th>End-of-support date</th></tr>{rows}</table></body></html>"
+    )
+
+
+def runtime_page(python_version: str, gpu: bool = False, libraries: int = 1) -> str:
+    """Build a runtime page; ``libraries`` > 1 pads it with release notes and library tables of realistic size."""
+    gpu_list = "<ul><li>CUDA 12.6</li><li>cuDNN 9.3</li></ul>" if gpu else ""
+    notes = "".join(
+        f'<h3 id="note-{i}">Improvement {i}</h3><p>Fixed an issue with <code>spark.conf</code> {i}.</p>'
+        f'<ul><li><a href="/aws/en/notes/{i}">Details</a></li></ul>'
+        for i in range(libraries - 1)
+    )
+    python_rows = "".join(
+        f"<tr><td>lib-{i}</td><td>1.{i}.0</td><td>pkg-{i}</td><td>2.{i}.1</td></tr>" for i in range(libraries - 1)
+    )
+    r_rows = "".join(
+        f"<tr><td>r{i}</td><td>0.{i}</td><td>rpkg{i}</td><td>4.{i}</td><td>rtool{i}</td><td>1.{i}</td></tr>"
+        for i in range(libraries - 1)
+    )
+    r_section = (
+        '<h3 id="installed-r-libraries">Installed R libraries</h3>'
+        "<table><tr><th>Library</th><th>Version</th><th>Library</th><th>Version</th><th>Library</th>"
+        f"<th>Version</th></tr>{r_rows}</table>"
+        if r_rows
+        else ""
+    )
+    return (
+        "<html><head><title>Runtime</title></head><body>"
+        f"{notes}"
+        '<h2 id="system-environment">System environment</h2><ul>'
+        "<li><strong>Operating System</strong>: Ubuntu 24.04.2 LTS</li>"
+        "<li><strong>Java</strong>: Zulu17.54+21-CA</li>"
+        "<li><strong>Scala</strong>: 2.13.16</li>"
+        f"<li><strong>Python</strong>: {python_version}</li>"
+        "<li><strong>R</strong>: 4.4.2</li>"
+        "<li><strong>Delta Lake</strong>: 4.0.0</li></ul>"
+        f"{gpu_list}"
+        '<h3 id="installed-python-libraries">Installed Python libraries</h3>'
+        "<table><tr><th>Library</th><th>Version</th><th>Library</th><th>Version</th></tr>"
+        f"<tr><td>numpy</td><td>2.1.3</td><td>pandas</td><td>2.2.3</td></tr>{python_rows}</table>"
+        f"{r_section}"
+        "</body></html>"
+    )
+
+
+def _make_runtime(version: str, os: str, python: str, is_ml: bool = False, **fields: Any) -> Runtime:
+    released = fields.pop("release_date", date(2025, 1, 1))
+    slug = version.lower().replace(" ", "")
+    return Runtime(
+        version=version,
+        release_date=released,
+        end_of_support_date=date(released.year + 3, released.month, released.day),
+        spark_version="4.0.0",
+        url=f"{DOCS_URL}{slug}{'ml' if is_ml else ''}",
+        is_ml=is_ml,
+        is_lts=version.endswith("LTS"),
+        system_environment=SystemEnvironment(
+            operating_system=os,
+            java_version="Zulu17.58+21-CA",
+            scala_version="2.13.16",
+            python_version=python,
+            r_version="4.4.2",
+            delta_lake_version="4.0.0",
+        ),
+        **fields,
+    )
+
+
+@pytest.fixture
+def make_runtime() -> Callable[..., Runtime]:
+    """Factory for a runtime of a version, operating system and Python version, e.g. ``"17.3 LTS"``.
+
+    Further keyword arguments like ``release_date`` or ``included_libraries`` set the other runtime fields.
+    """
+    return _make_runtime
+
+
+@pytest.fixture
+def docs_pages() -> dict[str, str]:
+    """Documentation pages keyed by URL path: the release index plus a base and ML page per release."""
+    versions = ["16.4lts", "17.0", "17.3lts"]
+    pages = {RUNTIME_PATH: index_page(versions)}
+    for i, version in enumerate(versions):
+        pages[f"{RUNTIME_PATH}{version}"] = runtime_page(f"3.12.{i}")
+        pages[f"{RUNTIME_PATH}{version}ml"] = runtime_page(f"3.12.{i}", gpu=True)
+    return pages
+
+
+@pytest.fixture(scope="session")
+def large_runtime_pages() -> dict[str, str]:
+    """A base and an ML runtime page padded to the size of real documentation pages (a few hundred KB)."""
+    return {
+        "base": runtime_page("3.12.3", libraries=1000),
+        "ml": runtime_page("3.12.3", gpu=True, libraries=1000),
+    }
+
+
+@pytest.fixture
+def docs_requests() -> list[tuple[str, int]]:
+    """``(path, status)`` of every request answered by ``docs_server``."""
+    return []
+
+
+@pytest.fixture
+def docs_server(docs_pages: dict[str, str], docs_requests: list[tuple[str, int]]) -> Iterator[str]:
+    """Serve ``docs_pages`` with ETag validators from a local HTTP server and yield the release index URL."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            content = docs_pages.get(self.path)
+            body = (content or "").encode()
+            etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+            if content is not None and self.headers.get("If-None-Match") == etag:
+                docs_requests.append((self.path, 304))
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            docs_requests.append((self.path, 200 if content is not None else 404))
+            self.send_response(200 if content is not None else 404)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}{RUNTIME_PATH}"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,97 @@
+import asyncio
+from pathlib import Path
+import threading
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from dbx_container.data.async_scraper import AsyncRuntimeScraper
+from dbx_container.data.catalog import save_catalog
+from dbx_container.data.scraper import RuntimeScraper
+
+RUNTIME_PATH = "/aws/en/release-notes/runtime/"
+
+
+def test_async_scraper_matches_threaded_scraper(docs_server: str) -> None:
+    expected = RuntimeScraper(verify_ssl=True, base_url=docs_server).get_supported_runtimes()
+
+    scraper = AsyncRuntimeScraper(max_workers=2, verify_ssl=True, max_concurrency=4, base_url=docs_server)
+    runtimes = scraper.get_supported_runtimes()
+
+    assert len(runtimes) == 6
+    assert [r.model_dump() for r in runtimes] == [r.model_dump() for r in expected]
+    assert len(scraper.timings) == 7
+
+
+def test_async_scraper_survives_missing_pages(docs_server: str, docs_pages: dict[str, str]) -> None:
+    del docs_pages["/aws/en/release-notes/runtime/17.0"]
+    scraper = AsyncRuntimeScraper(verify_ssl=True, max_retries=0, base_url=docs_server)
+
+    runtimes = scraper.get_supported_runtimes()
+
+    assert {r.version for r in runtimes} == {"16.4lts", "17.3lts"}
+
+
+def test_async_incremental_scrape_only_refetches_changed_pages(
+    tmp_path: Path, docs_server: str, docs_pages: dict[str, str], docs_requests: list[tuple[str, int]]
+) -> None:
+    scraper = AsyncRuntimeScraper(verify_ssl=True, base_url=docs_server)
+    runtimes = scraper.get_supported_runtimes()
+    catalog = save_catalog(runtimes, tmp_path / "catalog.json", docs_server, scraper.catalog_releases())
+
+    docs_pages[f"{RUNTIME_PATH}17.0"] = docs_pages[f"{RUNTIME_PATH}17.0"].replace("3.12.1", "3.12.9")
+    docs_requests.clear()
+    scraper = AsyncRuntimeScraper(verify_ssl=True, base_url=docs_server)
+    updated = scraper.get_supported_runtimes(previous=catalog)
+
+    assert sorted(status for path, status in docs_requests if path != RUNTIME_PATH) == [200, *5 * [304]]
+    assert len(scraper.reused_releases) == 2
+    changed = [r for r in updated if r.version == "17.0"]
+    assert [r.system_environment.python_version for r in changed] == ["3.12.9", "3.12.9"]
+    assert [r for r in updated if r.version != "17.0"] == [r for r in runtimes if r.version != "17.0"]
+
+
+def test_async_iter_supported_runtimes_yields_before_scrape_completes(docs_server: str) -> None:
+    scraper = AsyncRuntimeScraper(verify_ssl=True, base_url=docs_server)
+    first_received = threading.Event()
+    fetch = scraper._afetch_page
+
+    async def gated_fetch(client, semaphore, url: str) -> str:
+        # The oldest release is only served once the consumer got a runtime
+        if "16.4lts" in url:
+            assert await asyncio.to_thread(first_received.wait, 5)
+        return await fetch(client, semaphore, url)
+
+    scraper._afetch_page = gated_fetch  # type: ignore[method-assign]
+    runtimes = []
+    for runtime in scraper.iter_supported_runtimes():
+        first_received.set()
+        runtimes.append(runtime)
+
+    assert runtimes[0].version != "16.4lts"
+    assert len(runtimes) == 6
+
+
+def test_async_cache_io_runs_off_the_event_loop(tmp_path: Path, docs_server: str) -> None:
+    scraper = AsyncRuntimeScraper(verify_ssl=True, cache_dir=tmp_path, base_url=docs_server)
+    on_loop = []
+    cache = scraper.cache
+    assert cache is not None
+
+    def record(method):
+        def wrapper(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(method.__name__)
+            except RuntimeError:
+                pass
+            return method(*args, **kwargs)
+
+        return wrapper
+
+    cache.get = record(cache.get)  # type: ignore[method-assign]
+    cache.store = record(cache.store)  # type: ignore[method-assign]
+    assert len(asyncio.run(scraper.aget_supported_runtimes())) == 6
+    assert len(list(tmp_path.rglob("*"))) >= 7
+    assert on_loop == []
@@ -0,0 +1,60 @@
+from datetime import date
+
+import pytest
+
+from dbx_container.docker.builder import DockerfileBuilder
+from dbx_container.docker.instructions import CopyInstruction, FromInstruction, RunInstruction
+from dbx_container.images.python import PythonDockerfile
+from dbx_container.models.runtime import Runtime
+
+
+@pytest.fixture
+def runtime(make_runtime) -> Runtime:
+    return make_runtime("17.3 LTS", "Ubuntu 24.04.3 LTS", "3.12.3", release_date=date(2025, 10, 22))
+
+
+def test_stages_render_before_the_final_stage() -> None:
+    builder = DockerfileBuilder(
+        FromInstruction("ubuntu:24.04"), [CopyInstruction("/out/app", "/usr/local/bin/app", from_stage="build")]
+    )
+    builder.add_stage(FromInstruction("golang:1.24", stage="build"), [RunInstruction("go build -o /out/app")])
+
+    assert builder.render() == (
+        "FROM golang:1.24 AS build\n"
+        "RUN go build -o /out/app\n"
+        "\n"
+        "FROM ubuntu:24.04\n"
+        "COPY --from=build /out/app /usr/local/bin/app\n"
+    )
+    assert [str(instruction) for instruction in builder.all_instructions][::2] == [
+        "FROM golang:1.24 AS build",
+        "FROM ubuntu:24.04",
+    ]
+    with pytest.raises(ValueError, match="already exists"):
+        builder.add_stage(FromInstruction("golang:1.24", stage="build"), [])
+    with pytest.raises(ValueError, match="need a name"):
+        builder.add_stage(FromInstruction("golang:1.24"), [])
+
+
+def test_optimizer_keeps_stages_apart() -> None:
+    builder = DockerfileBuilder(FromInstruction("ubuntu:24.04"), [RunInstruction("echo final")])
+    builder.add_stage(FromInstruction("ubuntu:24.04", stage="build"), [RunInstruction("echo build")])
+
+    assert builder.render(optimize=True).count("\nRUN ") == 2
+    assert builder.optimization is not None
+    assert (builder.optimization.layers_before, builder.optimization.layers_after) == (2, 2)
+
+
+def test_multi_stage_python_image_ships_environments_only(runtime: Runtime) -> None:
+    single = PythonDockerfile(runtime).render()
+    build, final = PythonDockerfile(runtime, multi_stage=True).render().split("\n\n")
+
+    assert build.startswith("FROM dbx-runtime:standard AS builder\n")
+    assert final.startswith("FROM dbx-runtime:standard\n")
+    for build_only in ["build-essential", "libpq-dev", "python${PYTHON_VERSION}-dev", "pip install --no-deps"]:
+        assert build_only in build
+        assert build_only in single
+        assert build_only not in final
+    assert "COPY --from=builder /databricks/python3 /databricks/python3" in final
+    assert "COPY --from=builder /databricks/python-lsp /databricks/python-lsp" in final
+    assert "ENV PYSPARK_PYTHON=/databricks/python3/bin/python3" in final
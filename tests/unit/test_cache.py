@@ -0,0 +1,81 @@
+from pathlib import Path
+import time
+
+import pytest
+import requests
+
+from dbx_container.data.cache import HttpCache
+from dbx_container.data.scraper import RuntimeScraper
+
+URL = "https://docs.databricks.com/aws/en/release-notes/runtime/17.3lts"
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, text: str = "", headers: dict[str, str] | None = None) -> None:
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.raw = None
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code}")
+
+
+def test_store_and_get(tmp_path: Path) -> None:
+    cache = HttpCache(tmp_path)
+    cache.store(URL, "<html/>", etag='"abc"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+
+    entry = cache.get(URL)
+
+    assert entry is not None
+    assert entry.body == "<html/>"
+    assert cache.is_fresh(entry)
+    assert HttpCache.conditional_headers(entry) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    assert cache.get(URL + "ml") is None
+
+
+def test_evicts_least_recently_validated(tmp_path: Path) -> None:
+    cache = HttpCache(tmp_path, max_size=600)
+    for i in range(3):
+        cache.store(f"{URL}/{i}", "x" * 200)
+        time.sleep(0.01)
+
+    assert cache.get(f"{URL}/0") is None
+    assert cache.get(f"{URL}/2") is not None
+
+
+def test_fetch_page_revalidates_stale_entry(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    scraper = RuntimeScraper(verify_ssl=True, cache_dir=tmp_path, cache_ttl=0)
+    calls = []
+
+    def get(url, headers=None, **kwargs):
+        calls.append(headers)
+        if headers:
+            return FakeResponse(304)
+        return FakeResponse(200, "<html>v1</html>", {"ETag": '"v1"'})
+
+    monkeypatch.setattr(scraper.session, "get", get)
+
+    assert scraper._fetch_page(URL) == "<html>v1</html>"
+    assert scraper._fetch_page(URL) == "<html>v1</html>"
+    assert calls == [{}, {"If-None-Match": '"v1"'}]
+    assert [t.status for t in scraper.timings] == [200, 304]
+
+
+def test_offline_serves_cache_only(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    HttpCache(tmp_path).store(URL, "<html>cached</html>")
+    scraper = RuntimeScraper(verify_ssl=True, cache_dir=tmp_path, offline=True, cache_ttl=0)
+    monkeypatch.setattr(scraper.session, "get", pytest.fail)
+
+    assert scraper._fetch_page(URL) == "<html>cached</html>"
+    with pytest.raises(requests.exceptions.ConnectionError):
+        scraper._fetch_page(URL + "ml")
+
+
+def test_offline_requires_cache_dir() -> None:
+    with pytest.raises(ValueError, match="cache directory"):
+        RuntimeScraper(offline=True)
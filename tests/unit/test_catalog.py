@@ -0,0 +1,101 @@
+from datetime import date
+import json
+from pathlib import Path
+
+import pytest
+
+from dbx_container.data.catalog import get_runtimes, iter_runtimes, load_catalog, save_catalog
+from dbx_container.data.scraper import RuntimeScraper
+from dbx_container.data.selection import RuntimeSelector
+from dbx_container.models.catalog import RuntimeCatalog
+from dbx_container.models.runtime import Runtime
+
+
+@pytest.fixture
+def runtimes(make_runtime) -> list[Runtime]:
+    return [
+        make_runtime(
+            "17.3 LTS",
+            "Ubuntu 24.04.2 LTS",
+            "3.12.3",
+            release_date=date(2025, 10, 1),
+            included_libraries={"python": {"numpy": "2.1.3", "pyspark": ("4.0.0", "conda")}},
+        )
+    ]
+
+
+def test_save_and_load_roundtrip(tmp_path: Path, runtimes: list[Runtime]) -> None:
+    path = tmp_path / "runtime_catalog.json"
+    save_catalog(runtimes, path, RuntimeScraper.BASE_URL)
+
+    catalog = load_catalog(path)
+
+    assert catalog is not None
+    assert catalog.runtimes == runtimes
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_load_ignores_other_schema_versions(tmp_path: Path, runtimes: list[Runtime]) -> None:
+    path = tmp_path / "runtime_catalog.json"
+    save_catalog(runtimes, path, RuntimeScraper.BASE_URL)
+    data = json.loads(path.read_text())
+    data["schema_version"] = 0
+    path.write_text(json.dumps(data))
+
+    assert load_catalog(path) is None
+    assert load_catalog(tmp_path / "missing.json") is None
+
+
+def test_get_runtimes_prefers_catalog(tmp_path: Path, runtimes: list[Runtime]) -> None:
+    path = tmp_path / "runtime_catalog.json"
+    scraper = RuntimeScraper(verify_ssl=True)
+    calls = []
+
+    def scrape(previous: RuntimeCatalog | None = None, selector: RuntimeSelector | None = None) -> list[Runtime]:
+        calls.append(previous)
+        return runtimes
+
+    scraper.get_supported_runtimes = scrape  # type: ignore[method-assign]
+
+    assert get_runtimes(scraper, path) == runtimes
+    assert get_runtimes(scraper, path) == runtimes
+    assert len(calls) == 1
+    assert get_runtimes(scraper, path, refresh=True) == runtimes
+    assert len(calls) == 2
+    assert calls[1] is not None
+    get_runtimes(scraper, path, refresh=True, incremental=False)
+    assert calls[2] is None
+
+
+def test_selected_scrape_saves_complete_catalog(tmp_path: Path, runtimes: list[Runtime]) -> None:
+    path = tmp_path / "runtime_catalog.json"
+    scraper = RuntimeScraper(verify_ssl=True)
+    selectors = []
+
+    def scrape(previous: RuntimeCatalog | None = None, selector: RuntimeSelector | None = None) -> list[Runtime]:
+        selectors.append(selector)
+        return runtimes
+
+    scraper.get_supported_runtimes = scrape  # type: ignore[method-assign]
+
+    assert get_runtimes(scraper, path, selector=RuntimeSelector(versions=frozenset(["16.4 LTS"]))) == []
+    assert selectors == [None]
+    catalog = load_catalog(path)
+    assert catalog is not None
+    assert catalog.runtimes == runtimes
+    assert get_runtimes(scraper, path, selector=RuntimeSelector(versions=frozenset(["17.3 LTS"]))) == runtimes
+    assert len(selectors) == 1
+
+
+def test_streamed_selection_saves_complete_catalog(tmp_path: Path, docs_server: str) -> None:
+    path = tmp_path / "runtime_catalog.json"
+    scraper = RuntimeScraper(verify_ssl=True, base_url=docs_server)
+    selector = RuntimeSelector(latest_lts=1, include_ml=False)
+
+    streamed = list(iter_runtimes(scraper, path, selector=selector))
+
+    assert [(r.version, r.is_ml) for r in streamed] == [("17.3lts", False)]
+    catalog = load_catalog(path)
+    assert catalog is not None
+    assert len(catalog.runtimes) == 6
+    assert list(iter_runtimes(scraper, path, selector=selector)) == streamed
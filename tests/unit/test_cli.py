@@ -0,0 +1,85 @@
+from datetime import date
+import json
+from pathlib import Path
+import shutil
+import sys
+
+import pytest
+
+from dbx_container.cli import main
+from dbx_container.data.catalog import save_catalog
+
+BASE = "https://docs.databricks.com/aws/en/release-notes/runtime/"
+
+
+@pytest.fixture
+def cli(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, make_runtime):
+    monkeypatch.chdir(tmp_path)
+    runtimes = [
+        make_runtime(
+            version, os_version, python, release_date=released, included_libraries={"python": {"numpy": "2.1.3"}}
+        )
+        for version, released, os_version, python in [
+            ("17.3 LTS", date(2025, 10, 22), "Ubuntu 24.04.3 LTS", "3.12.3"),
+            ("15.4 LTS", date(2024, 8, 19), "Ubuntu 22.04.5 LTS", "3.11.11"),
+        ]
+    ]
+    save_catalog(runtimes, tmp_path / "data" / "runtime_catalog.json", BASE)
+
+    def run(*args: str) -> int:
+        monkeypatch.setattr(sys, "argv", ["dbx-container", "build", "--all-lts", *args])
+        return main()
+
+    return run
+
+
+def test_check_detects_drift_without_writing(cli, tmp_path: Path) -> None:
+    assert cli("--check") == 1
+    assert sorted(path.name for path in (tmp_path / "data").iterdir()) == ["runtime_catalog.json"]
+
+    assert cli() == 0
+    assert cli("--check") == 0
+
+    dockerfile = tmp_path / "data" / "python" / "17.3-LTS-ubuntu2404-py312" / "Dockerfile"
+    dockerfile.write_text("FROM scratch\n")
+    stale = tmp_path / "data" / "python" / "15.4-LTS-ubuntu2204-py311" / "Dockerfile"
+    assert cli("--plan") == 0
+    assert cli("--check") == 1
+    assert dockerfile.read_text() == "FROM scratch\n"
+
+    assert cli("--lts-count", "1", "--plan") == 0
+    assert cli("--lts-count", "1", "--check") == 1
+    assert stale.exists()
+
+
+def test_check_requires_catalog(cli, tmp_path: Path) -> None:
+    (tmp_path / "data" / "runtime_catalog.json").unlink()
+    assert cli("--check") == 1
+
+
+def test_sharded_build_passes_check(cli, monkeypatch: pytest.MonkeyPatch) -> None:
+    assert cli("--shard", "1/2") == 0
+    assert cli("--shard", "2/2") == 0
+    assert cli("--check") == 1
+
+    monkeypatch.setattr(sys, "argv", ["dbx-container", "merge-manifests", "--output-dir", "data"])
+    assert main() == 0
+    assert cli("--check") == 0
+
+
+def test_diff_layers(cli, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]) -> None:
+    assert cli() == 0
+    shutil.copytree(tmp_path / "data", tmp_path / "previous")
+    assert cli("--optimize") == 0
+
+    monkeypatch.setattr(sys, "argv", ["dbx-container", "diff-layers", "previous", "--json"])
+    capsys.readouterr()
+    assert main() == 0
+    prediction = {image["name"]: image for image in json.loads(capsys.readouterr().out)}
+    # Merged layers are new, the single RUN of the gpu image is kept as it is
+    assert prediction["gpu:ubuntu2404"]["status"] == "unchanged"
+    assert prediction["minimal:ubuntu2404"]["status"] == "changed"
+    assert [layer["index"] for layer in prediction["minimal:ubuntu2404"]["rebuilt"]] == [0, 1]
+
+    monkeypatch.setattr(sys, "argv", ["dbx-container", "diff-layers", "missing"])
+    assert main() == 1
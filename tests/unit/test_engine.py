@@ -0,0 +1,359 @@
+from datetime import date
+import hashlib
+import json
+from pathlib import Path
+import shutil
+
+import pytest
+
+from dbx_container.data.catalog import save_catalog
+from dbx_container.data.scraper import RuntimeScraper
+from dbx_container.engine import RuntimeContainerEngine
+from dbx_container.models.build import BuildShard, BuildSummary
+from dbx_container.models.runtime import Runtime
+
+BASE = "https://docs.databricks.com/aws/en/release-notes/runtime/"
+RUNTIME_PATH = "/aws/en/release-notes/runtime/"
+
+
+@pytest.fixture
+def runtimes(make_runtime) -> list[Runtime]:
+    return [
+        make_runtime(
+            version,
+            os_version,
+            python,
+            is_ml,
+            release_date=released,
+            included_libraries={"python": {"numpy": "2.1.3", "pandas": "2.2.3"}},
+        )
+        for version, released, os_version, python in [
+            ("17.3 LTS", date(2025, 10, 22), "Ubuntu 24.04.3 LTS", "3.12.3"),
+            ("16.4 LTS", date(2025, 5, 9), "Ubuntu 24.04.2 LTS", "3.12.3"),
+            ("15.4 LTS", date(2024, 8, 19), "Ubuntu 22.04.5 LTS", "3.11.11"),
+        ]
+        for is_ml in (False, True)
+    ]
+
+
+@pytest.fixture
+def make_engine(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, runtimes: list[Runtime]):
+    monkeypatch.chdir(tmp_path)
+    catalog_path = tmp_path / "runtime_catalog.json"
+    save_catalog(runtimes, catalog_path, BASE)
+
+    def make(output: str, **kwargs) -> RuntimeContainerEngine:
+        kwargs.setdefault("latest_lts_count", None)
+        return RuntimeContainerEngine(data_dir=tmp_path / output, catalog_path=catalog_path, **kwargs)
+
+    return make
+
+
+def tree(root: Path) -> dict[str, bytes]:
+    return {str(path.relative_to(root)): path.read_bytes() for path in sorted(root.rglob("*")) if path.is_file()}
+
+
+def without_hashes(files: dict[str, bytes], output: str) -> dict[str, bytes]:
+    """Make trees generated into different output directories comparable.
+
+    Generated files reference the output directory (requirements paths, build summary), which also changes their
+    hashes in the artifact manifest and the image records of the build summary.
+    """
+    files = {path: content.replace(f"{output}/".encode(), b"output/") for path, content in files.items()}
+    files["artifact_manifest.json"] = json.dumps(sorted(json.loads(files["artifact_manifest.json"])["files"])).encode()
+    summary = json.loads(files["build_summary.json"])
+    for image in summary["images"]:
+        image["sha256"] = None
+    files["build_summary.json"] = json.dumps(summary).encode()
+    return files
+
+
+def test_parallel_generation_matches_serial(make_engine) -> None:
+    serial = make_engine("serial")
+    serial.run()
+    parallel = make_engine("parallel", jobs=4)
+    parallel.run()
+
+    serial_tree = tree(serial.data_dir)
+    assert without_hashes(serial_tree, "serial") == without_hashes(tree(parallel.data_dir), "parallel")
+    assert "python/15.4-LTS-ubuntu2204-py311-ml/requirements.txt" in serial_tree
+    assert "python/15.4-LTS-ubuntu2204-py311-ml/requirements.txt" in serial_tree
+
+
+def test_unchanged_artifacts_are_not_rewritten(make_engine) -> None:
+    make_engine("data").run()
+    engine = make_engine("data")
+    before = {path: path.stat().st_mtime_ns for path in engine.data_dir.rglob("*") if path.is_file()}
+
+    engine.build_all_images_for_all_runtimes()
+
+    after = {path: path.stat().st_mtime_ns for path in engine.data_dir.rglob("*") if path.is_file()}
+    manifest = engine.data_dir / "artifact_manifest.json"
+    assert {path: mtime for path, mtime in after.items() if path != manifest} == {
+        path: mtime for path, mtime in before.items() if path != manifest
+    }
+
+
+def test_stale_artifacts_are_pruned(make_engine, tmp_path: Path, runtimes: list[Runtime]) -> None:
+    make_engine("data").run()
+    save_catalog(
+        [runtime for runtime in runtimes if runtime.version != "15.4 LTS"], tmp_path / "runtime_catalog.json", BASE
+    )
+    engine = make_engine("data")
+    untracked = engine.data_dir / "notes.txt"
+    untracked.write_text("keep me")
+
+    engine.run()
+
+    assert not (engine.data_dir / "python" / "15.4-LTS-ubuntu2204-py311").exists()
+    assert (engine.data_dir / "python" / "17.3-LTS-ubuntu2404-py312" / "Dockerfile").exists()
+    assert untracked.exists()
+    assert all((engine.data_dir / path).is_file() for path in engine.artifacts.previous)
+
+
+def test_filtered_builds_keep_other_runtimes(make_engine) -> None:
+    make_engine("data").run()
+    engine = make_engine("data", latest_lts_count=1)
+
+    engine.run()
+
+    assert (engine.data_dir / "python" / "15.4-LTS-ubuntu2204-py311" / "Dockerfile").exists()
+    assert "python/15.4-LTS-ubuntu2204-py311/Dockerfile" in engine.artifacts.previous
+
+
+def test_releases_that_fail_to_parse_keep_their_artifacts(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, docs_server: str, docs_pages: dict[str, str]
+) -> None:
+    monkeypatch.chdir(tmp_path)
+
+    def make_engine(refresh_catalog: bool) -> RuntimeContainerEngine:
+        engine = RuntimeContainerEngine(
+            data_dir=tmp_path / "data",
+            catalog_path=tmp_path / "runtime_catalog.json",
+            refresh_catalog=refresh_catalog,
+            latest_lts_count=None,
+            verify_ssl=True,
+        )
+        engine.scraper = RuntimeScraper(verify_ssl=True, base_url=docs_server)
+        return engine
+
+    make_engine(refresh_catalog=True).run()
+    generated = sorted((tmp_path / "data").glob("python/17.0-*/Dockerfile"))
+    assert len(generated) == 2
+
+    docs_pages[f"{RUNTIME_PATH}17.0"] = "<html><body>Service unavailable</body></html>"
+    engine = make_engine(refresh_catalog=True)
+    engine.run()
+    assert engine.scraper.failed_releases == ["17.0"]
+    assert all(path.exists() for path in generated)
+
+    # The catalog keeps the last good result of the release, so builds from it do not prune it either
+    make_engine(refresh_catalog=False).run()
+    assert all(path.exists() for path in generated)
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_os_base_images_are_rendered_once(make_engine, jobs: int) -> None:
+    engine = make_engine("data", force_ubuntu_version="22.04", jobs=jobs)
+    rendered = []
+    generate = engine.generate_dockerfile_for_image_type
+
+    def spy(runtime: Runtime, image_type: str, *args, **kwargs) -> str:
+        rendered.append((image_type, runtime.version))
+        return generate(runtime, image_type, *args, **kwargs)
+
+    engine.generate_dockerfile_for_image_type = spy  # type: ignore[method-assign]
+    engine.run()
+
+    base_renders = [image_type for image_type, version in rendered if version == "generic"]
+    # Once for the default Ubuntu version and once for the forced one, not once per runtime
+    assert sorted(base_renders) == sorted(["gpu", *2 * ["minimal", "minimal-gpu", "standard", "standard-gpu"]])
+    assert "FROM ubuntu:22.04" in (engine.data_dir / "minimal" / "ubuntu2204" / "Dockerfile").read_text()
+
+
+def test_build_graph(make_engine, runtimes: list[Runtime]) -> None:
+    engine = make_engine("data")
+    engine.run()
+
+    graph = engine.get_build_graph(runtimes)
+    levels = [[str(node) for node in level] for level in graph.levels()]
+
+    # The 15.4 runtime on Ubuntu 22.04 is built on the 24.04 base images
+    assert levels[0] == ["gpu:ubuntu2404", "minimal:ubuntu2404"]
+    assert "python:ubuntu2204-py311-15.4-LTS-ml" in levels[2]
+    assert [str(node) for node in graph.critical_path()][0] == "gpu:ubuntu2404"
+    assert graph.critical_path_length() == 4
+    assert all(node.dockerfile is not None and node.dockerfile.is_file() for node in graph)
+
+    saved = json.loads((engine.data_dir / "build_graph.json").read_text())
+    assert [[node["name"] for node in level] for level in saved["levels"]] == levels
+
+
+def test_render_all_matches_build_without_writing(make_engine, runtimes: list[Runtime]) -> None:
+    engine = make_engine("data")
+    artifacts = engine.render_all(runtimes)
+
+    assert list(engine.data_dir.iterdir()) == []
+
+    engine.run()
+    written = tree(engine.data_dir)
+    del written["artifact_manifest.json"]
+    assert {str(path.relative_to(engine.data_dir)): content for path, content in artifacts.items()} == written
+
+
+def test_atomic_build_matches_in_place_build(make_engine) -> None:
+    in_place = make_engine("in-place")
+    in_place.run()
+    atomic = make_engine("atomic", atomic=True)
+    atomic.run()
+
+    assert without_hashes(tree(in_place.data_dir), "in-place") == without_hashes(tree(atomic.data_dir), "atomic")
+
+
+def test_failed_atomic_build_keeps_previous_output(make_engine, monkeypatch: pytest.MonkeyPatch) -> None:
+    make_engine("data").run()
+    before = tree(make_engine("data").data_dir)
+
+    engine = make_engine("data", atomic=True, force_ubuntu_version="22.04")
+
+    def fail(*args) -> Path:
+        raise RuntimeError("crashed")
+
+    monkeypatch.setattr(engine, "save_build_summary", fail)
+    with pytest.raises(RuntimeError):
+        engine.run()
+
+    assert tree(engine.data_dir) == before
+
+
+def test_build_matrix_is_sorted_by_runtime_version(make_engine, runtimes: list[Runtime]) -> None:
+    engine = make_engine("data")
+    beta = runtimes[0].model_copy(update={"version": "18.0", "is_lts": False, "release_date": date(2025, 11, 1)})
+    engine.artifacts.write_all(engine.render_all([*runtimes, beta]))
+
+    summary = json.loads((engine.data_dir / "build_summary.json").read_text())
+    record = next(image for image in summary["images"] if image["name"] == "python:ubuntu2204-py311-15.4-LTS-ml")
+    dockerfile = engine.data_dir / "python" / "15.4-LTS-ubuntu2204-py311-ml" / "Dockerfile"
+    assert record["runtime_version"] == [15, 4]
+    assert record["suffix"] == "-ubuntu2204-py311"
+    # Runtimes on older Ubuntu versions are built on the upgraded base images by default
+    assert record["parent"] == "standard:ubuntu2404"
+    assert record["sha256"] == hashlib.sha256(dockerfile.read_bytes()).hexdigest()
+
+    matrix = engine.generate_build_matrix(image_type="python")["include"]
+    assert [(entry["runtime"], entry["variant"]) for entry in matrix] == [
+        ("18.0", ""),
+        ("17.3 LTS", ""),
+        ("17.3 LTS", ".ml"),
+        ("16.4 LTS", ""),
+        ("16.4 LTS", ".ml"),
+        ("15.4 LTS", ""),
+        ("15.4 LTS", ".ml"),
+    ]
+    assert matrix[-1] == {
+        "runtime": "15.4 LTS",
+        "image_type": "python",
+        "variant": ".ml",
+        "suffix": "-ubuntu2204-py311",
+    }
+
+    matrix = engine.generate_build_matrix(only_lts=True, latest_lts_count=2)["include"]
+    assert {entry["runtime"] for entry in matrix} == {"17.3 LTS", "16.4 LTS"}
+    assert {entry["image_type"] for entry in matrix} == {"python", "python-gpu"}
+
+
+def test_build_matrix_skips_images_that_failed_to_render(make_engine, runtimes: list[Runtime]) -> None:
+    engine = make_engine("data")
+    engine.artifacts.write_all(engine.render_all(runtimes))
+    path = engine.data_dir / "build_summary.json"
+    summary = BuildSummary.model_validate_json(path.read_text())
+    failed = next(record for record in summary.images if record.runtime == "16.4 LTS" and record.is_ml)
+    failed.sha256 = None
+    path.write_text(summary.model_dump_json())
+
+    matrix = engine.generate_build_matrix(image_type=failed.image_type)["include"]
+    jobs = [(entry["runtime"], entry["variant"]) for entry in matrix]
+    assert ("16.4 LTS", ".ml") not in jobs
+    assert ("16.4 LTS", "") in jobs
+    sharded = engine.generate_build_matrix(image_type=failed.image_type, shards=2)["include"]
+    assert sum(len(job["images"]) for job in sharded) == len(matrix)
+
+
+def test_sharded_build_matrix(make_engine, runtimes: list[Runtime]) -> None:
+    engine = make_engine("data")
+    engine.artifacts.write_all(engine.render_all(runtimes))
+    unsharded = engine.generate_build_matrix()["include"]
+
+    matrix = engine.generate_build_matrix(shards=3)["include"]
+    assert [job["shard"] for job in matrix] == [1, 2, 3]
+    assert sorted(map(str, (image for job in matrix for image in job["images"]))) == sorted(map(str, unsharded))
+    # 6 python images cost 1 (3 if ML) and python-gpu images twice as much, 36 in total
+    assert [job["cost"] for job in matrix] == [12, 12, 12]
+
+    # Recorded durations are used where available, the heuristic is scaled to them for the other images
+    durations = {"python-gpu:ubuntu2404-py312-17.3-LTS-ml": 600.0}
+    costs = engine.estimate_build_costs(
+        BuildSummary.model_validate_json((engine.data_dir / "build_summary.json").read_text()).images, durations
+    )
+    assert costs["python-gpu:ubuntu2404-py312-17.3-LTS-ml"] == 600
+    assert costs["python:ubuntu2404-py312-17.3-LTS"] == 100
+
+    with pytest.raises(ValueError, match="between 1 and 256"):
+        engine.generate_build_matrix(shards=257)
+
+
+def test_sharded_build_matches_complete_build(make_engine) -> None:
+    engine = make_engine("data", force_ubuntu_version="22.04")
+    engine.run()
+    complete = tree(engine.data_dir)
+    shutil.rmtree(engine.data_dir)
+
+    shards = [make_engine("data", force_ubuntu_version="22.04").build_shard(shard, 3) for shard in (1, 2, 3)]
+    assert all(path.exists() for path in shards)
+    make_engine("data").merge_build_shards()
+
+    sharded = tree(engine.data_dir)
+    del complete["artifact_manifest.json"]
+    manifest = json.loads(sharded.pop("artifact_manifest.json"))
+    assert sharded == complete
+    assert set(complete) <= set(manifest["files"])
+    assert not any(path.exists() for path in shards)
+
+
+def test_merge_rejects_incomplete_or_modified_shards(make_engine) -> None:
+    for shard in (1, 2):
+        make_engine("data").build_shard(shard, 3)
+    with pytest.raises(ValueError, match=r"Expected shards 1 to 3 exactly once, got \[1, 2\]"):
+        make_engine("data").merge_build_shards()
+
+    path = make_engine("data").build_shard(3, 3)
+    modified = next(iter(BuildShard.model_validate_json(path.read_bytes()).files))
+    (Path.cwd() / modified).write_text("modified")
+    with pytest.raises(ValueError, match="does not match its recorded hash"):
+        make_engine("data").merge_build_shards()
+
+
+def test_optimized_build_merges_layers(make_engine) -> None:
+    engine = make_engine("data", optimize=True)
+    engine.run()
+
+    dockerfile = (engine.data_dir / "minimal" / "latest" / "Dockerfile").read_text()
+    assert dockerfile.count("\nRUN ") == 2
+    assert engine.optimization.layers_after < engine.optimization.layers_before
+
+
+def test_predict_rebuild_after_requirements_change(make_engine) -> None:
+    engine = make_engine("data")
+    engine.run()
+    # The previous build, e.g. generated on the main branch into the same output directory
+    shutil.copytree(engine.data_dir, engine.data_dir.parent / "previous")
+    assert all(image.status == "unchanged" for image in engine.predict_rebuild(Path("previous")))
+
+    requirements = engine.data_dir / "python" / "17.3-LTS-ubuntu2404-py312" / "requirements.txt"
+    requirements.write_text(requirements.read_text() + "requests==2.32.3\n")
+    changed = [image for image in engine.predict_rebuild(engine.data_dir.parent / "previous") if image.rebuilt]
+
+    assert [image.name for image in changed] == ["python:ubuntu2404-py312-17.3-LTS"]
+    (image,) = changed
+    assert image.layers[image.rebuilt[0]].instruction.startswith("COPY data/python/17.3-LTS-ubuntu2404-py312/")
+    assert image.rebuilt == list(range(image.rebuilt[0], len(image.layers)))
@@ -0,0 +1,39 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from dbx_container.utils import fileio
+from dbx_container.utils.fileio import atomic_write_text, replace_directory
+
+
+@pytest.mark.parametrize("umask", [0o022, 0o077])
+def test_atomic_write_uses_regular_permissions(tmp_path: Path, umask: int) -> None:
+    previous = os.umask(umask)
+    try:
+        reference = tmp_path / "reference.txt"
+        reference.write_text("a")
+        path = tmp_path / "nested" / "file.txt"
+
+        atomic_write_text(path, "b")
+    finally:
+        os.umask(previous)
+
+    assert path.read_text() == "b"
+    assert path.stat().st_mode == reference.stat().st_mode
+    assert sorted(p.name for p in path.parent.iterdir()) == ["file.txt"]
+
+
+@pytest.mark.parametrize("exchange", [True, False])
+def test_replace_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, exchange: bool) -> None:
+    if not exchange:
+        monkeypatch.setattr(fileio, "_exchange", lambda first, second: False)
+    target = tmp_path / "data"
+    (target / "old").mkdir(parents=True)
+    source = tmp_path / ".data.staging"
+    (source / "new").mkdir(parents=True)
+
+    replace_directory(source, target)
+
+    assert [path.name for path in tmp_path.iterdir()] == ["data"]
+    assert [path.name for path in target.iterdir()] == ["new"]
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import pytest
+
+from dbx_container.graph import BuildGraph, ImageNode
+
+MINIMAL = ImageNode("minimal", "24.04")
+STANDARD = ImageNode("standard", "24.04")
+GPU = ImageNode("gpu", "24.04")
+MINIMAL_GPU = ImageNode("minimal-gpu", "24.04")
+PYTHON = ImageNode("python", "24.04", "3.12", "17.3 LTS")
+
+
+@pytest.fixture
+def graph() -> BuildGraph:
+    graph = BuildGraph()
+    graph.add(PYTHON, STANDARD)
+    graph.add(STANDARD, MINIMAL)
+    graph.add(MINIMAL_GPU, GPU)
+    return graph
+
+
+def test_levels_respect_dependencies(graph: BuildGraph) -> None:
+    assert graph.levels() == [[GPU, MINIMAL], [MINIMAL_GPU, STANDARD], [PYTHON]]
+    assert graph.dependents(STANDARD) == {PYTHON}
+    assert graph.dependencies(PYTHON) == {STANDARD}
+
+
+def test_critical_path(graph: BuildGraph) -> None:
+    assert graph.critical_path() == [MINIMAL, STANDARD, PYTHON]
+    assert graph.critical_path_length() == 3
+
+    def weight(node: ImageNode) -> float:
+        return 10 if node.image_type == "gpu" else 1
+
+    assert graph.critical_path(weight) == [GPU, MINIMAL_GPU]
+    assert graph.critical_path_length(weight) == 11
+
+
+def test_cycles_are_rejected(graph: BuildGraph) -> None:
+    graph.add(MINIMAL, PYTHON)
+    with pytest.raises(ValueError, match="cycle"):
+        graph.levels()
+
+
+def test_first_added_node_is_kept() -> None:
+    graph = BuildGraph()
+    stored = graph.add(ImageNode("minimal", "24.04", dockerfile=Path("data/minimal/latest/Dockerfile")))
+
+    assert graph.add(ImageNode("minimal", "24.04")) is stored
+    assert len(graph) == 1
@@ -0,0 +1,74 @@
+from dbx_container.docker.builder import DockerfileBuilder
+from dbx_container.docker.instructions import (
+    CommentInstruction,
+    CopyInstruction,
+    EnvInstruction,
+    FromInstruction,
+    RunInstruction,
+)
+from dbx_container.docker.parser import parse_dockerfile
+from dbx_container.images.minimal import MinimalUbuntuDockerfile
+from dbx_container.layers import layer_keys, predict_invalidation
+
+
+def image(env: str = "1", command: str = "make") -> DockerfileBuilder:
+    builder = DockerfileBuilder(
+        FromInstruction("ubuntu:24.04"),
+        [
+            CommentInstruction("Ship the build output only"),
+            EnvInstruction("MODE", env),
+            CopyInstruction("/out", "/opt/app", from_stage="build"),
+            RunInstruction("echo done"),
+        ],
+    )
+    builder.add_stage(
+        FromInstruction("ubuntu:24.04", stage="build"),
+        [CopyInstruction("requirements.txt", "/src/"), RunInstruction(command)],
+    )
+    return builder
+
+
+def keys(builder: DockerfileBuilder, requirements: str = "numpy", parent_key: str | None = None) -> list[str]:
+    sources = {"requirements.txt": requirements}
+    return [layer.key for layer in layer_keys(builder.all_instructions, parent_key, sources.get)]
+
+
+def test_changes_invalidate_their_layer_and_all_after_it() -> None:
+    base = keys(image())
+
+    assert len(base) == 4
+    assert keys(image()) == base
+    # A changed COPY source invalidates the builder stage from the COPY and the layers copying from it
+    assert [a == b for a, b in zip(keys(image(), requirements="pandas"), base, strict=True)] == [False] * 4
+    assert [a == b for a, b in zip(keys(image(command="make all")), base, strict=True)] == [True, False, False, False]
+    # ENV does not create a layer, it changes the key of the next one
+    assert [a == b for a, b in zip(keys(image(env="2")), base, strict=True)] == [True, True, False, False]
+    assert [a == b for a, b in zip(keys(image(), parent_key="parent"), base, strict=True)] == [False] * 4
+
+
+def test_parsed_dockerfile_has_the_same_layers() -> None:
+    minimal = MinimalUbuntuDockerfile()
+    for rendered in [minimal.render(), minimal.render(optimize=True, cache_mounts=True), image().render()]:
+        parsed = parse_dockerfile(rendered)
+
+        assert "".join(f"{instruction}\n" for instruction in parsed) == rendered.replace("\n\n", "\n")
+    assert layer_keys(parse_dockerfile(minimal.render())) == layer_keys(minimal.all_instructions)
+    assert layer_keys(minimal.all_instructions)[0].instruction.startswith("RUN apt-get update")
+
+
+def test_predict_invalidation() -> None:
+    old = {"a": layer_keys(image().all_instructions), "b": layer_keys(MinimalUbuntuDockerfile().all_instructions)}
+    new = {
+        "a": layer_keys(image(command="make all").all_instructions),
+        "b": old["b"],
+        "c": layer_keys(image().all_instructions),
+    }
+
+    prediction = {image.name: (image.status, image.rebuilt) for image in predict_invalidation(old, new)}
+    assert prediction == {
+        "a": ("changed", [1, 2, 3]),
+        "b": ("unchanged", []),
+        # Same layers as the previous a, so they are cached
+        "c": ("added", []),
+    }
+    assert [image.status for image in predict_invalidation(new, {"a": new["a"]})] == ["unchanged", "removed", "removed"]
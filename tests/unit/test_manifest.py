@@ -0,0 +1,129 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from dbx_container.utils.manifest import ArtifactStats, ArtifactWriter
+
+
+def test_writer_skips_unchanged_and_prunes_stale(tmp_path: Path) -> None:
+    writer = ArtifactWriter(tmp_path)
+    writer.write(tmp_path / "a" / "Dockerfile", "FROM ubuntu\n")
+    writer.write(tmp_path / "b" / "Dockerfile", "FROM ubuntu\n")
+    assert writer.commit(prune=True) == ArtifactStats(created=2)
+    mtime = (tmp_path / "a" / "Dockerfile").stat().st_mtime_ns
+
+    writer = ArtifactWriter(tmp_path)
+    writer.write(tmp_path / "a" / "Dockerfile", "FROM ubuntu\n")
+    writer.write(tmp_path / "c" / "Dockerfile", "FROM debian\n")
+    assert writer.commit(prune=True) == ArtifactStats(created=1, unchanged=1, deleted=1)
+    assert (tmp_path / "a" / "Dockerfile").stat().st_mtime_ns == mtime
+    assert not (tmp_path / "b").exists()
+
+
+def test_writer_rewrites_modified_or_missing_files(tmp_path: Path) -> None:
+    path = tmp_path / "requirements.txt"
+    writer = ArtifactWriter(tmp_path)
+    writer.write(path, "numpy==2.1.3\n")
+    writer.commit()
+
+    path.write_text("numpy==2.1.4\n")
+    writer = ArtifactWriter(tmp_path)
+    writer.write(path, "numpy==2.1.3\n")
+    writer.write(tmp_path / "other.txt", "x")
+    assert writer.commit() == ArtifactStats(created=1, changed=1)
+    assert path.read_text() == "numpy==2.1.3\n"
+
+
+def test_touched_files_with_unchanged_content_are_not_rewritten(tmp_path: Path) -> None:
+    path = tmp_path / "a" / "Dockerfile"
+    writer = ArtifactWriter(tmp_path)
+    writer.write(path, "FROM ubuntu\n")
+    writer.commit()
+
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    writer = ArtifactWriter(tmp_path)
+    writer.write(path, "FROM ubuntu\n")
+    assert writer.commit() == ArtifactStats(unchanged=1)
+    assert path.stat().st_mtime_ns == 1_000_000_000
+    assert writer.previous["a/Dockerfile"]["mtime_ns"] == 1_000_000_000
+
+
+def test_partial_commit_keeps_previous_entries(tmp_path: Path) -> None:
+    writer = ArtifactWriter(tmp_path)
+    writer.write(tmp_path / "a.txt", "a")
+    writer.write(tmp_path / "b.txt", "b")
+    writer.commit()
+
+    writer = ArtifactWriter(tmp_path)
+    writer.write(tmp_path / "a.txt", "a")
+    assert writer.commit() == ArtifactStats(unchanged=1)
+    assert (tmp_path / "b.txt").exists()
+    assert writer.previous.keys() == {"a.txt", "b.txt"}
+
+
+def test_staged_writes_replace_the_tree_on_commit(tmp_path: Path) -> None:
+    root = tmp_path / "data"
+    writer = ArtifactWriter(root)
+    writer.write(root / "a" / "Dockerfile", "FROM ubuntu\n")
+    writer.write(root / "b" / "Dockerfile", "FROM ubuntu\n")
+    writer.commit(prune=True)
+    (root / "runtime_catalog.json").write_text("{}")
+    inode = (root / "a" / "Dockerfile").stat().st_ino
+
+    writer = ArtifactWriter(root, staged=True)
+    writer.write(root / "a" / "Dockerfile", "FROM ubuntu\n")
+    writer.write(root / "c" / "Dockerfile", "FROM debian\n")
+    assert not (root / "c").exists()
+
+    assert writer.commit(prune=True) == ArtifactStats(created=1, unchanged=1, deleted=1)
+    assert (root / "a" / "Dockerfile").stat().st_ino == inode
+    assert (root / "c" / "Dockerfile").read_text() == "FROM debian\n"
+    assert not (root / "b").exists()
+    assert (root / "runtime_catalog.json").read_text() == "{}"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["data"]
+
+
+def test_uncommitted_staged_writes_leave_the_tree_untouched(tmp_path: Path) -> None:
+    root = tmp_path / "data"
+    writer = ArtifactWriter(root)
+    writer.write(root / "Dockerfile", "FROM ubuntu\n")
+    writer.commit()
+
+    ArtifactWriter(root, staged=True).write(root / "Dockerfile", "FROM debian\n")
+    assert (root / "Dockerfile").read_text() == "FROM ubuntu\n"
+
+    writer = ArtifactWriter(root, staged=True)
+    assert not (tmp_path / ".data.staging").exists()
+    writer.commit()
+    assert (root / "Dockerfile").read_text() == "FROM ubuntu\n"
+
+
+def test_writer_accepts_the_current_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    writer = ArtifactWriter(Path())
+    writer.write(Path("Dockerfile"), "FROM ubuntu\n")
+    assert writer.commit() == ArtifactStats(created=1)
+
+    assert ArtifactWriter(Path(), staged=True).staging_root == tmp_path.with_name(f".{tmp_path.name}.staging")
+
+
+def test_plan_reports_changes_without_writing(tmp_path: Path) -> None:
+    writer = ArtifactWriter(tmp_path)
+    writer.write(tmp_path / "a.txt", "a")
+    writer.write(tmp_path / "b.txt", "b")
+    writer.commit(prune=True)
+
+    artifacts = {tmp_path / "a.txt": b"a2", tmp_path / "c.txt": b"c"}
+    plan = ArtifactWriter(tmp_path).plan(artifacts, prune=True)
+
+    assert [(change.path, change.action) for change in plan.changes] == [
+        ("a.txt", "change"),
+        ("b.txt", "delete"),
+        ("c.txt", "create"),
+    ]
+    assert plan.stats == ArtifactStats(created=1, changed=1, deleted=1)
+    assert not plan.up_to_date
+    assert (tmp_path / "a.txt").read_text() == "a"
+    assert not (tmp_path / "c.txt").exists()
+    assert ArtifactWriter(tmp_path).plan({tmp_path / "a.txt": "a"}).up_to_date
@@ -0,0 +1,229 @@
+from dbx_container.docker.custom import (
+    APT_ARCHIVES_MOUNT,
+    APT_CACHE_MOUNTS,
+    PIP_CACHE_MOUNTS,
+    AptInstallInstruction,
+    PipInstallInstruction,
+)
+from dbx_container.docker.instructions import (
+    ArgInstruction,
+    CommentInstruction,
+    EnvInstruction,
+    FromInstruction,
+    RunInstruction,
+)
+from dbx_container.docker.optimizer import add_cache_mounts, coalesce_runs, optimize, optimize_apt, split_commands
+from dbx_container.images.minimal import MinimalUbuntuDockerfile
+
+
+def render(instructions: list) -> list[str]:
+    return [str(instruction) for instruction in instructions]
+
+
+def test_adjacent_runs_are_merged_with_comments_above() -> None:
+    instructions, report = coalesce_runs(
+        [
+            FromInstruction("ubuntu:24.04"),
+            CommentInstruction("Update"),
+            RunInstruction("apt-get update"),
+            CommentInstruction("Install"),
+            RunInstruction("apt-get install -y curl"),
+            CommentInstruction("Configure"),
+            ArgInstruction("VERSION", "1"),
+            RunInstruction("echo $VERSION"),
+        ]
+    )
+
+    assert render(instructions) == [
+        "FROM ubuntu:24.04",
+        "# Update",
+        "# Install",
+        "RUN apt-get update && \\\n    apt-get install -y curl",
+        "# Configure",
+        "ARG VERSION=1",
+        "RUN echo $VERSION",
+    ]
+    assert (report.layers_before, report.layers_after) == (3, 2)
+
+
+def test_ordering_sensitive_runs_are_kept_apart() -> None:
+    instructions, report = coalesce_runs(
+        [
+            RunInstruction("cd /tmp && make"),
+            RunInstruction("make install"),
+            EnvInstruction("PATH", "/opt/bin:$PATH"),
+            RunInstruction("(apt-get update || true)"),
+            RunInstruction("false || echo ignored; true"),
+        ]
+    )
+
+    assert render(instructions) == [
+        "RUN cd /tmp && make",
+        "RUN make install",
+        "ENV PATH=/opt/bin:$PATH",
+        "RUN (apt-get update || true) && \\\n    (false || echo ignored; true)",
+    ]
+    assert (report.layers_before, report.layers_after) == (4, 3)
+
+
+def test_minimal_image_layers() -> None:
+    image = MinimalUbuntuDockerfile()
+    plain = image.render()
+    optimized = image.render(optimize=True)
+
+    assert image.optimization is not None
+    assert (image.optimization.layers_before, image.optimization.layers_after) == (9, 2)
+    assert optimized.count("\nRUN ") == 2
+    # Every comment and command is kept
+    assert sorted(line for line in plain.splitlines() if line.startswith("#")) == sorted(
+        line for line in optimized.splitlines() if line.startswith("#")
+    )
+    assert image.render() == plain
+
+
+def test_split_commands_respects_quotes_and_groups() -> None:
+    assert split_commands("a && \\\n    (b && c || true) && echo 'x && y' && d") == [
+        "a",
+        "(b && c || true)",
+        "echo 'x && y'",
+        "d",
+    ]
+
+
+def test_apt_updates_are_deduplicated_and_cleaned_up() -> None:
+    instructions, report = optimize_apt(
+        [
+            RunInstruction("apt-get update"),
+            RunInstruction("apt-get update && apt-get install -y curl && apt-get update && apt-get install -y git"),
+            RunInstruction("apt-get install -y libpq-dev"),
+            AptInstallInstruction(["fuse"]),
+            RunInstruction("echo done"),
+        ],
+        no_install_recommends=True,
+    )
+
+    assert render(instructions) == [
+        (
+            "RUN apt-get update && apt-get install --no-install-recommends -y curl"
+            " && apt-get install --no-install-recommends -y git && apt-get clean && rm -rf /var/lib/apt/lists/*"
+        ),
+        (
+            "RUN apt-get update && apt-get install --no-install-recommends -y libpq-dev"
+            " && apt-get clean && rm -rf /var/lib/apt/lists/*"
+        ),
+        "RUN apt-get update && apt-get install --no-install-recommends -y fuse && rm -rf /var/lib/apt/lists/*",
+        "RUN echo done",
+    ]
+    assert report.apt_updates_removed == 2
+    assert report.apt_updates_added == 1
+    assert report.apt_cleanups_added == 2
+    assert report.apt_recommends_disabled == 4
+    assert (report.layers_before, report.layers_after) == (5, 4)
+
+
+def test_apt_lists_are_updated_after_adding_sources() -> None:
+    instructions, report = optimize_apt(
+        [
+            RunInstruction(
+                "apt-get update && apt-get install -y gnupg && add-apt-repository -y ppa:deadsnakes/ppa"
+                " && apt-get install -y python3.12 && rm -rf /var/lib/apt/lists/*"
+            ),
+            RunInstruction("apt-get install ./local.deb"),
+        ]
+    )
+
+    assert render(instructions) == [
+        (
+            "RUN apt-get update && apt-get install -y gnupg && add-apt-repository -y ppa:deadsnakes/ppa"
+            " && apt-get update && apt-get install -y python3.12 && rm -rf /var/lib/apt/lists/*"
+        ),
+        "RUN apt-get install ./local.deb && apt-get clean && rm -rf /var/lib/apt/lists/*",
+    ]
+    assert report.apt_changes == 2
+
+
+def test_apt_cleanup_runs_after_the_last_apt_step() -> None:
+    instructions, report = optimize_apt(
+        [
+            RunInstruction(
+                "apt-get update && apt-get install -y curl gnupg && apt-get clean && rm -rf /var/lib/apt/lists/*"
+                " && curl -O https://example.com/repo.deb && apt-get install -y ./repo.deb && rm repo.deb"
+            ),
+        ]
+    )
+
+    assert render(instructions) == [
+        (
+            "RUN apt-get update && apt-get install -y curl gnupg && curl -O https://example.com/repo.deb"
+            " && apt-get install -y ./repo.deb && rm repo.deb && apt-get clean && rm -rf /var/lib/apt/lists/*"
+        ),
+    ]
+    assert (report.apt_cleanups_moved, report.apt_cleanups_added, report.apt_updates_added) == (1, 0, 0)
+
+
+def test_minimal_image_keeps_no_package_lists() -> None:
+    image = MinimalUbuntuDockerfile()
+    instructions, report = optimize(image.instructions)
+
+    runs = [str(instruction) for instruction in instructions if isinstance(instruction, RunInstruction)]
+    assert len(runs) == 2
+    assert runs[0].endswith("apt-get clean && \\\n    rm -rf /var/lib/apt/lists/* /tmp/* /var/tmp/*")
+    assert runs[1].endswith("rm -rf /var/lib/apt/lists/*")
+    assert runs[1].count("apt-get update") == 1
+    assert (report.layers_before, report.layers_after, report.apt_cleanups_added) == (9, 2, 1)
+    assert report.apt_cleanups_moved == 1
+
+
+def test_cache_mounts_replace_cleanup() -> None:
+    instructions = add_cache_mounts(
+        [
+            RunInstruction("apt-get update && apt-get install -y curl && apt-get clean && rm -rf /var/lib/apt/lists/*"),
+            RunInstruction("apt-get update && apt-get install -y git && rm -rf /var/lib/apt/lists/* /tmp/*"),
+            RunInstruction("pip install --no-cache-dir -r requirements.txt"),
+            RunInstruction("echo done"),
+            # Another build may update the package lists between these RUN instructions, they stay in the image
+            RunInstruction("apt-get update"),
+            RunInstruction("apt-get install -y zulu17 && apt-get clean && rm -rf /var/lib/apt/lists/*"),
+        ]
+    )
+
+    assert [instruction.mounts for instruction in instructions] == [  # pyright: ignore[reportAttributeAccessIssue]
+        APT_CACHE_MOUNTS,
+        APT_CACHE_MOUNTS,
+        PIP_CACHE_MOUNTS,
+        [],
+        [APT_ARCHIVES_MOUNT],
+        [APT_ARCHIVES_MOUNT],
+    ]
+    assert [instruction.command for instruction in instructions] == [  # pyright: ignore[reportAttributeAccessIssue]
+        (
+            "rm -f /etc/apt/apt.conf.d/docker-clean"
+            """ && echo 'Binary::apt::APT::Keep-Downloaded-Packages "true";' > /etc/apt/apt.conf.d/keep-cache"""
+            " && apt-get update && apt-get install -y curl"
+        ),
+        "apt-get update && apt-get install -y git && rm -rf /tmp/*",
+        "pip install -r requirements.txt",
+        "echo done",
+        "apt-get update",
+        "apt-get install -y zulu17 && rm -rf /var/lib/apt/lists/*",
+    ]
+
+
+def test_cached_instructions_render_with_syntax_directive() -> None:
+    image = MinimalUbuntuDockerfile()
+    assert image.render().startswith("FROM ubuntu:24.04\n")
+    cached = image.render(cache_mounts=True)
+    assert cached.startswith("# syntax=docker/dockerfile:1\nFROM ubuntu:24.04\n")
+    assert "apt-get clean" not in cached
+    assert cached.count("keep-cache") == 1
+
+    image.add(AptInstallInstruction(["fuse"], cache=True)).add(PipInstallInstruction("requirements.txt", cache=True))
+    assert (
+        str(image.instructions[-1]) == "RUN --mount=type=cache,target=/root/.cache/pip pip install -r requirements.txt"
+    )
+    assert image.render().startswith("# syntax=docker/dockerfile:1\n")
+
+    assert AptInstallInstruction(["fuse"], cache=True).mounts == APT_CACHE_MOUNTS
+    install = AptInstallInstruction(["fuse"], update=False, cache=True)
+    assert install.mounts == [APT_ARCHIVES_MOUNT]
+    assert install.command.endswith("apt-get install -y fuse && rm -rf /var/lib/apt/lists/*")
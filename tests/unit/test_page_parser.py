@@ -0,0 +1,36 @@
+from datetime import date
+
+from dbx_container.data.scraper import RuntimeScraper
+from dbx_container.models.runtime import Runtime, RuntimeRelease
+
+URL = "https://docs.databricks.com/aws/en/release-notes/runtime/17.3lts"
+RELEASE = RuntimeRelease(
+    version="17.3lts",
+    release_date=date(2025, 10, 1),
+    end_of_support_date=date(2028, 10, 1),
+    spark_version="4.0.0",
+    url=URL,
+    ml_url=f"{URL}ml",
+)
+
+
+def parse_pages(scraper: RuntimeScraper, pages: dict[str, str]) -> list[Runtime | None]:
+    base = scraper._parse_runtime_page(RELEASE, URL, content=pages["base"])
+    assert base is not None
+    return [base, scraper._parse_ml_runtime_page(RELEASE, f"{URL}ml", base, content=pages["ml"])]
+
+
+def test_fast_parser_matches_beautifulsoup(large_runtime_pages: dict[str, str]) -> None:
+    fast = parse_pages(RuntimeScraper(verify_ssl=True), large_runtime_pages)
+    soup = parse_pages(RuntimeScraper(verify_ssl=True, fast_parser=False), large_runtime_pages)
+
+    assert fast == soup
+    assert len(fast[0].included_libraries["python"]) == 2000  # pyright: ignore[reportOptionalMemberAccess]
+    assert len(fast[0].included_libraries["r"]) == 2997  # pyright: ignore[reportOptionalMemberAccess]
+    assert fast[1].included_libraries["gpu"] == {"cuda": "12.6", "cudnn": "9.3"}  # pyright: ignore[reportOptionalMemberAccess]
+
+
+def test_fast_parser_handles_missing_sections() -> None:
+    scraper = RuntimeScraper(verify_ssl=True)
+
+    assert scraper._parse_runtime_page(RELEASE, URL, content="<html><body><p>Moved</p></body></html>") is None
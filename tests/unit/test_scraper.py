@@ -0,0 +1,186 @@
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import threading
+import time
+
+import pytest
+
+from dbx_container.data.catalog import save_catalog
+from dbx_container.data.scraper import RuntimeScraper
+from dbx_container.data.selection import RuntimeSelector
+from dbx_container.models.catalog import CatalogRelease
+from dbx_container.models.runtime import RuntimeRelease
+
+BASE = "https://docs.databricks.com"
+RUNTIME_PATH = "/aws/en/release-notes/runtime/"
+
+
+@pytest.fixture
+def pages(docs_pages: dict[str, str]) -> dict[str, str]:
+    return {f"{BASE}{path}": content for path, content in docs_pages.items()}
+
+
+def test_get_supported_runtimes_fetches_pages_concurrently(pages: dict[str, str]) -> None:
+    scraper = RuntimeScraper(max_workers=4, verify_ssl=True)
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fetch(url: str) -> str:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return pages[url]
+
+    scraper._fetch_page = fetch  # type: ignore[method-assign]
+    runtimes = scraper.get_supported_runtimes()
+
+    assert len(runtimes) == 6
+    assert peak > 1
+    # Newest release first, base runtime before its ML variant
+    assert [(r.version, r.is_ml) for r in runtimes] == [
+        ("17.3lts", False),
+        ("17.3lts", True),
+        ("17.0", False),
+        ("17.0", True),
+        ("16.4lts", False),
+        ("16.4lts", True),
+    ]
+    ml = runtimes[1]
+    assert ml.system_environment == runtimes[0].system_environment
+    assert ml.included_libraries["gpu"] == {"cuda": "12.6", "cudnn": "9.3"}
+
+
+def test_parse_runtime_without_executor(pages: dict[str, str]) -> None:
+    scraper = RuntimeScraper(verify_ssl=True)
+    scraper._fetch_page = pages.__getitem__  # type: ignore[method-assign]
+    release = RuntimeRelease(
+        version="17.3lts",
+        release_date=date(2024, 1, 3),
+        end_of_support_date=date(2027, 1, 3),
+        spark_version="3.5.0",
+        url=f"{BASE}/aws/en/release-notes/runtime/17.3lts",
+        ml_url=f"{BASE}/aws/en/release-notes/runtime/17.3ltsml",
+    )
+
+    runtimes = scraper._parse_runtime(release)
+
+    assert [r.is_ml for r in runtimes] == [False, True]
+    assert runtimes[0].system_environment.python_version == "3.12.2"
+    assert runtimes[0].included_libraries["python"] == {"numpy": "2.1.3", "pandas": "2.2.3"}
+
+
+def test_fetch_page_retries_transient_errors() -> None:
+    statuses = [503, 429, 200]
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            status = statuses.pop(0)
+            body = b"<html>ok</html>"
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        scraper = RuntimeScraper(verify_ssl=True, backoff_factor=0.01)
+        url = f"http://127.0.0.1:{server.server_port}/runtime"
+
+        assert scraper._fetch_page(url) == "<html>ok</html>"
+    finally:
+        server.shutdown()
+
+    assert statuses == []
+    assert scraper.timings[0].status == 200
+    assert scraper.timings[0].retries == 2
+
+
+def test_incremental_scrape_only_refetches_changed_pages(
+    tmp_path: Path, docs_server: str, docs_pages: dict[str, str], docs_requests: list[tuple[str, int]]
+) -> None:
+    scraper = RuntimeScraper(verify_ssl=True, base_url=docs_server)
+    runtimes = scraper.get_supported_runtimes()
+    catalog = save_catalog(runtimes, tmp_path / "catalog.json", docs_server, scraper.catalog_releases())
+    assert all(entry.validators for entry in catalog.releases)
+
+    docs_pages[f"{RUNTIME_PATH}17.0"] = docs_pages[f"{RUNTIME_PATH}17.0"].replace("3.12.1", "3.12.9")
+    docs_requests.clear()
+    updated = RuntimeScraper(verify_ssl=True, base_url=docs_server).get_supported_runtimes(previous=catalog)
+
+    assert sorted(docs_requests) == [
+        (RUNTIME_PATH, 200),
+        (f"{RUNTIME_PATH}16.4lts", 304),
+        (f"{RUNTIME_PATH}16.4ltsml", 304),
+        (f"{RUNTIME_PATH}17.0", 200),
+        (f"{RUNTIME_PATH}17.0ml", 304),
+        (f"{RUNTIME_PATH}17.3lts", 304),
+        (f"{RUNTIME_PATH}17.3ltsml", 304),
+    ]
+    changed = [r for r in updated if r.version == "17.0"]
+    assert [r.system_environment.python_version for r in changed] == ["3.12.9", "3.12.9"]
+    assert [r for r in updated if r.version != "17.0"] == [r for r in runtimes if r.version != "17.0"]
+
+
+def test_incremental_scrape_skips_end_of_support_releases(
+    tmp_path: Path, docs_server: str, docs_pages: dict[str, str], docs_requests: list[tuple[str, int]]
+) -> None:
+    # The first row (16.4 LTS) went out of support
+    docs_pages[RUNTIME_PATH] = docs_pages[RUNTIME_PATH].replace("2027", "2020", 1)
+    scraper = RuntimeScraper(verify_ssl=True, base_url=docs_server)
+    catalog = save_catalog(
+        scraper.get_supported_runtimes(), tmp_path / "catalog.json", docs_server, scraper.catalog_releases()
+    )
+    assert [entry.is_end_of_support for entry in catalog.releases] == [True, False, False]
+
+    docs_requests.clear()
+    RuntimeScraper(verify_ssl=True, base_url=docs_server).get_supported_runtimes(previous=catalog)
+
+    assert not any(path.startswith(f"{RUNTIME_PATH}16.4") for path, _ in docs_requests)
+    assert CatalogRelease.fingerprint_of(catalog.releases[0].release) == catalog.releases[0].fingerprint
+
+
+def test_iter_supported_runtimes_yields_before_scrape_completes(pages: dict[str, str]) -> None:
+    scraper = RuntimeScraper(max_workers=2, verify_ssl=True)
+    first_received = threading.Event()
+
+    def fetch(url: str) -> str:
+        # The oldest release is only served once the consumer got a runtime
+        if "16.4lts" in url:
+            assert first_received.wait(timeout=5)
+        return pages[url]
+
+    scraper._fetch_page = fetch  # type: ignore[method-assign]
+    runtimes = []
+    for runtime in scraper.iter_supported_runtimes():
+        first_received.set()
+        runtimes.append(runtime)
+
+    assert runtimes[0].version != "16.4lts"
+    assert [(r.version, r.is_ml) for r in RuntimeScraper.sort_runtimes(runtimes)][::2] == [
+        ("17.3lts", False),
+        ("17.0", False),
+        ("16.4lts", False),
+    ]
+
+
+def test_selector_is_applied_before_fetching_runtime_pages(
+    docs_server: str, docs_requests: list[tuple[str, int]]
+) -> None:
+    scraper = RuntimeScraper(verify_ssl=True, base_url=docs_server)
+    selector = RuntimeSelector(versions=frozenset(["17.0"]), include_ml=False)
+
+    runtimes = scraper.get_supported_runtimes(selector=selector)
+
+    assert [(r.version, r.is_ml) for r in runtimes] == [("17.0", False)]
+    assert docs_requests == [(RUNTIME_PATH, 200), (f"{RUNTIME_PATH}17.0", 200)]
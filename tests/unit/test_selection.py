@@ -0,0 +1,57 @@
+from datetime import date
+
+import pytest
+
+from dbx_container.data.selection import RuntimeSelector
+from dbx_container.models.runtime import RuntimeRelease
+
+BASE = "https://docs.databricks.com/aws/en/release-notes/runtime/"
+
+
+@pytest.fixture
+def releases() -> list[RuntimeRelease]:
+    return [
+        RuntimeRelease(
+            version=version,
+            release_date=date(2025, month, 1),
+            end_of_support_date=date(2028, month, 1),
+            spark_version="4.0.0",
+            url=f"{BASE}{slug}",
+            ml_url=f"{BASE}{slug}ml",
+        )
+        for version, slug, month in [
+            ("17.3 LTS", "17.3lts", 10),
+            ("17.2", "17.2", 8),
+            ("16.4 LTS", "16.4lts", 5),
+            ("15.4 LTS", "15.4lts", 1),
+        ]
+    ]
+
+
+def test_select_releases(releases: list[RuntimeRelease]) -> None:
+    assert RuntimeSelector().select_releases(releases) == releases
+    assert not RuntimeSelector().is_partial
+
+    latest = RuntimeSelector(latest_lts=2, include_ml=False).select_releases(releases)
+    assert [r.version for r in latest] == ["17.3 LTS", "16.4 LTS"]
+    assert all(r.ml_url == "" for r in latest)
+
+    assert [r.version for r in RuntimeSelector(lts_only=True).select_releases(releases)] == [
+        "17.3 LTS",
+        "16.4 LTS",
+        "15.4 LTS",
+    ]
+    assert [r.version for r in RuntimeSelector(versions=frozenset(["17.2"])).select_releases(releases)] == ["17.2"]
+
+
+def test_select_runtimes_matches_releases(releases: list[RuntimeRelease], make_runtime) -> None:
+    runtimes = [
+        make_runtime(release.version, "Ubuntu 24.04.2 LTS", "3.12.3", is_ml, release_date=release.release_date)
+        for release in releases
+        for is_ml in (False, True)
+    ]
+
+    selected = RuntimeSelector(latest_lts=1).select_runtimes(runtimes)
+    assert [(r.version, r.is_ml) for r in selected] == [("17.3 LTS", False), ("17.3 LTS", True)]
+    selected = RuntimeSelector(latest_lts=1, include_ml=False).select_runtimes(runtimes)
+    assert [(r.version, r.is_ml) for r in selected] == [("17.3 LTS", False)]
@@ -0,0 +1,32 @@
+import pytest
+
+from dbx_container.sharding import pack_shards, shard_of
+
+
+def test_shards_are_balanced_by_cost() -> None:
+    costs = {"a": 7, "b": 5, "c": 4, "d": 3, "e": 1}
+    shards = pack_shards(list(costs), 2, cost=costs.__getitem__)
+
+    assert sorted(sum(costs[item] for item in shard) for shard in shards) == [10, 10]
+    assert sorted(item for shard in shards for item in shard) == sorted(costs)
+
+
+def test_dependency_chains_stay_in_one_shard_in_build_order() -> None:
+    parents = {"child": "base", "grandchild": "child", "base": None, "other": "external"}
+    items = ["grandchild", "other", "child", "base"]
+    shards = pack_shards(items, 3, cost=lambda _: 1, key=str, parent=parents.get)
+
+    assert shards == [["base", "child", "grandchild"], ["other"], []]
+
+
+def test_invalid_shard_count() -> None:
+    with pytest.raises(ValueError, match="at least 1"):
+        pack_shards(["a"], 0, cost=lambda _: 1)
+
+
+def test_shard_assignment_is_stable() -> None:
+    keys = [f"python:ubuntu2404-py312-{version}.0" for version in range(100)]
+    assignment = [shard_of(key, 4) for key in keys]
+
+    assert assignment == [shard_of(key, 4) for key in reversed(keys)][::-1]
+    assert set(assignment) == {1, 2, 3, 4}